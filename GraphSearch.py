@@ -1,3 +1,5 @@
+import argparse
+import heapq
 import json
 import math
 import random
@@ -5,6 +7,31 @@ import threading
 import time
 import paho.mqtt.client as mqtt
 
+from dstar_lite import DStarLite
+from exploration import ExplorationStream
+from hpa import get_hierarchy
+from maze_patch import PATCH_TOPIC, apply_cells, decode_cells
+from maze_store import TileCache
+from maze_utils import TERRAIN_COST, cell_cost
+from message_bus import MessageBus
+from shared_maze import SHARED_TOPIC, attach
+from solution_cache import SolutionCache
+
+# Durante una ricerca conta solo l'ultima configurazione: coda corta
+BUS_CAPACITY = 16
+
+# Id con cui l'AI chiede le tile quando il server consegna il labirinto a tile
+TILES_CLIENT = "InformedAI"
+
+
+def essential_topic(topic):
+    """Patch dei muri e tile non si scartano mai: senza, l'AI pianificherebbe su una griglia vecchia"""
+    return topic == PATCH_TOPIC or topic == f"maze/tiles/{TILES_CLIENT}"
+
+# Ricerca anytime (ARA*): pesi decrescenti dell'euristica, ultimo = ottimo
+ARA_WEIGHTS = [5.0, 3.0, 2.0, 1.5, 1.2, 1.0]
+DECISION_BUDGET = 0.2  # secondi per la prima decisione
+
 class Node:
     def __init__(self, parent, action, depth, cost, state):
         self.parent = parent
@@ -19,7 +46,7 @@ class Node:
     def expand(self, problem):
         successors = []
         for state, action in problem.successors(self.state):
-            successors += [Node(self, action, self.depth+1, self.cost + problem.cost(self.state), state)]
+            successors += [Node(self, action, self.depth+1, self.cost + problem.cost(state), state)]
         return successors
 
     def solution(self):
@@ -79,7 +106,8 @@ class MazeProblem:
         return new_state
 
     def cost(self, state):
-        return 1
+        """Costo per entrare nella cella (terreno: fango, ghiaccio, porte)"""
+        return cell_cost(self.maze[state[1]][state[0]])
 
     def goal_test(self, state):
         return self.goal_state == state
@@ -107,16 +135,320 @@ class GreedySearch:
 
         return fringe, fringe.pop(0)
 
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+class BidirectionalSearch:
+    """
+    Ricerca bidirezionale partenza <-> uscita (il labirinto non è orientato).
+    heuristic=True: A* bidirezionale front-to-end con Manhattan, stop quando
+    mu <= max(f minimo avanti, f minimo indietro).
+    heuristic=False: BFS/Dijkstra bidirezionale, stop quando mu <= g_min avanti + g_min indietro.
+    mu è il costo del miglior incontro trovato: la condizione garantisce il percorso ottimo.
+    """
+    def __init__(self, problem, heuristic=True):
+        self.problem = problem
+        self.heuristic = heuristic
+
+    def h(self, state, target):
+        return manhattan(state, target) if self.heuristic else 0
+
+    def search(self, on_expand=None):
+        start, goal = tuple(self.problem.initial_state), tuple(self.problem.goal_state)
+        if start == goal:
+            return 'success', [], 0
+
+        # Lato 0: dalla partenza verso l'uscita; lato 1: dall'uscita verso la partenza
+        targets = (goal, start)
+        g = ({start: 0}, {goal: 0})
+        parent = ({start: None}, {goal: None})
+        heaps = ([(self.h(start, goal), start)], [(self.h(goal, start), goal)])
+        closed = (set(), set())
+        mu, meet = math.inf, None
+        expanded = 0
+
+        while heaps[0] and heaps[1]:
+            tops = [self.top(heaps[d], g[d], closed[d], targets[d]) for d in (0, 1)]
+            if None in tops:
+                break
+            bound = max(tops) if self.heuristic else tops[0] + tops[1]
+            if mu <= bound:
+                break
+
+            # Espande il lato con la frontiera più piccola
+            d = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, s = heapq.heappop(heaps[d])
+            closed[d].add(s)
+            expanded += 1
+            if on_expand:
+                on_expand(Node(parent[d][s], None, 0, g[d][s], list(s)))
+
+            for state, _ in self.problem.successors(list(s)):
+                n = tuple(state)
+                # Costo di entrata nel verso reale del percorso (avanti: in n, indietro: in s)
+                new_g = g[d][s] + self.problem.cost(state if d == 0 else list(s))
+                if new_g < g[d].get(n, math.inf):
+                    g[d][n] = new_g
+                    parent[d][n] = s
+                    heapq.heappush(heaps[d], (new_g + self.h(n, targets[d]), n))
+                if n in g[1 - d] and g[d][n] + g[1 - d][n] < mu:
+                    mu, meet = g[d][n] + g[1 - d][n], n
+
+        if meet is None:
+            return 'fail', [], expanded
+
+        # partenza -> incontro (catena del lato 0) + incontro -> uscita (catena del lato 1)
+        path = []
+        s = meet
+        while s is not None:
+            path.append(list(s))
+            s = parent[0][s]
+        path.reverse()
+        s = parent[1][meet]
+        while s is not None:
+            path.append(list(s))
+            s = parent[1][s]
+
+        return 'success', path[1:], expanded
+
+    def top(self, heap, g, closed, target):
+        """f minimo valido della frontiera (scarta le voci scadute)"""
+        while heap:
+            f, s = heap[0]
+            if s not in closed and f == g[s] + self.h(s, target):
+                return f if self.heuristic else g[s]
+            heapq.heappop(heap)
+        return None
+
+class BucketSearch:
+    """
+    A* (o Dijkstra con heuristic=False) con coda a secchi (Dial): i costi sono
+    interi piccoli (TERRAIN_COST) e l'euristica Manhattan è consistente, quindi
+    f non scende mai e cresce al massimo di max_cost + 1 per passo. Bastano
+    max_cost + 2 secchi circolari: inserimento ed estrazione O(1), ricerca
+    quasi lineare nei nodi espansi.
+    """
+    def __init__(self, problem, heuristic=True):
+        self.problem = problem
+        self.heuristic = heuristic
+
+    def h(self, state):
+        return manhattan(state, self.problem.goal_state) if self.heuristic else 0
+
+    def search(self, on_expand=None):
+        start, goal = tuple(self.problem.initial_state), tuple(self.problem.goal_state)
+        span = max(TERRAIN_COST.values()) + 2
+        buckets = [[] for _ in range(span)]
+
+        g = {start: 0}
+        parent = {start: None}
+        closed = set()
+        f = self.h(start)
+        buckets[f % span].append(start)
+        queued = 1
+        expanded = 0
+
+        while queued:
+            # Primo secchio non vuoto a partire da f (LIFO: prima i nodi più profondi)
+            while not buckets[f % span]:
+                f += 1
+            s = buckets[f % span].pop()
+            queued -= 1
+            if s in closed or g[s] + self.h(s) != f:
+                continue  # voce scaduta
+
+            closed.add(s)
+            expanded += 1
+            if on_expand:
+                on_expand(Node(parent[s], None, 0, g[s], list(s)))
+
+            if s == goal:
+                path = []
+                while parent[s] is not None:
+                    path.append(list(s))
+                    s = parent[s]
+                return 'success', path[::-1], expanded
+
+            for state, _ in self.problem.successors(list(s)):
+                n = tuple(state)
+                new_g = g[s] + self.problem.cost(state)
+                if n not in closed and new_g < g.get(n, math.inf):
+                    g[n] = new_g
+                    parent[n] = s
+                    buckets[(new_g + self.h(n)) % span].append(n)
+                    queued += 1
+
+        return 'fail', [], expanded
+
+def graph_search(problem, strategy, on_expand=None, on_frontier=None):
+    """
+    Ricerca su grafo generica.
+    Ritorna (status, path, espansi); on_expand(node) viene chiamata per ogni nodo selezionato,
+    on_frontier(states) con gli stati appena aggiunti alla frontiera
+    """
+    # Strategie con una ricerca propria (bidirezionale)
+    if hasattr(strategy, "search"):
+        return strategy.search(on_expand)
+
+    fringe = [Node(None, None, 0, 0, problem.initial_state)]
+    closed = set()
+    expanded = 0
+
+    while fringe:
+        fringe, node = strategy.select(fringe)
+
+        if not node:
+            return 'fail', [], expanded
+
+        if on_expand:
+            on_expand(node)
+
+        if problem.goal_test(node.state):
+            return 'success', node.solution(), expanded
+
+        if tuple(node.state) not in closed:
+            closed.add(tuple(node.state))
+            expanded += 1
+
+            fringe_states = [v.state for v in fringe]
+            new_nodes = [new_node for new_node in node.expand(problem)
+                         if new_node.state not in fringe_states]
+            fringe.extend(new_nodes)
+            if on_frontier:
+                on_frontier([n.state for n in new_nodes])
+
+    return 'fail', [], expanded
+
+def ara_star(problem, weights=ARA_WEIGHTS, should_stop=None):
+    """
+    ARA* (Likhachev et al.): A* pesato ripetuto con peso decrescente, riusando
+    i valori g della ricerca precedente. Generatore: produce (peso, path, espansi)
+    ogni volta che il percorso migliora; path nel formato di Node.solution().
+    """
+    start, goal = tuple(problem.initial_state), tuple(problem.goal_state)
+    g = {start: 0}
+    parent = {start: None}
+    opened = {start}
+    incons = set()
+    best = math.inf
+    expanded = 0
+
+    for eps in weights:
+        # OPEN = OPEN ∪ INCONS, chiavi ricalcolate col nuovo peso
+        opened |= incons
+        incons = set()
+        closed = set()
+        heap = [(g[s] + eps * manhattan(s, goal), s) for s in opened]
+        heapq.heapify(heap)
+
+        while heap:
+            f, s = heap[0]
+            if s not in opened or f != g[s] + eps * manhattan(s, goal):
+                heapq.heappop(heap)  # voce scaduta
+                continue
+            if g.get(goal, math.inf) <= f:
+                break
+            if should_stop and should_stop():
+                return
+
+            heapq.heappop(heap)
+            opened.discard(s)
+            closed.add(s)
+            expanded += 1
+
+            for state, _ in problem.successors(list(s)):
+                n = tuple(state)
+                new_g = g[s] + problem.cost(state)
+                if new_g < g.get(n, math.inf):
+                    g[n] = new_g
+                    parent[n] = s
+                    if n in closed:
+                        incons.add(n)
+                    else:
+                        opened.add(n)
+                        heapq.heappush(heap, (new_g + eps * manhattan(n, goal), n))
+
+        if g.get(goal, math.inf) < best:
+            best = g[goal]
+            path = []
+            s = goal
+            while parent[s] is not None:
+                path.append(list(s))
+                s = parent[s]
+            yield eps, path[::-1], expanded
+
+class AnytimeSearch:
+    """
+    Esegue ARA* in un thread: plan() ritorna il miglior percorso trovato entro
+    il budget, i miglioramenti successivi arrivano a on_improve in background.
+    """
+    def __init__(self, problem, weights=ARA_WEIGHTS):
+        self.problem = problem
+        self.weights = weights
+        self.best = None
+        self.eps = None
+        self.expanded = 0
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def run(self, on_improve=None):
+        try:
+            for eps, path, expanded in ara_star(self.problem, self.weights, lambda: self.cancelled):
+                self.best, self.eps, self.expanded = path, eps, expanded
+                if on_improve:
+                    on_improve(eps, path)
+        finally:
+            self.done.set()
+
+    def plan(self, budget, on_improve=None):
+        threading.Thread(target=self.run, args=(on_improve,), daemon=True).start()
+        self.done.wait(budget)
+        return self.best
+
+    def cancel(self):
+        self.cancelled = True
+
 class GraphSearch:
-    def __init__(self):
+    def __init__(self, anytime=False, portfolio=False, shared=False):
         self.problem = None
         self.strategy = None
-        self.fringe = []
-        self.closed = []
+
+        # Labirinto dalla memoria condivisa del server invece che da maze/config
+        self.shared = shared
+
+        # Nebbia di guerra (dal descrittore condiviso): niente esplorazione pubblicata,
+        # l'AI cammina il percorso e il server inoltra la sua posizione solo a chi la vede
+        self.fog = False
+
+        # Modalità portfolio: più strategie in parallelo, vince la prima
+        self.portfolio = portfolio
+
+        # Modalità anytime: decisione entro DECISION_BUDGET, poi miglioramenti
+        self.anytime = anytime
+        self.anytime_search = None
+
+        # Percorso che l'AI sta camminando: posizione, celle rimaste e D* Lite
+        # del problema corrente per ripianificare quando arriva una patch
+        self.ai_pos = None
+        self.route = None
+        self.planner = None
+
+        # Astrazione HPA* del labirinto corrente (i processi del portfolio la ereditano)
+        self.hierarchy = None
 
         self.new_config = None
         self.running = False
 
+        # Labirinto a tile in arrivo (maze/config con "tiled"): (TileCache, uscita)
+        self.pending_tiles = None
+
+        # Soluzioni già calcolate (stesso labirinto reinviato, riavvii)
+        self.cache = SolutionCache()
+
+        # Il thread MQTT accoda soltanto, il loop principale gestisce
+        self.bus = MessageBus(BUS_CAPACITY, name="AI", essential=essential_topic)
+        self.maze_updates = 0  # patch applicate, per accorgersi di quelle arrivate durante una ricerca
+
         # MQTT Client
         self.client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
         self.client.on_connect = self.on_mqtt_connect
@@ -124,19 +456,29 @@ class GraphSearch:
         self.client.connect("localhost", 1883, 60)
         threading.Thread(target=self.client.loop_forever, daemon=True).start()
 
+        # Esplorazione a fotogrammi per la heatmap (e per la posizione dell'AI)
+        self.exploration = ExplorationStream(self.client)
+
 
     def run_forever(self):
         """Loop principale che rimane attivo"""
         while True:
-            if self.new_config and not self.running:
-                self.fringe = []
-                self.closed = []
+            self.bus.drain(self.handle_message)
 
+            if self.new_config and not self.running:
                 maze, goal_state = self.new_config
-                self.problem = MazeProblem([1, 65], goal_state, maze)
+                self.problem = MazeProblem([1, len(maze) - 2], goal_state, maze)
                 self.strategy = GreedySearch(self.problem)
                 self.new_config = None  # Reset flag
 
+                if self.anytime:
+                    self.run_anytime()
+                    continue
+
+                if self.portfolio:
+                    self.run_portfolio()
+                    continue
+
                 print("🚀 Avvio ricerca...")
                 start = time.time()
                 status, path = self.run()  # Ora run() può essere bloccante
@@ -144,52 +486,256 @@ class GraphSearch:
                 print(f"✅ Completato: {status}, path: {path}")
                 print(f"Ha impiegato {elapsed:.2f} secondi")
 
+                if self.fog:
+                    self.walk(path)
+
             time.sleep(0.1)  # Piccola pausa per non consumare CPU
 
     def run(self):
         if not self.problem:
             return 'fail', []
 
-        self.fringe.append(Node(None, None, 0, 0, self.problem.initial_state))
-
-        while True:
-            if len(self.fringe) == 0:
-                return 'fail', []
-
-            self.fringe, node = self.strategy.select(self.fringe)
+        key = SolutionCache.key(self.problem.maze, self.problem.initial_state,
+                                self.problem.goal_state, type(self.strategy).__name__)
+        cached = self.cache.get(key)
+        self.exploration.reset()
+
+        if cached:
+            # Niente replay dell'esplorazione: il percorso in un solo fotogramma riassuntivo
+            status, path = cached["status"], cached["path"]
+            if not self.fog:
+                self.exploration.summary(path)
+            print(f"🗃️ Percorso dalla cache ({cached.get('expanded', '?')} nodi espansi all'epoca)")
+        else:
+            updates = self.maze_updates
+            status, path, expanded = graph_search(self.problem, self.strategy,
+                                                  on_expand=None if self.fog else self.publish_node,
+                                                  on_frontier=None if self.fog else self.exploration.add_frontier)
+            if self.maze_updates == updates:
+                self.cache.put(key, {"status": status, "path": path, "expanded": expanded})
+            else:
+                # Muri cambiati a metà ricerca: percorso riparato sulla griglia attuale, niente cache
+                path = DStarLite(self.problem).plan()
+                status = 'success' if path else 'fail'
+                print(f"🧭 Labirinto cambiato durante la ricerca: percorso ripianificato ({len(path)} passi)")
+
+        self.exploration.flush()
+
+        print(f"🗃️ Cache soluzioni: {self.cache.stats()}")
+        return status, path
+
+    def run_anytime(self):
+        if self.anytime_search:
+            self.anytime_search.cancel()
+
+        self.anytime_search = AnytimeSearch(self.problem)
+        path = self.anytime_search.plan(DECISION_BUDGET, on_improve=self.publish_path)
+        if path is None:
+            print(f"⏱️ Nessun percorso entro {DECISION_BUDGET}s, la ricerca continua")
+        else:
+            print(f"⏱️ Decisione entro {DECISION_BUDGET}s: {len(path)} passi (peso {self.anytime_search.eps})")
+
+        self.walk_anytime()
+
+    def walk_anytime(self):
+        """L'AI percorre il miglior percorso finora e passa a ogni percorso migliore appena arriva"""
+        search = self.anytime_search
+        start = self.problem.initial_state
+        taken = None
+        self.start_walk(None)
+
+        while not self.new_config:
+            best = search.best
+            if search is self.anytime_search and best is not None and best is not taken:
+                # Percorso migliorato: lo si segue dalla posizione attuale, se ci passa
+                taken = best
+                states = [start] + best
+                if self.ai_pos in states:
+                    self.route = best[states.index(self.ai_pos):]
+
+            if self.route is None:
+                if search.done.is_set():
+                    print("❌ Nessun percorso trovato")
+                    break
+                time.sleep(0.01)
+            elif not self.route:
+                print("✅ Uscita raggiunta")
+                break
+            else:
+                self.step()
+
+            # Nuove configurazioni (interrompono il percorso) e patch mentre si cammina
+            self.bus.drain(self.handle_message)
+
+        self.planner = None
+
+    def start_walk(self, path):
+        self.ai_pos = list(self.problem.initial_state)
+        self.route = None if path is None else list(path)
+        self.planner = DStarLite(self.problem)
+
+    def step(self):
+        self.ai_pos = self.route.pop(0)
+        self.publish_state(self.ai_pos)
+
+    def walk(self, path):
+        """L'AI percorre path un passo alla volta; tra un passo e l'altro gestisce nuove configurazioni e patch"""
+        self.start_walk(path)
+        while self.route and not self.new_config:
+            self.step()
+            self.bus.drain(self.handle_message)
+        self.planner = None
+
+    def run_portfolio(self):
+        # Import locale: portfolio importa questo modulo
+        from portfolio import solve_portfolio
+
+        # Costruita qui una volta: i processi delle strategie la ereditano, le patch la riparano
+        self.hierarchy = get_hierarchy(self.problem.maze)
+
+        result = solve_portfolio(self.problem.maze, self.problem.initial_state, self.problem.goal_state)
+        if result is None:
+            print("❌ Nessuna strategia ha trovato un percorso")
+            return
+
+        print(f"🏁 Vince {result['winner']} in {result['seconds']:.2f} secondi "
+              f"({len(result['path'])} passi)")
+
+        # L'AI percorre il percorso vincente
+        self.walk(result["path"])
+
+    def publish_path(self, eps, path):
+        # Ogni miglioramento: peso 1.0 = percorso ottimo
+        if not self.fog:  # con la nebbia il percorso mostrerebbe il labirinto
+            self.client.publish("maze/InformedAI/path", json.dumps({"eps": eps, "path": path}))
+        print(f"📈 Percorso migliorato: {len(path)} passi (peso {eps})")
+
+    def publish_node(self, node):
+        self.explore_state(node.state)
+
+    def explore_state(self, state):
+        # Un messaggio ogni FRAME_TIME invece di uno per nodo, stesso ritmo dell'AI
+        self.exploration.close_cell(state)
+        time.sleep(0.06)
+        # La ricerca animata dura secondi: intanto si gestiscono configurazioni e patch
+        self.bus.drain(self.handle_message)
+
+    def publish_state(self, state):
+        self.client.publish("maze/InformedAI", json.dumps(state))
+        time.sleep(0.06)
 
-            if not node:
-                return 'fail', []
+    def on_mqtt_connect(self, client, userdata, flags, rc, properties):
+        print("✅ Server Dashboard connesso a MQTT")
+        client.subscribe(SHARED_TOPIC if self.shared else "maze/config")
+        client.subscribe(PATCH_TOPIC)
+        client.subscribe(f"maze/tiles/{TILES_CLIENT}")
 
-            self.client.publish("maze/InformedAI", json.dumps(node.state))
-            time.sleep(0.06)
+    def on_mqtt_message(self, client, userdata, msg):
+        self.bus.put(msg.topic, msg.payload)
 
-            if self.problem.goal_test(node.state):
-                return 'success', node.solution()
+    def handle_message(self, topic, payload):
+        if not payload:
+            return  # retained cancellato (es. descrittore condiviso dopo un reset)
+        data = json.loads(payload)
 
-            if node.state not in self.closed:
-                self.closed.append(node.state)
+        if topic == SHARED_TOPIC:
+            self.attach_shared(data)
+            return
 
-                fringe_states = [v.state for v in self.fringe]
-                self.fringe.extend([new_node for new_node in node.expand(self.problem)
-                                    if new_node.state not in fringe_states])
+        if topic == PATCH_TOPIC:
+            self.apply_patch(decode_cells(data["cells"]))
+            return
 
+        if topic == f"maze/tiles/{TILES_CLIENT}":
+            self.add_tiles(data)
+            return
 
-    def on_mqtt_connect(self, client, userdata, flags, rc, properties):
-        print("✅ Server Dashboard connesso a MQTT")
-        client.subscribe("maze/config")
-
-    def on_mqtt_message(self, client, userdata, msg):
-        data = json.loads(msg.payload)
         maze = data.get("maze", None)
         goal_state = data.get("exit", None)
 
         if maze and goal_state:
             self.new_config = (maze, goal_state)  # Salva config senza eseguire
             print("✅ Nuova configurazione ricevuta")
+        elif data.get("tiled") and goal_state:
+            self.request_tiles(data, goal_state)
+        elif data.get("game_ready") and goal_state:
+            print("❌ Configurazione senza labirinto (nebbia di guerra?): avvia l'AI con --shared")
+
+    def request_tiles(self, data, goal_state):
+        """Labirinto a tile: l'AI pianifica sull'intera mappa, quindi le chiede tutte"""
+        tiles = TileCache(data["size"], data["tile_size"])
+        self.pending_tiles = (tiles, goal_state)
+        self.client.publish("maze/tiles/request", json.dumps(
+            {"client": TILES_CLIENT, "tiles": [list(t) for t in tiles.all_tiles()]}))
+        print(f"🧩 Labirinto a tile: richieste {len(tiles.all_tiles())} tile")
+
+    def add_tiles(self, data):
+        if self.pending_tiles is None:
+            return
+        tiles, goal_state = self.pending_tiles
+        tiles.add(data)
+        grid = tiles.grid()
+        if grid is not None:
+            self.pending_tiles = None
+            self.new_config = (grid, goal_state)
+            print("✅ Nuova configurazione ricevuta (da tile)")
+
+    def apply_patch(self, cells):
+        """
+        Muri cambiati: griglie, astrazione HPA* e percorso in corso aggiornati solo
+        dove serve. La cache soluzioni usa l'hash del labirinto, le voci vecchie non valgono più
+        """
+        if self.anytime_search:
+            # ARA* legge la griglia dal suo thread: va fermato prima di cambiarla
+            self.anytime_search.cancel()
+            self.anytime_search.done.wait()
+            self.anytime_search = None
+
+        mazes = [self.problem.maze] if self.problem else []
+        if self.new_config:
+            mazes.append(self.new_config[0])
+        if self.hierarchy and all(maze is not self.hierarchy.maze for maze in mazes):
+            mazes.append(self.hierarchy.maze)  # stesso contenuto, altra copia (cache per hash)
+        if self.pending_tiles:
+            for x, y, value in cells:
+                self.pending_tiles[0].set_cell(x, y, value)
+
+        for maze in mazes:
+            # La griglia condivisa l'ha già aggiornata il server
+            if getattr(maze, "flags", None) is None or maze.flags.writeable:
+                apply_cells(maze, cells)
+        self.maze_updates += 1
+        print(f"🧱 Patch del labirinto: {len(cells)} celle")
+
+        changed = [(x, y) for x, y, _ in cells]
+        if self.hierarchy:
+            # Solo i cluster toccati, invece di ricostruire l'astrazione per il nuovo hash
+            self.hierarchy.update_cells(changed)
+
+        if self.planner:
+            # D* Lite ripara solo la parte di soluzione toccata, dalla posizione attuale
+            self.planner.move_start(self.ai_pos)
+            self.planner.update_cells(changed)
+            self.route = self.planner.plan()
+            print(f"🧭 Percorso ripianificato: {len(self.route)} passi")
+
+    def attach_shared(self, descriptor):
+        # Il segmento precedente si chiude da solo quando nessuno ne legge più la griglia
+        self.new_config = (attach(descriptor), descriptor["exit"])
+        self.fog = descriptor.get("fog", False)
+        print(f"✅ Labirinto {descriptor['size']}x{descriptor['size']} in memoria condivisa")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Informed AI")
+    parser.add_argument("--anytime", action="store_true",
+                        help="ARA* con decisione entro DECISION_BUDGET invece della greedy animata")
+    parser.add_argument("--portfolio", action="store_true",
+                        help="strategie in parallelo, l'AI percorre il primo percorso trovato")
+    parser.add_argument("--shared", action="store_true",
+                        help="legge il labirinto dalla memoria condivisa del server (stessa macchina)")
+    args = parser.parse_args()
+
     print("🎮 AVVIO Informed AI...")
-    search = GraphSearch()
+    search = GraphSearch(anytime=args.anytime, portfolio=args.portfolio, shared=args.shared)
     search.run_forever()
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Runtime asyncio per l'Informed AI.
+
+- Il trasporto MQTT gira sul loop: il socket di paho è registrato con
+  add_reader/add_writer, nessun thread di rete.
+- La ricerca (CPU) gira in un processo per sessione, atteso sul loop tramite
+  una pipe: annullare la sessione termina anche il processo, così una nuova
+  configurazione non resta in coda dietro a ricerche ormai inutili.
+- L'esplorazione esce a fotogrammi (ExplorationStream, come GraphSearch),
+  animata con un limite di frequenza (token bucket) per ogni sessione.
+
+Ogni maze/config avvia una sessione; una nuova configurazione annulla quella
+in corso sullo stesso topic. Più sessioni possono essere in volo insieme.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+
+import paho.mqtt.client as mqtt
+
+from GraphSearch import GreedySearch, MazeProblem, graph_search
+from exploration import ExplorationStream
+from maze_catalog import start_positions
+
+
+PUBLISH_RATE = 1 / 0.06  # stesso ritmo di GraphSearch.publish_node
+PUBLISH_BURST = 5
+SEARCH_WORKERS = 2  # ricerche contemporanee al massimo
+
+
+def solve(maze, start, goal, conn):
+    """
+    Ricerca greedy (nel processo della sessione): manda su conn stato, percorso
+    e i passi dell'esplorazione [cella espansa, celle aggiunte alla frontiera]
+    """
+    problem = MazeProblem(start, goal, maze)
+    steps = []
+    status, path, _ = graph_search(problem, GreedySearch(problem),
+                                   on_expand=lambda node: steps.append([node.state, []]),
+                                   on_frontier=lambda states: steps[-1][1].extend(states))
+    conn.send((status, path, steps))
+    conn.close()
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+
+    async def take(self):
+        """Attende (senza bloccare il loop) finché c'è un gettone"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncioMqtt:
+    """Collega il socket di un client paho al loop asyncio"""
+
+    def __init__(self, loop, client):
+        self.loop = loop
+        self.client = client
+        self.misc = None
+
+        client.on_socket_open = self.on_socket_open
+        client.on_socket_close = self.on_socket_close
+        client.on_socket_register_write = self.on_socket_register_write
+        client.on_socket_unregister_write = self.on_socket_unregister_write
+
+    def on_socket_open(self, client, userdata, sock):
+        self.loop.add_reader(sock, client.loop_read)
+        self.misc = self.loop.create_task(self.misc_loop())
+
+    def on_socket_close(self, client, userdata, sock):
+        self.loop.remove_reader(sock)
+        if self.misc:
+            self.misc.cancel()
+
+    def on_socket_register_write(self, client, userdata, sock):
+        self.loop.add_writer(sock, client.loop_write)
+
+    def on_socket_unregister_write(self, client, userdata, sock):
+        self.loop.remove_writer(sock)
+
+    async def misc_loop(self):
+        # Keepalive e ritrasmissioni
+        while self.client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+            await asyncio.sleep(1)
+
+
+class AsyncInformedAI:
+    def __init__(self, host="localhost", port=1883, workers=SEARCH_WORKERS):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.slots = None  # semaforo delle ricerche, creato sul loop
+        self.sessions = {}  # topic -> task della sessione
+
+        self.client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
+        self.client.on_connect = self.on_mqtt_connect
+        self.client.on_message = self.on_mqtt_message
+
+    def on_mqtt_connect(self, client, userdata, flags, rc, properties):
+        print("✅ Informed AI (asyncio) connessa a MQTT")
+        client.subscribe("maze/config")
+
+    def on_mqtt_message(self, client, userdata, msg):
+        # Siamo già sul loop: nessuna coda tra thread
+        data = json.loads(msg.payload)
+        maze = data.get("maze", None)
+        goal_state = data.get("exit", None)
+
+        if maze and goal_state:
+            print("✅ Nuova configurazione ricevuta")
+            self.start_session("maze/InformedAI", maze, goal_state)
+
+    def start_session(self, topic, maze, goal_state):
+        """Avvia una sessione di ricerca; annulla quella in corso sullo stesso topic"""
+        old = self.sessions.get(topic)
+        if old and not old.done():
+            old.cancel()
+
+        start = start_positions(len(maze))["InformedAI"]
+        self.sessions[topic] = asyncio.get_running_loop().create_task(
+            self.session(topic, maze, start, goal_state))
+
+    async def search(self, maze, start, goal_state):
+        """Ricerca in un processo tutto suo; se la sessione viene annullata il processo si termina"""
+        loop = asyncio.get_running_loop()
+
+        async with self.slots:
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=solve, args=(maze, start, goal_state, sender), daemon=True)
+            process.start()
+            sender.close()
+
+            ready = loop.create_future()
+            loop.add_reader(receiver.fileno(), lambda: ready.done() or ready.set_result(None))
+            try:
+                await ready
+                return receiver.recv()
+            finally:
+                loop.remove_reader(receiver.fileno())
+                receiver.close()
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+    async def session(self, topic, maze, start, goal_state):
+        print(f"🚀 Avvio ricerca ({topic})...")
+        t0 = time.time()
+        status, path, steps = await self.search(maze, start, goal_state)
+        print(f"✅ Completato: {status}, {len(steps)} nodi in {time.time() - t0:.2f} secondi")
+
+        # Animazione dell'esplorazione a ritmo limitato, un messaggio per fotogramma
+        stream = ExplorationStream(self.client, f"{topic}/explore")
+        bucket = TokenBucket(PUBLISH_RATE, PUBLISH_BURST)
+        for state, frontier in steps:
+            await bucket.take()
+            stream.add_frontier(frontier)
+            stream.close_cell(state)
+        stream.flush()
+
+        print(f"✅ Esplorazione pubblicata, path: {path}")
+
+    async def run(self):
+        self.slots = asyncio.Semaphore(self.workers)
+        AsyncioMqtt(asyncio.get_running_loop(), self.client)
+        self.client.connect(self.host, self.port, 60)
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            for task in self.sessions.values():
+                task.cancel()
+            self.client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Informed AI su asyncio")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args()
+
+    print("🎮 AVVIO Informed AI (asyncio)...")
+    asyncio.run(AsyncInformedAI(args.host, args.port).run())
@@ -0,0 +1,75 @@
+"""
+Confronto delle strategie dell'Informed AI: nodi espansi, lunghezza del
+percorso e tempo, dalla partenza dell'AI all'uscita.
+
+    python benchmark.py --size 67 --count 20
+    python benchmark.py --size 201 --loops 0.15   # labirinti con cicli
+    python benchmark.py --terrain 0.2             # fango, ghiaccio e porte (costi per cella)
+"""
+import argparse
+import random
+import time
+
+from GraphSearch import BidirectionalSearch, BucketSearch, GreedySearch, MazeProblem, graph_search
+from hpa import HierarchicalSearch
+from maze_catalog import exit_position, start_positions
+from maze_utils import FLOOR, WALL, aggiungi_terreno, cell_cost, genera_labirinto_simmetrico
+
+
+STRATEGIES = {
+    "greedy": lambda p: GreedySearch(p),
+    "bidir-bfs": lambda p: BidirectionalSearch(p, heuristic=False),
+    "bidir-a*": lambda p: BidirectionalSearch(p, heuristic=True),
+    "bucket-a*": lambda p: BucketSearch(p),
+    "hpa*": lambda p: HierarchicalSearch(p),  # ms include la costruzione dell'astrazione, espansi solo la query
+}
+
+
+def open_loops(maze, fraction, rng):
+    """Abbatte una frazione dei muri interni (più percorsi alternativi)"""
+    size = len(maze)
+    walls = [(x, y) for y in range(1, size - 1) for x in range(1, size - 1) if maze[y][x] == WALL]
+    for x, y in rng.sample(walls, int(len(walls) * fraction)):
+        maze[y][x] = FLOOR
+
+
+def run(size, count, loops, seed, terrain=0.0):
+    rng = random.Random(seed)
+    totals = {name: [0, 0, 0, 0.0, 0] for name in STRATEGIES}  # espansi, passi, costo, secondi, successi
+
+    for _ in range(count):
+        maze = genera_labirinto_simmetrico(size, rng)
+        if loops:
+            open_loops(maze, loops, rng)
+        if terrain:
+            aggiungi_terreno(maze, terrain, rng)
+        problem = MazeProblem(start_positions(size)["InformedAI"], exit_position(size), maze)
+
+        for name, make in STRATEGIES.items():
+            t0 = time.perf_counter()
+            status, path, expanded = graph_search(problem, make(problem))
+            elapsed = time.perf_counter() - t0
+
+            totals[name][0] += expanded
+            totals[name][1] += len(path)
+            totals[name][2] += sum(cell_cost(maze[y][x]) for x, y in path)
+            totals[name][3] += elapsed
+            totals[name][4] += status == 'success'
+
+    print(f"📊 {count} labirinti {size}x{size}, cicli {loops:.0%}, terreno {terrain:.0%}")
+    print(f"{'strategia':<12}{'espansi':>10}{'passi':>10}{'costo':>10}{'ms':>10}{'ok':>6}")
+    for name, (expanded, steps, cost, seconds, ok) in totals.items():
+        print(f"{name:<12}{expanded / count:>10.0f}{steps / count:>10.0f}{cost / count:>10.0f}"
+              f"{seconds / count * 1000:>10.1f}{ok:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark delle strategie di ricerca")
+    parser.add_argument("--size", type=int, default=67)
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--loops", type=float, default=0.0, help="frazione di muri interni da abbattere")
+    parser.add_argument("--terrain", type=float, default=0.0, help="frazione dei corridoi con terreno")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.size, args.count, args.loops, args.seed, args.terrain)
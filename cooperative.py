@@ -0,0 +1,230 @@
+"""
+Più Informed AI nello stesso labirinto: WHCA* (Silver, "Cooperative Pathfinding").
+
+Ogni agente pianifica A* spazio-tempo (x, y, t) su una finestra di WINDOW passi,
+evitando le celle e gli scambi già prenotati dagli agenti pianificati prima
+(tabella di prenotazioni). Il terreno lento costa come sul client: entrare in
+una cella di costo c occupa c tick, cioè c - 1 attese prenotate sulla cella.
+Oltre la finestra il costo residuo è quello vero fino all'uscita, preso da un
+unico campo dei costi condiviso da tutti gli agenti: ogni ricerca è quasi
+lineare e il costo totale cresce con il numero di agenti. L'ordine di
+priorità ruota a ogni ripianificazione.
+
+Ogni agente pubblica la sua posizione su maze/InformedAI/<n>.
+"""
+import argparse
+import heapq
+import json
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+from GraphSearch import MazeProblem
+from maze_catalog import start_positions
+from maze_patch import PATCH_TOPIC, apply_cells, cost_field, decode_cells, repair_distances
+from maze_utils import cell_cost
+from message_bus import MessageBus
+from player_registry import fair_starts
+
+
+WINDOW = 8
+REPLAN_EVERY = WINDOW // 2  # passi eseguiti prima di ripianificare
+STEP_TIME = 0.06  # stesso ritmo di GraphSearch.publish_node
+
+
+class CooperativePlanner:
+    def __init__(self, problem, window=WINDOW):
+        self.problem = problem
+        self.goal = tuple(problem.goal_state)
+        self.window = window
+        self.turn = 0
+        self.expanded = 0
+
+        # Costo fino all'uscita (terreno compreso): euristica esatta (senza altri agenti) per tutti
+        self.field = cost_field(problem.maze, self.goal)
+
+    def update_cells(self, cells):
+        """Muri cambiati: ripara il campo dei costi solo dove dipendeva dalle celle toccate"""
+        changed = apply_cells(self.problem.maze, cells)
+        repair_distances(self.field, self.problem.maze, changed)
+        return changed
+
+    def h(self, cell):
+        return int(self.field[cell[1], cell[0]])
+
+    def plan(self, positions, waits=None):
+        """
+        Percorsi di finestra {agente: [[x, y] al tempo 0..window]}; waits = tick
+        che un agente deve ancora passare fermo nel terreno in cui è entrato
+        """
+        waits = waits or {}
+        names = list(positions)
+        shift = self.turn % len(names) if names else 0
+        order = names[shift:] + names[:shift]
+        self.turn += 1
+
+        # L'uscita non si prenota: chi arriva esce dal labirinto
+        reserved = {(tuple(pos), 0) for pos in positions.values() if tuple(pos) != self.goal}
+        swaps = set()
+        plans = {}
+
+        for name in order:
+            path = self.plan_agent(tuple(positions[name]), reserved, swaps, waits.get(name, 0))
+            plans[name] = [list(c) for c in path]
+
+            for t, cell in enumerate(path):
+                if cell != self.goal:
+                    reserved.add((cell, t))
+                if t:
+                    swaps.add((path[t - 1], cell, t - 1))
+
+        return plans
+
+    def plan_agent(self, start, reserved, swaps, wait=0):
+        """A* spazio-tempo sulla finestra (da fermo fino al tick wait); sta fermo se non trova nulla"""
+        window = self.window
+        if start == self.goal or self.h(start) < 0 or wait >= window:
+            return [start] * (window + 1)
+
+        heap = [(wait + self.h(start), wait, wait, start)]
+        parent = {(start, wait): None}
+        g = {(start, wait): wait}
+
+        while heap:
+            _, cost, t, cell = heapq.heappop(heap)
+            if g.get((cell, t)) != cost:
+                continue
+            self.expanded += 1
+
+            if t >= window or cell == self.goal:
+                # Una cella per tick: chi entra nel terreno lento ci resta per le sue attese
+                path = []
+                node = (cell, t)
+                while parent[node] is not None:
+                    prev = parent[node]
+                    path += [node[0]] * (node[1] - prev[1])
+                    node = prev
+                path += [start] * (node[1] + 1)
+                path.reverse()
+                # Arrivato all'uscita: resta lì per il resto della finestra
+                return (path + [cell] * (window + 1 - len(path)))[:window + 1]
+
+            maze = self.problem.maze
+            moves = [(tuple(s), cell_cost(maze[s[1]][s[0]])) for s, _ in self.problem.successors(list(cell))]
+            for nxt, ticks in moves + [(cell, 1)]:
+                if (nxt, cell, t) in swaps or any((nxt, t + k) in reserved for k in range(1, ticks + 1)):
+                    continue
+                new_cost = cost + ticks
+                if new_cost < g.get((nxt, t + ticks), float("inf")):
+                    g[(nxt, t + ticks)] = new_cost
+                    parent[(nxt, t + ticks)] = (cell, t)
+                    heapq.heappush(heap, (new_cost + self.h(nxt), new_cost, t + ticks, nxt))
+
+        return [start] * (window + 1)
+
+
+def agent_starts(maze, exit_pos, count):
+    """La partenza storica dell'AI, poi partenze eque lontane da quelle dei giocatori"""
+    size = len(maze)
+    taken = {tuple(p) for name, p in start_positions(size).items() if name != "InformedAI"}
+    starts = [start_positions(size)["InformedAI"]]
+    for cell in fair_starts(maze, exit_pos, count + len(taken) + 1):
+        if len(starts) == count:
+            break
+        if tuple(cell) not in taken and cell not in starts:
+            starts.append(cell)
+    return starts
+
+
+class CooperativeAI:
+    def __init__(self, count):
+        self.count = count
+        self.new_config = None
+        self.planner = None
+        self.positions = {}
+        self.waits = {}  # tick di attesa rimasti nel terreno lento, per agente
+        self.plans = {}
+        self.step = 0
+
+        # Il thread MQTT accoda soltanto, il loop principale gestisce
+        # Le patch non si scartano mai: il campo dei costi si ripara solo con tutte
+        self.bus = MessageBus(16, name="AI", essential=lambda topic: topic == PATCH_TOPIC)
+
+        self.client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
+        self.client.on_connect = self.on_mqtt_connect
+        self.client.on_message = self.on_mqtt_message
+        self.client.connect("localhost", 1883, 60)
+        threading.Thread(target=self.client.loop_forever, daemon=True).start()
+
+    def on_mqtt_connect(self, client, userdata, flags, rc, properties):
+        print(f"✅ {self.count} Informed AI cooperative connesse a MQTT")
+        client.subscribe("maze/config")
+        client.subscribe(PATCH_TOPIC)
+
+    def on_mqtt_message(self, client, userdata, msg):
+        self.bus.put(msg.topic, msg.payload)
+
+    def handle_message(self, topic, payload):
+        data = json.loads(payload)
+        if topic == PATCH_TOPIC:
+            if self.planner and self.planner.update_cells(decode_cells(data["cells"])):
+                self.plans = {}  # le finestre pianificate possono attraversare i muri nuovi
+            return
+
+        if data.get("maze") and data.get("exit"):
+            self.new_config = (data["maze"], data["exit"])
+            print("✅ Nuova configurazione ricevuta")
+
+    def start(self, maze, exit_pos):
+        starts = agent_starts(maze, exit_pos, self.count)
+        self.planner = CooperativePlanner(MazeProblem(starts[0], exit_pos, maze))
+        self.positions = {str(i + 1): start for i, start in enumerate(starts)}
+        self.waits = {}
+        self.plans = {}
+        self.step = 0
+        print(f"🚀 {len(self.positions)} agenti in partenza da {list(self.positions.values())}")
+
+    def advance(self):
+        """Un passo per ogni agente; ripianifica ogni REPLAN_EVERY passi"""
+        if not self.plans or self.step >= REPLAN_EVERY:
+            self.plans = self.planner.plan(self.positions, self.waits)
+            self.step = 0
+
+        self.step += 1
+        maze = self.planner.problem.maze
+        for name, path in self.plans.items():
+            pos = path[self.step]
+            if pos != self.positions[name]:
+                self.positions[name] = pos
+                self.waits[name] = cell_cost(maze[pos[1]][pos[0]]) - 1
+                self.client.publish(f"maze/InformedAI/{name}", json.dumps(pos))
+            else:
+                self.waits[name] = max(0, self.waits.get(name, 0) - 1)
+
+        return all(tuple(p) == self.planner.goal for p in self.positions.values())
+
+    def run_forever(self):
+        while True:
+            self.bus.drain(self.handle_message)
+
+            if self.new_config:
+                self.start(*self.new_config)
+                self.new_config = None
+
+            if self.planner and self.positions:
+                if self.advance():
+                    print(f"✅ Tutti gli agenti hanno raggiunto l'uscita "
+                          f"({self.planner.expanded} espansioni in totale)")
+                    self.positions = {}
+
+            time.sleep(STEP_TIME)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Informed AI cooperative (WHCA*)")
+    parser.add_argument("--agents", type=int, default=3)
+    args = parser.parse_args()
+
+    print("🎮 AVVIO Informed AI cooperative...")
+    CooperativeAI(args.agents).run_forever()
@@ -0,0 +1,210 @@
+"""
+Ripianificazione incrementale con D* Lite (Koenig & Likhachev) sopra MazeProblem.
+
+La ricerca parte da un estremo fisso (root) e mantiene g/rhs per ogni cella:
+quando cambiano delle celle o si sposta l'altro estremo (probe) si ripara solo
+la parte di soluzione toccata, invece di ricominciare da zero.
+
+anchor="goal": root = uscita, si sposta la partenza (l'AI che cammina).
+anchor="start": root = AI ferma, si sposta il bersaglio (un giocatore da inseguire).
+Spostare il root invece richiede una ricerca nuova.
+"""
+import heapq
+
+from maze_utils import is_walkable
+
+
+INF = float("inf")
+
+
+class DStarLite:
+    def __init__(self, problem, anchor="goal"):
+        self.problem = problem
+        self.anchor = anchor
+        self.expanded = 0
+
+        start, goal = tuple(problem.initial_state), tuple(problem.goal_state)
+        root, probe = (goal, start) if anchor == "goal" else (start, goal)
+        self.probe = probe
+        self.reset(root)
+
+    # ---------- Griglia ----------
+
+    def walkable(self, s):
+        maze = self.problem.maze
+        x, y = s
+        return 0 <= y < len(maze) and 0 <= x < len(maze[0]) and is_walkable(maze[y][x])
+
+    def neighbors(self, s):
+        x, y = s
+        return [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
+
+    def cost(self, a, b):
+        if not (self.walkable(a) and self.walkable(b)):
+            return INF
+        # Costo di entrata nel verso reale del cammino (verso il root solo con anchor="goal")
+        return self.problem.cost(list(b if self.anchor == "goal" else a))
+
+    def heuristic(self, a, b):
+        # Manhattan: ammissibile con costo 1 per passo
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    # ---------- D* Lite ----------
+
+    def reset(self, root):
+        """Nuova ricerca da root (anche quando si sposta l'estremo fisso)"""
+        self.root = tuple(root)
+        self.last = self.probe
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.root: 0}
+        self.queue = []
+        self.queued = {}  # stato -> chiave attuale (le altre nell'heap sono scadute)
+        self.push(self.root)
+
+    def key(self, s):
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return m + self.heuristic(self.probe, s) + self.km, m
+
+    def push(self, s):
+        k = self.key(s)
+        self.queued[s] = k
+        heapq.heappush(self.queue, (k, s))
+
+    def update_vertex(self, u):
+        if u != self.root:
+            self.rhs[u] = min((self.cost(u, s) + self.g.get(s, INF) for s in self.neighbors(u)),
+                              default=INF)
+
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self.push(u)
+        else:
+            self.queued.pop(u, None)
+
+    def top(self):
+        # Scarta le voci scadute
+        while self.queue:
+            k, s = self.queue[0]
+            if self.queued.get(s) == k:
+                return k, s
+            heapq.heappop(self.queue)
+        return (INF, INF), None
+
+    def compute_shortest_path(self):
+        probe = self.probe
+        while True:
+            k_old, u = self.top()
+            if u is None or not (k_old < self.key(probe)
+                                 or self.rhs.get(probe, INF) != self.g.get(probe, INF)):
+                break
+
+            heapq.heappop(self.queue)
+            del self.queued[u]
+            self.expanded += 1
+
+            k_new = self.key(u)
+            if k_old < k_new:
+                self.push(u)
+            elif self.g.get(u, INF) > self.rhs.get(u, INF):
+                self.g[u] = self.rhs[u]
+                for s in self.neighbors(u):
+                    self.update_vertex(s)
+            else:
+                self.g[u] = INF
+                for s in self.neighbors(u) + [u]:
+                    self.update_vertex(s)
+
+    # ---------- API ----------
+
+    def plan(self):
+        """Percorso [x, y] dalla partenza all'uscita (esclusa la partenza, come Node.solution)"""
+        self.compute_shortest_path()
+        if self.g.get(self.probe, INF) == INF:
+            return []
+
+        # Discesa del gradiente di g dal probe al root
+        path = [self.probe]
+        s = self.probe
+        limit = len(self.problem.maze) * len(self.problem.maze[0])
+        while s != self.root and len(path) <= limit:
+            s = min(self.neighbors(s), key=lambda n: self.cost(s, n) + self.g.get(n, INF))
+            path.append(s)
+
+        if self.anchor == "start":
+            path.reverse()
+        return [list(s) for s in path[1:]]
+
+    def move_probe(self, pos):
+        """L'estremo mobile si è spostato: basta correggere km"""
+        pos = tuple(pos)
+        self.km += self.heuristic(self.last, pos)
+        self.last = pos
+        self.probe = pos
+
+    def move_start(self, pos):
+        if self.anchor == "goal":
+            self.move_probe(pos)
+        else:
+            self.reset(pos)
+
+    def move_goal(self, pos):
+        if self.anchor == "start":
+            self.move_probe(pos)
+        else:
+            self.reset(pos)
+
+    def update_cells(self, cells):
+        """Celle [x, y] cambiate in problem.maze: aggiorna solo loro e i vicini"""
+        touched = set()
+        for x, y in cells:
+            touched.add((x, y))
+            touched.update(self.neighbors((x, y)))
+
+        for s in touched:
+            self.update_vertex(s)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from GraphSearch import MazeProblem
+    from maze_catalog import exit_position, start_positions
+    from maze_utils import FLOOR, WALL, genera_labirinto_simmetrico
+
+    size = 67
+    rng = random.Random(0)
+    maze = genera_labirinto_simmetrico(size, rng)
+    problem = MazeProblem(start_positions(size)["InformedAI"], exit_position(size), maze)
+
+    planner = DStarLite(problem)
+    path = planner.plan()
+    print(f"🧭 Primo piano: {len(path)} passi, {planner.expanded} espansioni")
+
+    # Muri che cambiano mentre l'AI cammina
+    for step in range(10):
+        planner.move_start(path[0])
+        # Si aprono 3 muri e se ne chiudono 2 fuori dal percorso attuale
+        interior = [(x, y) for y in range(1, size - 1) for x in range(1, size - 1)]
+        walls = [c for c in interior if maze[c[1]][c[0]] == WALL]
+        on_path = {tuple(p) for p in path} | {planner.probe}
+        floors = [c for c in interior if maze[c[1]][c[0]] == FLOOR and c not in on_path]
+        opened, closed = rng.sample(walls, 3), rng.sample(floors, 2)
+        for x, y in opened:
+            maze[y][x] = FLOOR
+        for x, y in closed:
+            maze[y][x] = WALL
+        changed = opened + closed
+
+        before = planner.expanded
+        t0 = time.perf_counter()
+        planner.update_cells(changed)
+        path = planner.plan()
+        ms = (time.perf_counter() - t0) * 1000
+
+        scratch = DStarLite(MazeProblem(list(planner.probe), problem.goal_state, maze))
+        scratch.plan()
+        print(f"  ripianificazione {step}: {planner.expanded - before} espansioni "
+              f"({ms:.1f} ms) contro {scratch.expanded} da zero, percorso {len(path)}")
+        if not path:
+            break
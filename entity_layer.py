@@ -0,0 +1,93 @@
+"""
+Strato entità del client: uscita, giocatori e bot come sprite in una SpriteList.
+
+Le posizioni si aggiornano in place e tutto si disegna con una sola chiamata,
+anche con centinaia di agenti. Le entità non sono fisse: vengono create
+quando arriva il primo messaggio che le nomina. Quelle fuori dalla vista
+della camera restano nella lista ma non si disegnano (cull).
+"""
+import zlib
+
+import arcade
+from PIL import Image, ImageDraw
+
+from maze_camera import cell_center
+from maze_renderer import CELL_PX
+
+
+TEXTURE_PX = 64
+OUTLINE_PX = 6
+
+ENTITY_COLORS = {
+    "exit": arcade.color.GOLD,
+    "player1": arcade.color.CRIMSON,
+    "player2": arcade.color.GREEN,
+    "InformedAI": arcade.color.BLACK,
+}
+PALETTE = [
+    arcade.color.ORANGE, arcade.color.CYAN, arcade.color.MAGENTA, arcade.color.YELLOW,
+    arcade.color.LIME, arcade.color.PINK, arcade.color.VIOLET, arcade.color.AZURE,
+]
+
+_textures = {}
+
+
+def entity_color(entity_id):
+    """Colore fisso per gli id noti, altrimenti stabile dalla palette"""
+    if entity_id in ENTITY_COLORS:
+        return ENTITY_COLORS[entity_id]
+    return PALETTE[zlib.crc32(entity_id.encode()) % len(PALETTE)]
+
+
+def circle_texture(color):
+    """Cerchio pieno con contorno nero (una texture per colore)"""
+    color = tuple(color)
+    if color not in _textures:
+        img = Image.new("RGBA", (TEXTURE_PX, TEXTURE_PX), (0, 0, 0, 0))
+        ImageDraw.Draw(img).ellipse(
+            [0, 0, TEXTURE_PX - 1, TEXTURE_PX - 1],
+            fill=color, outline=(0, 0, 0, 255), width=OUTLINE_PX)
+        _textures[color] = arcade.Texture(img, hash=f"entity-{color}",
+                                          hit_box_algorithm=arcade.hitbox.algo_bounding_box)
+    return _textures[color]
+
+
+class EntityLayer:
+    def __init__(self):
+        self.sprite_list = arcade.SpriteList()
+        self.sprites = {}  # id entità -> sprite
+        self.cells = {}  # id entità -> cella [x, y]
+
+    def update(self, entity_id, pos, radius_cells=1.0, color=None):
+        """Crea l'entità al primo messaggio, poi la sposta soltanto"""
+        if pos is None:
+            return
+
+        sprite = self.sprites.get(entity_id)
+        if sprite is None:
+            sprite = arcade.Sprite(circle_texture(color or entity_color(entity_id)))
+            sprite.scale = 2 * radius_cells * CELL_PX / TEXTURE_PX
+            self.sprites[entity_id] = sprite
+            self.sprite_list.append(sprite)
+
+        sprite.position = cell_center(pos)
+        self.cells[entity_id] = pos
+
+    def remove(self, entity_id):
+        sprite = self.sprites.pop(entity_id, None)
+        self.cells.pop(entity_id, None)
+        if sprite is not None:
+            sprite.remove_from_sprite_lists()
+
+    def clear(self):
+        self.sprite_list.clear()
+        self.sprites = {}
+        self.cells = {}
+
+    def cull(self, cell_visible):
+        """Nasconde le entità le cui celle non passano cell_visible (es. MazeCamera.cell_visible)"""
+        for entity_id, sprite in self.sprites.items():
+            sprite.visible = cell_visible(self.cells[entity_id])
+
+    def draw(self):
+        self.sprite_list.draw()
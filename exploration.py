@@ -0,0 +1,65 @@
+"""
+Flusso dell'esplorazione dell'AI a fotogrammi.
+
+Invece di un messaggio per nodo, le celle chiuse e quelle aggiunte alla
+frontiera si accumulano e partono insieme ogni FRAME_TIME secondi su
+maze/InformedAI/explore, come liste piatte [x0, y0, x1, y1, ...]:
+
+    {"seq": 3, "closed": [...], "frontier": [...], "pos": [x, y]}
+
+seq riparte da 0 a ogni nuova ricerca (il client azzera la heatmap).
+"""
+import json
+import time
+
+
+EXPLORE_TOPIC = "maze/InformedAI/explore"
+FRAME_TIME = 0.1
+
+
+class ExplorationStream:
+    def __init__(self, client, topic=EXPLORE_TOPIC, frame_time=FRAME_TIME):
+        self.client = client
+        self.topic = topic
+        self.frame_time = frame_time
+        self.reset()
+
+    def reset(self):
+        self.seq = 0
+        self.closed = []
+        self.frontier = []
+        self.pos = None
+        self.last_flush = time.monotonic()
+
+    def close_cell(self, state):
+        self.closed += state[:2]
+        self.pos = state
+        self.maybe_flush()
+
+    def add_frontier(self, states):
+        for state in states:
+            self.frontier += state[:2]
+
+    def summary(self, states):
+        """Un solo fotogramma con tutte le celle, senza animazione (es. percorso dalla cache)"""
+        for state in states:
+            self.closed += state[:2]
+        if states:
+            self.pos = states[-1]
+        self.flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.frame_time:
+            self.flush()
+
+    def flush(self):
+        if not self.closed and not self.frontier:
+            return
+
+        frame = {"seq": self.seq, "closed": self.closed, "frontier": self.frontier, "pos": self.pos}
+        self.client.publish(self.topic, json.dumps(frame, separators=(",", ":")))
+
+        self.seq += 1
+        self.closed = []
+        self.frontier = []
+        self.last_flush = time.monotonic()
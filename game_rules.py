@@ -0,0 +1,44 @@
+"""
+Regole di gioco condivise (nessuna dipendenza da arcade o MQTT).
+"""
+from collections import deque
+
+from maze_utils import is_walkable
+
+
+def in_bounds(maze, pos):
+    return 0 <= pos[1] < len(maze) and 0 <= pos[0] < len(maze[0])
+
+
+def is_valid_move(maze, old_pos, new_pos, max_steps=1):
+    """new_pos è raggiungibile da old_pos in al massimo max_steps passi ortogonali?"""
+    if not in_bounds(maze, new_pos) or not is_walkable(maze[new_pos[1]][new_pos[0]]):
+        return False
+
+    start, goal = tuple(old_pos), tuple(new_pos)
+    if start == goal:
+        return True
+    if abs(goal[0] - start[0]) + abs(goal[1] - start[1]) > max_steps:
+        return False
+
+    # BFS limitata: costo proporzionale a max_steps, non al labirinto
+    seen = {start}
+    frontier = deque([(start, 0)])
+    while frontier:
+        (x, y), d = frontier.popleft()
+        if d == max_steps:
+            continue
+        for nxt in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if nxt in seen or not in_bounds(maze, nxt) or not is_walkable(maze[nxt[1]][nxt[0]]):
+                continue
+            if nxt == goal:
+                return True
+            seen.add(nxt)
+            frontier.append((nxt, d + 1))
+
+    return False
+
+
+def reached_exit(pos, exit_pos):
+    """Vittoria: giocatore sull'uscita o in una delle 8 celle attorno"""
+    return abs(pos[0] - exit_pos[0]) <= 1 and abs(pos[1] - exit_pos[1]) <= 1
@@ -0,0 +1,97 @@
+"""
+Heatmap dell'esplorazione dell'AI sul client.
+
+Un pixel per cella in una sola immagine RGBA, disegnata come un unico sprite
+scalato di CELL_PX. I fotogrammi di maze/InformedAI/explore colorano solo i
+pixel nuovi; la texture nell'atlas si ricarica al massimo una volta per frame
+e solo se qualcosa è cambiato: niente forme per cella, un solo draw.
+"""
+import itertools
+
+import arcade
+from PIL import Image
+
+from maze_renderer import CELL_PX
+
+
+# Colori (RGBA): le celle chiuse passano da fredde a calde con l'avanzare della ricerca
+COLD = (40, 120, 255, 150)
+HOT = (255, 60, 30, 170)
+FRONTIER = (0, 255, 255, 90)
+HEAT_FRAMES = 100  # fotogrammi per arrivare al colore più caldo
+
+_ids = itertools.count()
+
+
+def heat_color(seq):
+    t = min(seq / HEAT_FRAMES, 1.0)
+    return tuple(int(c + (h - c) * t) for c, h in zip(COLD, HOT))
+
+
+class HeatmapLayer:
+    def __init__(self):
+        self.sprite_list = arcade.SpriteList()
+        self.texture = None
+        self.pixels = None
+        self.size = None
+        self.dirty = False
+
+    def reset(self, size):
+        """Heatmap vuota per un labirinto size x size (stessa dimensione = stessa texture)"""
+        if size != self.size:
+            image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+            self.texture = arcade.Texture(image, hash=f"heatmap-{next(_ids)}",
+                                          hit_box_algorithm=arcade.hitbox.algo_bounding_box)
+            self.pixels = image.load()
+            self.size = size
+
+            sprite = arcade.Sprite(self.texture, scale=CELL_PX)
+            sprite.position = (size * CELL_PX / 2, size * CELL_PX / 2)
+            self.sprite_list.clear()
+            self.sprite_list.append(sprite)
+        else:
+            self.texture.image.paste((0, 0, 0, 0), (0, 0, size, size))
+            self.dirty = True
+
+    def clear(self):
+        self.sprite_list.clear()
+        self.texture = None
+        self.pixels = None
+        self.size = None
+        self.dirty = False
+
+    def apply(self, frame):
+        """Colora le celle di un fotogramma; seq 0 = nuova ricerca"""
+        if self.size is None:
+            return
+        if frame.get("seq") == 0:
+            self.reset(self.size)
+
+        size = self.size
+        closed = frame.get("closed", [])
+        color = heat_color(frame.get("seq", 0))
+        for i in range(0, len(closed) - 1, 2):
+            x, y = closed[i], closed[i + 1]
+            if 0 <= x < size and 0 <= y < size:
+                # Nell'immagine la riga 0 è in alto, nel labirinto y=0 è in basso
+                self.pixels[x, size - 1 - y] = color
+
+        frontier = frame.get("frontier", [])
+        for i in range(0, len(frontier) - 1, 2):
+            x, y = frontier[i], frontier[i + 1]
+            if 0 <= x < size and 0 <= y < size and self.pixels[x, size - 1 - y][3] == 0:
+                self.pixels[x, size - 1 - y] = FRONTIER
+
+        self.dirty = True
+
+    def draw(self):
+        if self.texture is None:
+            return
+
+        # Ricarica la texture nell'atlas solo se cambiata (al primo draw ci entra già aggiornata)
+        if self.dirty:
+            atlas = self.sprite_list.atlas or arcade.get_window().ctx.default_atlas
+            if atlas.has_texture(self.texture):
+                atlas.update_texture_image(self.texture)
+            self.dirty = False
+        self.sprite_list.draw(pixelated=True)
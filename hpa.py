@@ -0,0 +1,298 @@
+"""
+Pathfinding gerarchico (HPA*, Botea et al.) per labirinti grandi.
+
+Il labirinto è diviso in cluster CLUSTER_SIZE x CLUSTER_SIZE. Sui bordi tra
+cluster adiacenti si scelgono le entrate; dentro ogni cluster si precalcolano
+i costi entrata -> entrata (Dijkstra, terreno compreso: entrare in una cella
+costa cell_cost). Una query cerca sul grafo astratto (poche entrate invece di
+tutte le celle) e poi raffina solo i segmenti scelti.
+
+L'astrazione è in cache per contenuto del labirinto (stessa per tutti gli
+agenti e i riavvii) e si invalida per cluster quando cambiano delle celle.
+"""
+import heapq
+
+from maze_utils import cell_cost, is_walkable, maze_hash
+
+
+CLUSTER_SIZE = 16
+MAX_RUN = 6  # tratti di bordo più lunghi hanno due entrate (agli estremi)
+CACHE_SIZE = 8
+
+_cache = {}  # hash labirinto -> HierarchicalMap
+
+
+def get_hierarchy(maze, cluster_size=CLUSTER_SIZE):
+    """Astrazione del labirinto, costruita una volta per contenuto"""
+    key = (maze_hash(maze), cluster_size)
+    hierarchy = _cache.pop(key, None) or HierarchicalMap(maze, cluster_size)
+    _cache[key] = hierarchy  # più recente in fondo
+
+    while len(_cache) > CACHE_SIZE:
+        _cache.pop(next(iter(_cache)))
+    return hierarchy
+
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class HierarchicalMap:
+    def __init__(self, maze, cluster_size=CLUSTER_SIZE):
+        self.maze = maze
+        self.cluster_size = cluster_size
+        self.width, self.height = len(maze[0]), len(maze)
+        self.clusters_x = -(-self.width // cluster_size)
+        self.clusters_y = -(-self.height // cluster_size)
+
+        self.borders = {}   # (cluster, cluster vicino) -> [(cella, cella)] transizioni
+        self.links = {}     # entrata -> entrate collegate nel cluster vicino (costo della cella)
+        self.intra = {}     # cluster -> {entrata: {entrata: costo}}
+        self.segments = {}  # cluster -> {(a, b): celle} segmenti già raffinati
+        self.expanded = 0
+
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                if cx + 1 < self.clusters_x:
+                    self.build_border((cx, cy), (cx + 1, cy))
+                if cy + 1 < self.clusters_y:
+                    self.build_border((cx, cy), (cx, cy + 1))
+
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                self.build_cluster((cx, cy))
+
+    # ---------- Geometria ----------
+
+    def cluster_of(self, cell):
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def bounds(self, cluster):
+        cx, cy = cluster
+        x0, y0 = cx * self.cluster_size, cy * self.cluster_size
+        return x0, y0, min(x0 + self.cluster_size, self.width), min(y0 + self.cluster_size, self.height)
+
+    def walkable(self, cell):
+        return is_walkable(self.maze[cell[1]][cell[0]])
+
+    def cost(self, cell):
+        return cell_cost(self.maze[cell[1]][cell[0]])
+
+    def entrances(self, cluster):
+        nodes = set()
+        for (a, b), transitions in self.borders.items():
+            if cluster == a:
+                nodes.update(t[0] for t in transitions)
+            elif cluster == b:
+                nodes.update(t[1] for t in transitions)
+        return nodes
+
+    def local_search(self, source, cluster, targets=None):
+        """Dijkstra dentro i confini del cluster (costo = ingresso nella cella): (costi, genitori)"""
+        x0, y0, x1, y1 = self.bounds(cluster)
+        dist = {source: 0}
+        parent = {source: None}
+        heap = [(0, source)]
+        closed = set()
+        remaining = set(targets) if targets is not None else None
+
+        while heap:
+            d, (x, y) = heapq.heappop(heap)
+            if (x, y) in closed:
+                continue
+            closed.add((x, y))
+            self.expanded += 1
+            if remaining is not None:
+                remaining.discard((x, y))
+                if not remaining:
+                    break
+            for n in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if x0 <= n[0] < x1 and y0 <= n[1] < y1 and self.walkable(n):
+                    nd = d + self.cost(n)
+                    if nd < dist.get(n, float("inf")):
+                        dist[n] = nd
+                        parent[n] = (x, y)
+                        heapq.heappush(heap, (nd, n))
+
+        return dist, parent
+
+    # ---------- Costruzione astrazione ----------
+
+    def build_border(self, a, b):
+        """Entrate sul bordo tra i cluster a (sinistra/sotto) e b (destra/sopra)"""
+        ax0, ay0, ax1, ay1 = self.bounds(a)
+        if b[0] != a[0]:
+            pairs = [((ax1 - 1, y), (ax1, y)) for y in range(ay0, ay1)]
+        else:
+            pairs = [((x, ay1 - 1), (x, ay1)) for x in range(ax0, ax1)]
+
+        # Tratti contigui percorribili da entrambi i lati
+        runs, run = [], []
+        for pa, pb in pairs:
+            if self.walkable(pa) and self.walkable(pb):
+                run.append((pa, pb))
+            elif run:
+                runs.append(run)
+                run = []
+        if run:
+            runs.append(run)
+
+        transitions = []
+        for run in runs:
+            if len(run) < MAX_RUN:
+                transitions.append(run[len(run) // 2])
+            else:
+                transitions += [run[0], run[-1]]
+
+        # Sostituisce le transizioni precedenti di questo bordo
+        for pa, pb in self.borders.get((a, b), []):
+            for x, y in ((pa, pb), (pb, pa)):
+                self.links[x].discard(y)
+                if not self.links[x]:
+                    del self.links[x]
+        self.borders[(a, b)] = transitions
+        for pa, pb in transitions:
+            self.links.setdefault(pa, set()).add(pb)
+            self.links.setdefault(pb, set()).add(pa)
+
+    def build_cluster(self, cluster):
+        """Costi entrata -> entrata dentro il cluster"""
+        nodes = self.entrances(cluster)
+        edges = {}
+        for node in nodes:
+            dist, _ = self.local_search(node, cluster)
+            edges[node] = {other: dist[other] for other in nodes if other != node and other in dist}
+
+        self.intra[cluster] = edges
+        self.segments[cluster] = {}
+
+    def update_cells(self, cells):
+        """Celle [x, y] cambiate: ricostruisce solo i cluster toccati e i loro bordi"""
+        touched = {self.cluster_of(tuple(c)) for c in cells}
+
+        rebuild = set(touched)
+        for cx, cy in touched:
+            for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                if 0 <= nx < self.clusters_x and 0 <= ny < self.clusters_y:
+                    a, b = sorted([(cx, cy), (nx, ny)], key=lambda c: (c[1], c[0]))
+                    self.build_border(a, b)
+                    rebuild.add((nx, ny))
+
+        for cluster in rebuild:
+            self.build_cluster(cluster)
+
+        # L'astrazione ora corrisponde al nuovo contenuto del labirinto
+        for key, hierarchy in list(_cache.items()):
+            if hierarchy is self:
+                del _cache[key]
+        _cache[(maze_hash(self.maze), self.cluster_size)] = self
+
+        return rebuild
+
+    # ---------- Query ----------
+
+    def find_path(self, start, goal):
+        """Percorso [x, y] da start a goal (escluso start, come Node.solution); [] se non esiste"""
+        start, goal = tuple(start), tuple(goal)
+        if start == goal:
+            return []
+
+        # Inserimento temporaneo di start e goal nel grafo astratto
+        extra = {}
+        start_cluster, goal_cluster = self.cluster_of(start), self.cluster_of(goal)
+
+        dist, _ = self.local_search(start, start_cluster)
+        extra[start] = {e: d for e, d in dist.items() if e in self.intra[start_cluster]}
+        if start_cluster == goal_cluster and goal in dist:
+            extra[start][goal] = dist[goal]
+
+        # Cercando all'indietro dal goal si paga l'ingresso in e invece che nel goal
+        dist, _ = self.local_search(goal, goal_cluster)
+        for e, d in dist.items():
+            if e in self.intra[goal_cluster]:
+                extra.setdefault(e, {})[goal] = d - self.cost(e) + self.cost(goal)
+
+        abstract = self.abstract_search(start, goal, extra)
+        if abstract is None:
+            return []
+
+        # Raffinamento dei soli segmenti scelti
+        path = []
+        for a, b in zip(abstract, abstract[1:]):
+            path += self.refine(a, b)
+        return [list(c) for c in path]
+
+    def abstract_search(self, start, goal, extra):
+        g = {start: 0}
+        parent = {start: None}
+        heap = [(manhattan(start, goal), start)]
+        closed = set()
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node in closed:
+                continue
+            if node == goal:
+                chain = []
+                while node is not None:
+                    chain.append(node)
+                    node = parent[node]
+                return chain[::-1]
+
+            closed.add(node)
+            self.expanded += 1
+
+            neighbors = dict(self.intra.get(self.cluster_of(node), {}).get(node, {}))
+            for other in self.links.get(node, ()):
+                neighbors[other] = self.cost(other)
+            for other, cost in extra.get(node, {}).items():
+                neighbors[other] = min(cost, neighbors.get(other, cost))
+
+            for other, cost in neighbors.items():
+                new_g = g[node] + cost
+                if new_g < g.get(other, float("inf")):
+                    g[other] = new_g
+                    parent[other] = node
+                    heapq.heappush(heap, (new_g + manhattan(other, goal), other))
+
+        return None
+
+    def refine(self, a, b):
+        """Celle da a (esclusa) a b (inclusa)"""
+        if b in self.links.get(a, ()):
+            return [b]
+
+        cluster = self.cluster_of(a)
+        cache = self.segments[cluster]
+        cacheable = a in self.intra[cluster] and b in self.intra[cluster]
+        if cacheable and (a, b) in cache:
+            return cache[(a, b)]
+
+        _, parent = self.local_search(a, cluster, targets=[b])
+        segment = []
+        node = b
+        while node != a:
+            segment.append(node)
+            node = parent[node]
+        segment.reverse()
+
+        if cacheable:
+            cache[(a, b)] = segment
+        return segment
+
+
+class HierarchicalSearch:
+    """Strategia per graph_search: HPA* sull'astrazione in cache del labirinto"""
+    def __init__(self, problem, cluster_size=CLUSTER_SIZE):
+        self.problem = problem
+        self.cluster_size = cluster_size
+
+    def search(self, on_expand=None):
+        hierarchy = get_hierarchy(self.problem.maze, self.cluster_size)
+        before = hierarchy.expanded
+        path = hierarchy.find_path(self.problem.initial_state, self.problem.goal_state)
+        expanded = hierarchy.expanded - before
+
+        if not path and self.problem.initial_state != self.problem.goal_state:
+            return 'fail', [], expanded
+        return 'success', path, expanded
@@ -0,0 +1,85 @@
+"""
+Camera del client: segue il giocatore locale con livelli di zoom.
+
+Il labirinto vive in coordinate mondo fisse (CELL_PX pixel per cella),
+la dimensione a schermo la decide solo lo zoom.
+"""
+import arcade
+
+from maze_renderer import CELL_PX
+
+
+ZOOM_LEVELS = [0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0]
+MIN_FIT_ZOOM = 0.5  # sotto questo zoom il labirinto intero non si legge più
+FOLLOW_SPEED = 10.0  # quanto velocemente la camera raggiunge il giocatore
+
+
+def cell_center(pos):
+    """Centro in coordinate mondo della cella [x, y]"""
+    return pos[0] * CELL_PX + CELL_PX / 2, pos[1] * CELL_PX + CELL_PX / 2
+
+
+class MazeCamera:
+    def __init__(self, window):
+        self.window = window
+        self.camera = arcade.Camera2D()
+        self.zoom_index = ZOOM_LEVELS.index(1.0)
+        self.maze_size = None
+
+    def reset(self, maze_size):
+        """Nuovo labirinto: zoom che lo mostra tutto se ci sta, altrimenti 1:1"""
+        self.maze_size = maze_size
+        world = maze_size * CELL_PX
+        fit = min(self.window.width, self.window.height) / world
+
+        if fit >= MIN_FIT_ZOOM:
+            self.zoom_index = max((i for i, z in enumerate(ZOOM_LEVELS) if z <= fit), default=0)
+            self.camera.zoom = fit
+        else:
+            self.zoom_index = ZOOM_LEVELS.index(1.0)
+            self.camera.zoom = 1.0
+
+        self.camera.position = (world / 2, world / 2)
+
+    def zoom(self, step):
+        self.zoom_index = max(0, min(len(ZOOM_LEVELS) - 1, self.zoom_index + step))
+        self.camera.zoom = ZOOM_LEVELS[self.zoom_index]
+
+    def match_window(self):
+        self.camera.match_window()
+
+    def follow(self, pos, delta_time):
+        """Segue pos; se il labirinto sta tutto a schermo resta centrata su di esso"""
+        if self.maze_size is None or pos is None:
+            return
+
+        world = self.maze_size * CELL_PX
+        half_w, half_h = self.half_extent()
+
+        tx, ty = cell_center(pos)
+        tx = world / 2 if half_w * 2 >= world else min(max(tx, half_w), world - half_w)
+        ty = world / 2 if half_h * 2 >= world else min(max(ty, half_h), world - half_h)
+
+        cx, cy = self.camera.position
+        k = min(1.0, delta_time * FOLLOW_SPEED)
+        self.camera.position = (cx + (tx - cx) * k, cy + (ty - cy) * k)
+
+    def half_extent(self):
+        zoom = self.camera.zoom
+        return self.window.width / 2 / zoom, self.window.height / 2 / zoom
+
+    def view_rect(self):
+        """(left, right, bottom, top) visibili in coordinate mondo"""
+        cx, cy = self.camera.position
+        half_w, half_h = self.half_extent()
+        return cx - half_w, cx + half_w, cy - half_h, cy + half_h
+
+    def cell_visible(self, pos, margin=2):
+        # Margine in celle: le entità più grandi di una cella (uscita) non spariscono sul bordo
+        left, right, bottom, top = self.view_rect()
+        x, y = cell_center(pos)
+        m = margin * CELL_PX
+        return left - m <= x <= right + m and bottom - m <= y <= top + m
+
+    def activate(self):
+        return self.camera.activate()
@@ -0,0 +1,255 @@
+"""
+Pipeline batch: genera migliaia di labirinti in parallelo, li valuta
+con analisi NumPy vettoriale e scrive un catalogo indicizzato per difficoltà.
+
+Uso:  python maze_catalog.py --count 5000 --size 67 --out catalog
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from GraphSearch import MazeProblem, GreedySearch, graph_search
+from maze_utils import WALL, genera_labirinto_simmetrico
+
+
+DIFFICULTY_BANDS = ["facile", "medio", "difficile"]
+CATALOG_DIR = "catalog"
+
+
+#####################
+# POSIZIONI DI GIOCO
+#####################
+
+def start_positions(size):
+    """Partenze [x, y] di player1, player2 e Informed AI"""
+    return {
+        "player1": [1, 1],
+        "player2": [size - 2, size - 2],
+        "InformedAI": [1, size - 2],
+    }
+
+
+def exit_position(size):
+    return [size // 2, size // 2]
+
+
+#########################
+# GENERAZIONE (WORKER)
+#########################
+
+def _genera_blocco(args):
+    """Genera un blocco di labirinti con i relativi seed (eseguito in un worker)"""
+    size, seeds = args
+    ai_start = start_positions(size)["InformedAI"]
+    goal = exit_position(size)
+
+    grids = np.empty((len(seeds), size, size), dtype=np.uint8)
+    expansions = []
+
+    for i, seed in enumerate(seeds):
+        maze = genera_labirinto_simmetrico(size, random.Random(seed))
+        grids[i] = maze
+
+        # Quanto lavora la Informed AI su questo labirinto
+        problem = MazeProblem(ai_start, goal, maze)
+        _, _, expanded = graph_search(problem, GreedySearch(problem))
+        expansions.append(expanded)
+
+    return seeds, grids, expansions
+
+
+##########################
+# ANALISI VETTORIALE NUMPY
+##########################
+
+def _shift_or(mask):
+    """OR dei 4 vicini ortogonali di ogni cella (batch N x S x S)"""
+    out = np.zeros_like(mask)
+    out[:, 1:, :] |= mask[:, :-1, :]
+    out[:, :-1, :] |= mask[:, 1:, :]
+    out[:, :, 1:] |= mask[:, :, :-1]
+    out[:, :, :-1] |= mask[:, :, 1:]
+    return out
+
+
+def degree_map(grids):
+    """Numero di vicini percorribili per ogni cella percorribile"""
+    floor = (grids != WALL).astype(np.int8)
+    deg = np.zeros(grids.shape, dtype=np.int8)
+    deg[:, 1:, :] += floor[:, :-1, :]
+    deg[:, :-1, :] += floor[:, 1:, :]
+    deg[:, :, 1:] += floor[:, :, :-1]
+    deg[:, :, :-1] += floor[:, :, 1:]
+    return deg * floor
+
+
+def distance_fields(grids, source):
+    """BFS simultanea su tutto il batch: distanza di ogni cella da source [x, y]"""
+    floor = grids != WALL
+    dist = np.full(grids.shape, -1, dtype=np.int32)
+
+    frontier = np.zeros_like(floor)
+    frontier[:, source[1], source[0]] = True
+    frontier &= floor
+
+    d = 0
+    while frontier.any():
+        dist[frontier] = d
+        frontier = _shift_or(frontier) & floor & (dist < 0)
+        d += 1
+
+    return dist
+
+
+def score_mazes(grids, expansions):
+    """Metriche di difficoltà ed equità per ogni labirinto del batch"""
+    size = grids.shape[1]
+    starts = start_positions(size)
+    dist = distance_fields(grids, exit_position(size))
+
+    lengths = {name: dist[:, y, x] for name, (x, y) in starts.items()}
+    stacked = np.stack(list(lengths.values()))
+    unfairness = stacked.max(axis=0) - stacked.min(axis=0)
+
+    deg = degree_map(grids)
+    dead_ends = (deg == 1).sum(axis=(1, 2))
+    junctions = (deg >= 3).sum(axis=(1, 2))
+    branching = deg.sum(axis=(1, 2)) / np.maximum((deg > 0).sum(axis=(1, 2)), 1)
+
+    expansions = np.asarray(expansions, dtype=np.float64)
+    solution = lengths["player1"].astype(np.float64)
+
+    def z(v):
+        v = v.astype(np.float64)
+        return (v - v.mean()) / (v.std() or 1.0)
+
+    score = 0.5 * z(solution) + 0.3 * z(dead_ends) + 0.2 * z(expansions)
+
+    return {
+        "solution_length": {name: v.tolist() for name, v in lengths.items()},
+        "unfairness": unfairness.tolist(),
+        "dead_ends": dead_ends.tolist(),
+        "junctions": junctions.tolist(),
+        "branching": np.round(branching, 3).tolist(),
+        "ai_expansions": expansions.astype(int).tolist(),
+        "score": np.round(score, 4).tolist(),
+    }
+
+
+#################
+# PIPELINE BATCH
+#################
+
+def build_catalog(count, size, out_dir=CATALOG_DIR, workers=None, chunk=50, seed=0):
+    """Genera, valuta e salva il catalogo (mazes.npy + index.json)"""
+    seeds = [seed + i for i in range(count)]
+    tasks = [(size, seeds[i:i + chunk]) for i in range(0, count, chunk)]
+
+    all_seeds, blocks, expansions = [], [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for block_seeds, grids, block_exp in executor.map(_genera_blocco, tasks):
+            all_seeds += block_seeds
+            blocks.append(grids)
+            expansions += block_exp
+
+    grids = np.concatenate(blocks)
+    scores = score_mazes(grids, expansions)
+
+    # Solo labirinti equi (stessa distanza dall'uscita per tutti)
+    fair = [i for i in range(len(grids)) if scores["unfairness"][i] == 0
+            and scores["solution_length"]["player1"][i] >= 0]
+    grids = grids[fair]
+
+    # Fasce di difficoltà per terzili dello score
+    fair_scores = np.array([scores["score"][i] for i in fair])
+    cuts = np.quantile(fair_scores, [1 / 3, 2 / 3]) if len(fair) else [0, 0]
+    band_ids = np.searchsorted(cuts, fair_scores, side="right")
+
+    entries = []
+    bands = {band: [] for band in DIFFICULTY_BANDS}
+    for idx, (i, band_id) in enumerate(zip(fair, band_ids)):
+        band = DIFFICULTY_BANDS[band_id]
+        bands[band].append(idx)
+        entries.append({
+            "id": idx,
+            "seed": all_seeds[i],
+            "band": band,
+            "score": scores["score"][i],
+            "solution_length": {k: v[i] for k, v in scores["solution_length"].items()},
+            "dead_ends": scores["dead_ends"][i],
+            "junctions": scores["junctions"][i],
+            "branching": scores["branching"][i],
+            "ai_expansions": scores["ai_expansions"][i],
+        })
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "mazes.npy"), grids)
+    with open(os.path.join(out_dir, "index.json"), "w") as f:
+        json.dump({"size": size, "count": len(entries), "bands": bands, "mazes": entries}, f)
+
+    return len(entries), bands
+
+
+###########################
+# CATALOGO LATO SERVER
+###########################
+
+class MazeCatalog:
+    """Catalogo su disco: labirinti memory-mapped + indice per fascia di difficoltà"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "index.json"), "r") as f:
+            self.index = json.load(f)
+
+        self.size = self.index["size"]
+        self.mazes = np.load(os.path.join(path, "mazes.npy"), mmap_mode="r")
+        self.pool = {band: [] for band in DIFFICULTY_BANDS}
+
+    @classmethod
+    def open(cls, path=CATALOG_DIR, size=None):
+        """Apre il catalogo se esiste (e se la dimensione combacia), altrimenti None"""
+        if not os.path.exists(os.path.join(path, "index.json")):
+            return None
+
+        catalog = cls(path)
+        if size is not None and catalog.size != size:
+            print(f"⚠️ Catalogo {catalog.size}x{catalog.size} ignorato (serve {size}x{size})")
+            return None
+
+        return catalog
+
+    def bands(self):
+        return [band for band in DIFFICULTY_BANDS if self.index["bands"].get(band)]
+
+    def pick(self, band, rng=random):
+        """Estrae un labirinto della fascia senza ripetizioni finché il pool non si esaurisce"""
+        if not self.pool[band]:
+            self.pool[band] = list(self.index["bands"].get(band, []))
+            rng.shuffle(self.pool[band])
+
+        if not self.pool[band]:
+            return None, None
+
+        idx = self.pool[band].pop()
+        return self.mazes[idx].tolist(), self.index["mazes"][idx]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera il catalogo di labirinti")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=67)
+    parser.add_argument("--out", default=CATALOG_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"🔨 Generazione di {args.count} labirinti {args.size}x{args.size}...")
+    start = time.time()
+    n, bands = build_catalog(args.count, args.size, args.out, args.workers, seed=args.seed)
+    print(f"✅ Catalogo: {n} labirinti in {time.time() - start:.1f}s "
+          + ", ".join(f"{b}={len(ids)}" for b, ids in bands.items()))
@@ -0,0 +1,196 @@
+"""
+Labirinti dinamici: patch versionate dei muri.
+
+Il server modifica poche celle alla volta e pubblica solo quelle, come terne
+piatte [x0, y0, v0, x1, y1, v1, ...] con il numero di versione:
+
+    maze/patch              {"version": 3, "cells": [...]}
+    maze/<id>/resync        il client ha perso una versione
+    maze/patch/<id>         risposta: tutte le celle cambiate dall'inizio della partita
+
+I valori sono assoluti (non "inverti la cella"): riapplicare una patch non fa danni.
+Client, renderer e AI aggiornano solo le celle toccate invece di ripartire da zero.
+"""
+import random
+from collections import deque
+
+import numpy as np
+
+from maze_utils import FLOOR, WALL, cell_cost, is_walkable
+from player_registry import distance_map
+
+
+PATCH_TOPIC = "maze/patch"
+SHIFT_TRIES = 50  # candidati provati prima di rinunciare a uno spostamento
+
+
+def encode_cells(cells):
+    return [v for cell in cells for v in (int(cell[0]), int(cell[1]), int(cell[2]))]
+
+
+def decode_cells(flat):
+    return [(flat[i], flat[i + 1], flat[i + 2]) for i in range(0, len(flat) - 2, 3)]
+
+
+def apply_cells(maze, cells):
+    """Scrive le celle (x, y, valore) in maze[y][x]; ritorna quelle cambiate davvero"""
+    changed = []
+    for x, y, value in cells:
+        if maze[y][x] != value:
+            maze[y][x] = value
+            changed.append((x, y, value))
+    return changed
+
+
+def mirrored(size, x, y):
+    """La cella e le sue copie negli altri quadranti (il labirinto è simmetrico)"""
+    return {(x, y), (size - 1 - x, y), (x, size - 1 - y), (size - 1 - x, size - 1 - y)}
+
+
+def _neighbors(maze, x, y):
+    return [is_walkable(maze[ny][nx]) for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1))]
+
+
+def shift_walls(maze, exit_pos, keep_reachable, protected=(), rng=random):
+    """
+    Un "muro che si sposta": apre un muro tra due corridoi e ne chiude un
+    tratto dritto altrove, in tutti e quattro i quadranti (partenze sempre
+    alla stessa distanza). Le posizioni in keep_reachable devono continuare
+    a raggiungere l'uscita. Ritorna le celle (x, y, valore), [] se non trova nulla.
+    """
+    size = len(maze)
+    protected = {tuple(p) for p in protected}
+    openings, closings = [], []
+
+    for y in range(1, size - 1):
+        for x in range(1, size - 1):
+            left, right, down, up = _neighbors(maze, x, y)
+            straight = (left and right and not up and not down) or (up and down and not left and not right)
+            if not straight or (x, y) in protected:
+                continue
+            (openings if maze[y][x] == WALL else closings).append((x, y))
+
+    for _ in range(SHIFT_TRIES):
+        if not openings or not closings:
+            break
+
+        opened = mirrored(size, *rng.choice(openings))
+        closed = mirrored(size, *rng.choice(closings))
+        if protected & closed or opened & closed:
+            continue
+
+        cells = [(x, y, FLOOR) for x, y in opened] + [(x, y, WALL) for x, y in closed]
+        trial = [list(row) for row in maze]
+        apply_cells(trial, cells)
+
+        dist = distance_map(trial, exit_pos)
+        if all(tuple(p) in dist for p in keep_reachable):
+            return cells
+
+    return []
+
+
+def cost_field(maze, source):
+    """
+    Costo minimo da ogni cella fino a source [x, y] (array [y, x], -1 = irraggiungibile),
+    pagando cell_cost per ogni cella in cui si entra. Costi interi e piccoli: Dial (secchi)
+    """
+    h, w = len(maze), len(maze[0])
+    field = np.full((h, w), -1, dtype=np.int32)
+    x, y = source
+    if not is_walkable(maze[y][x]):
+        return field
+
+    best = {(x, y): 0}
+    buckets = {0: [(x, y)]}
+    _settle(field, maze, best, buckets)
+    return field
+
+
+def _settle(field, maze, best, buckets):
+    """Dial dai secchi {costo: celle}: fissa i costi in field, rilassando verso i vicini"""
+    h, w = field.shape
+    while buckets:
+        d = min(buckets)
+        for x, y in buckets.pop(d):
+            if best.get((x, y)) != d:
+                continue  # voce scaduta
+            del best[(x, y)]
+            field[y, x] = d
+
+            # Dai vicini si arriva qui pagando l'ingresso in questa cella
+            nd = d + cell_cost(maze[y][x])
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if not (0 <= nx < w and 0 <= ny < h) or not is_walkable(maze[ny][nx]) \
+                        or 0 <= field[ny, nx] <= nd or best.get((nx, ny), nd + 1) <= nd:
+                    continue
+                best[(nx, ny)] = nd
+                buckets.setdefault(nd, []).append((nx, ny))
+
+
+def repair_distances(field, maze, cells):
+    """
+    Campo dei costi (come cost_field: array [y, x], -1 = irraggiungibile)
+    riparato dopo il cambio di cells (x, y, valore), già applicato a maze.
+    Ricalcola solo la regione che dipendeva dalle celle cambiate (muri nuovi
+    o terreno più lento) e quella migliorata da quelle aperte o più veloci.
+    """
+    h, w = field.shape
+
+    # Conta solo il valore finale di ogni cella (anche se cells la ripete), cioè quello in maze
+    cells = [(x, y, maze[y][x]) for x, y in dict.fromkeys((x, y) for x, y, _ in cells)]
+
+    def neighbors(x, y):
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < w and 0 <= ny < h:
+                yield nx, ny
+
+    def supported(x, y):
+        # Il costo resta valido se un vicino valido lo giustifica ancora
+        d = field[y, x]
+        return d == 0 or any(field[ny, nx] >= 0 and (nx, ny) not in invalid
+                             and field[ny, nx] + cell_cost(maze[ny][nx]) == d for nx, ny in neighbors(x, y))
+
+    # 1) Invalida chi ha perso il suo predecessore: muri nuovi, o ingressi diventati più cari
+    invalid = set()
+    for x, y, value in cells:
+        if value == WALL and field[y, x] >= 0:
+            invalid.add((x, y))
+            field[y, x] = -1
+
+    queue = deque((nx, ny) for x, y, _ in cells for nx, ny in [(x, y), *neighbors(x, y)])
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) in invalid or field[y, x] < 0 or supported(x, y):
+            continue
+        invalid.add((x, y))
+        field[y, x] = -1
+        queue.extend(neighbors(x, y))
+
+    # 2) Riparte dai bordi validi della regione invalidata e dalle celle cambiate
+    best = {}
+
+    def offer(x, y, d):
+        if is_walkable(maze[y][x]) and (field[y, x] < 0 or d < field[y, x]) and d < best.get((x, y), d + 1):
+            best[(x, y)] = d
+
+    for x, y in invalid:
+        for nx, ny in neighbors(x, y):
+            if field[ny, nx] >= 0:
+                offer(x, y, int(field[ny, nx]) + cell_cost(maze[ny][nx]))
+    for x, y, value in cells:
+        if value == WALL:
+            continue
+        for nx, ny in neighbors(x, y):
+            if field[ny, nx] >= 0:
+                offer(x, y, int(field[ny, nx]) + cell_cost(maze[ny][nx]))
+            if field[y, x] >= 0:
+                offer(nx, ny, int(field[y, x]) + cell_cost(value))  # ingresso qui più economico
+
+    # 3) Dial a secchi: i costi cambiano solo dove migliorano
+    buckets = {}
+    for cell, d in best.items():
+        buckets.setdefault(d, []).append(cell)
+    _settle(field, maze, best, buckets)
+
+    return field
@@ -0,0 +1,172 @@
+"""
+Renderer del labirinto a texture "cotte".
+
+Invece di uno Sprite per cella, ogni blocco di CHUNK_CELLS x CHUNK_CELLS celle
+viene cotto una volta in una sola texture; tutti i blocchi stanno in una
+SpriteList e si disegnano con una chiamata. Le texture sono in cache per hash
+del contenuto: stesso labirinto (o resize della finestra) = nessuna ricottura.
+"""
+import hashlib
+from collections import OrderedDict
+
+import arcade
+import numpy as np
+from PIL import Image
+
+from maze_utils import DOOR, FLOOR, ICE, MUD, WALL
+
+
+CHUNK_CELLS = 32
+CELL_PX = 16  # risoluzione di una cella dentro la texture cotta
+CACHE_SIZE = 64
+
+# Immagine di ogni tipo di cella
+TILE_ASSETS = {
+    FLOOR: "./assets/floor.png",
+    WALL: "./assets/wall.png",
+    MUD: "./assets/mud.png",
+    ICE: "./assets/ice.png",
+    DOOR: "./assets/door.png",
+}
+
+_tile_pixels = {}
+_texture_cache = OrderedDict()
+
+
+def _tiles_array(cell_px):
+    """Array (valore, px, px, 4) con l'immagine ridimensionata di ogni tipo di cella"""
+    if cell_px not in _tile_pixels:
+        # Un'immagine per ogni valore uint8: quelli senza asset (es. UNKNOWN) restano trasparenti
+        tiles = np.zeros((256, cell_px, cell_px, 4), dtype=np.uint8)
+        for value, path in TILE_ASSETS.items():
+            img = Image.open(path).convert("RGBA").resize((cell_px, cell_px), Image.LANCZOS)
+            tiles[value] = np.asarray(img)
+        _tile_pixels[cell_px] = tiles
+    return _tile_pixels[cell_px]
+
+
+def bake_texture(cells, cell_px=CELL_PX):
+    """Cuoce un blocco di celle (righe = y crescente) in una texture, con cache LRU"""
+    cells = np.ascontiguousarray(cells, dtype=np.uint8)
+    key = hashlib.sha1(cells.tobytes() + bytes(cells.shape)).hexdigest() + f"-{cell_px}"
+
+    texture = _texture_cache.get(key)
+    if texture is not None:
+        _texture_cache.move_to_end(key)
+        return texture
+
+    h, w = cells.shape
+    tiles = _tiles_array(cell_px)
+
+    # Nell'immagine la riga 0 è in alto, nel labirinto y=0 è in basso
+    pixels = tiles[cells[::-1]].transpose(0, 2, 1, 3, 4).reshape(h * cell_px, w * cell_px, 4)
+    texture = arcade.Texture(Image.fromarray(pixels, "RGBA"), hash=f"maze-{key}",
+                             hit_box_algorithm=arcade.hitbox.algo_bounding_box)
+
+    _texture_cache[key] = texture
+    if len(_texture_cache) > CACHE_SIZE:
+        _texture_cache.popitem(last=False)
+
+    return texture
+
+
+class MazeRenderer:
+    """Labirinto come pochi sprite-blocco in una SpriteList (un solo draw)"""
+
+    def __init__(self, chunk_cells=CHUNK_CELLS, cell_px=CELL_PX):
+        self.chunk_cells = chunk_cells
+        self.cell_px = cell_px
+        self.sprite_list = arcade.SpriteList()
+        self.chunks = {}  # (cx, cy) -> (sprite, larghezza, altezza in celle)
+
+        # Culling: solo i blocchi dentro la vista (None = disegna tutto)
+        self.visible = None
+        self.visible_keys = None
+
+        self.cell_size = cell_px
+        self.offset_x = 0
+        self.offset_y = 0
+
+    def clear(self):
+        self.sprite_list.clear()
+        self.chunks = {}
+        self.visible_keys = None
+        if self.visible is not None:
+            self.visible.clear()
+
+    def load_grid(self, grid):
+        """Cuoce tutto il labirinto (lista di righe o array)"""
+        grid = np.asarray(grid, dtype=np.uint8)
+        self.clear()
+
+        c = self.chunk_cells
+        for cy in range(0, grid.shape[0], c):
+            for cx in range(0, grid.shape[1], c):
+                self.set_chunk(cx // c, cy // c, grid[cy:cy + c, cx:cx + c])
+
+    def set_chunk(self, cx, cy, cells):
+        """Cuoce (o riprende dalla cache) un solo blocco e lo posiziona"""
+        cells = np.asarray(cells, dtype=np.uint8)
+        texture = bake_texture(cells, self.cell_px)
+
+        if (cx, cy) in self.chunks:
+            sprite = self.chunks[(cx, cy)][0]
+            sprite.texture = texture
+        else:
+            sprite = arcade.Sprite(texture)
+            self.sprite_list.append(sprite)
+            self.visible_keys = None
+
+        self.chunks[(cx, cy)] = (sprite, cells.shape[1], cells.shape[0])
+        self._place(sprite, cx, cy, cells.shape[1], cells.shape[0])
+
+    def update_cells(self, grid, cells):
+        """Ricuoce solo i blocchi che contengono le celle [x, y] cambiate"""
+        grid = np.asarray(grid, dtype=np.uint8)
+        c = self.chunk_cells
+        touched = {(cell[0] // c, cell[1] // c) for cell in cells}
+
+        for cx, cy in touched:
+            self.set_chunk(cx, cy, grid[cy * c:(cy + 1) * c, cx * c:(cx + 1) * c])
+        return touched
+
+    def layout(self, cell_size, offset_x, offset_y):
+        """Nuova scala/posizione (es. resize finestra): sposta gli sprite, niente ricottura"""
+        self.cell_size = cell_size
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+
+        for (cx, cy), (sprite, w, h) in self.chunks.items():
+            self._place(sprite, cx, cy, w, h)
+
+    def _place(self, sprite, cx, cy, w, h):
+        sprite.scale = self.cell_size / self.cell_px
+        sprite.center_x = self.offset_x + (cx * self.chunk_cells + w / 2) * self.cell_size
+        sprite.center_y = self.offset_y + (cy * self.chunk_cells + h / 2) * self.cell_size
+
+    def cull(self, left, right, bottom, top):
+        """Tiene da disegnare solo i blocchi che intersecano il rettangolo (coordinate mondo)"""
+        span = self.chunk_cells * self.cell_size
+        x0 = int((left - self.offset_x) // span)
+        x1 = int((right - self.offset_x) // span)
+        y0 = int((bottom - self.offset_y) // span)
+        y1 = int((top - self.offset_y) // span)
+
+        # Costo proporzionale ai blocchi in vista, non al labirinto
+        keys = {(cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1)
+                if (cx, cy) in self.chunks}
+        if keys == self.visible_keys:
+            return
+
+        if self.visible is None:
+            self.visible = arcade.SpriteList()
+        self.visible.clear()
+        for key in keys:
+            self.visible.append(self.chunks[key][0])
+        self.visible_keys = keys
+
+    def draw(self):
+        if self.visible is not None:
+            self.visible.draw()
+        else:
+            self.sprite_list.draw()
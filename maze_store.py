@@ -0,0 +1,182 @@
+"""
+Archivio a tile per labirinti enormi.
+
+Il labirinto è diviso in tile quadrate di TILE_SIZE celle salvate in un file
+memory-mapped (layout [ty][tx][riga][colonna]); i client chiedono solo
+le tile attorno alla propria posizione.
+
+Protocollo MQTT:
+    maze/tiles/request      {"client": "player1", "tiles": [[tx, ty], ...]}
+    maze/tiles/<client>     {"tiles": [{"tx": .., "ty": .., "data": base64}, ...]}
+"""
+import base64
+import math
+import os
+
+import numpy as np
+
+from maze_utils import WALL
+
+
+TILE_SIZE = 32
+TILE_RADIUS = 1  # tile attorno a quella del giocatore da tenere caricate
+
+
+def tile_of(x, y, tile_size=TILE_SIZE):
+    """Coordinate della tile che contiene la cella (x, y)"""
+    return x // tile_size, y // tile_size
+
+
+def tiles_around(pos, size, tile_size=TILE_SIZE, radius=TILE_RADIUS):
+    """Tile entro radius (in tile) dalla posizione [x, y]"""
+    per_side = math.ceil(size / tile_size)
+    cx, cy = tile_of(int(pos[0]), int(pos[1]), tile_size)
+    return [(tx, ty)
+            for ty in range(max(0, cy - radius), min(per_side, cy + radius + 1))
+            for tx in range(max(0, cx - radius), min(per_side, cx + radius + 1))]
+
+
+def encode_tile(tx, ty, tile):
+    return {"tx": tx, "ty": ty, "data": base64.b64encode(np.ascontiguousarray(tile).tobytes()).decode("ascii")}
+
+
+def decode_tile(message, tile_size=TILE_SIZE):
+    data = np.frombuffer(base64.b64decode(message["data"]), dtype=np.uint8)
+    return message["tx"], message["ty"], data.reshape(tile_size, tile_size)
+
+
+###############
+# LATO SERVER
+###############
+
+class TiledMazeStore:
+    """Labirinto diviso in tile di dimensione fissa, su file memory-mapped"""
+
+    def __init__(self, path, size, tile_size=TILE_SIZE, mode="r+"):
+        self.path = path
+        self.size = size
+        self.tile_size = tile_size
+        self.per_side = math.ceil(size / tile_size)
+        self.data = np.memmap(path, dtype=np.uint8, mode=mode,
+                              shape=(self.per_side, self.per_side, tile_size, tile_size))
+
+    @classmethod
+    def create(cls, path, size, tile_size=TILE_SIZE):
+        """Nuovo archivio tutto muro (anche il padding oltre il bordo)"""
+        store = cls(path, size, tile_size, mode="w+")
+        store.data[:] = WALL
+        return store
+
+    @classmethod
+    def from_grid(cls, path, grid, tile_size=TILE_SIZE):
+        """Copia una griglia (lista di righe o array) nell'archivio a tile"""
+        grid = np.asarray(grid, dtype=np.uint8)
+
+        # Scrive su un file temporaneo e lo sostituisce: chi ha ancora
+        # mappato il vecchio archivio continua a leggerlo senza problemi
+        store = cls.create(path + ".tmp", grid.shape[0], tile_size)
+
+        for ty in range(store.per_side):
+            for tx in range(store.per_side):
+                block = grid[ty * tile_size:(ty + 1) * tile_size, tx * tile_size:(tx + 1) * tile_size]
+                store.data[ty, tx, :block.shape[0], :block.shape[1]] = block
+
+        store.data.flush()
+        os.replace(store.path, path)
+        store.path = path
+        return store
+
+    def tile(self, tx, ty):
+        """Vista (senza copia) della tile (tx, ty)"""
+        return self.data[ty, tx]
+
+    def cell(self, x, y):
+        t = self.tile_size
+        return int(self.data[y // t, x // t, y % t, x % t])
+
+    def set_cell(self, x, y, value):
+        t = self.tile_size
+        self.data[y // t, x // t, y % t, x % t] = value
+
+    def has_tile(self, tx, ty):
+        return 0 <= tx < self.per_side and 0 <= ty < self.per_side
+
+    def encode(self, tiles):
+        """Messaggio di risposta per le tile richieste (ignora quelle fuori mappa)"""
+        return {"tiles": [encode_tile(tx, ty, self.tile(tx, ty))
+                          for tx, ty in tiles if self.has_tile(tx, ty)]}
+
+    def flush(self):
+        self.data.flush()
+
+
+##############
+# LATO CLIENT
+##############
+
+class TileCache:
+    """Tile ricevute dal server; le celle non ancora caricate valgono come muro"""
+
+    def __init__(self, size, tile_size=TILE_SIZE):
+        self.size = size
+        self.tile_size = tile_size
+        self.tiles = {}
+        self.requested = set()
+
+    def cell(self, x, y):
+        tile = self.tiles.get((x // self.tile_size, y // self.tile_size))
+        if tile is None:
+            return WALL
+        return int(tile[y % self.tile_size, x % self.tile_size])
+
+    def add(self, message):
+        """Salva le tile di un messaggio maze/tiles/<client>; ritorna quelle nuove"""
+        added = []
+        for entry in message.get("tiles", []):
+            tx, ty, tile = decode_tile(entry, self.tile_size)
+            self.tiles[(tx, ty)] = tile
+            self.requested.discard((tx, ty))
+            added.append((tx, ty))
+        return added
+
+    def set_cell(self, x, y, value):
+        """Aggiorna una cella (patch); ritorna la tile se è caricata, altrimenti None"""
+        key = (x // self.tile_size, y // self.tile_size)
+        tile = self.tiles.get(key)
+        if tile is None:
+            return None  # arriverà già aggiornata dal server
+        if not tile.flags.writeable:
+            tile = self.tiles[key] = tile.copy()
+        tile[y % self.tile_size, x % self.tile_size] = value
+        return key
+
+    def missing(self, pos, radius=TILE_RADIUS):
+        """Tile attorno a pos non ancora ricevute né richieste (e le segna come richieste)"""
+        wanted = [t for t in tiles_around(pos, self.size, self.tile_size, radius)
+                  if t not in self.tiles and t not in self.requested]
+        self.requested.update(wanted)
+        return wanted
+
+    def all_tiles(self):
+        """Tutte le tile del labirinto (per chi pianifica sull'intera mappa, come l'AI)"""
+        per_side = math.ceil(self.size / self.tile_size)
+        return [(tx, ty) for ty in range(per_side) for tx in range(per_side)]
+
+    def complete(self):
+        return all(t in self.tiles for t in self.all_tiles())
+
+    def grid(self):
+        """Labirinto intero ricomposto dalle tile (lista di righe), None se ne manca qualcuna"""
+        if not self.complete():
+            return None
+        grid = np.full((self.size, self.size), WALL, dtype=np.uint8)
+        t = self.tile_size
+        for tx, ty in self.all_tiles():
+            cells = self.tile_cells(tx, ty)
+            grid[ty * t:ty * t + cells.shape[0], tx * t:tx * t + cells.shape[1]] = cells
+        return grid.tolist()
+
+    def tile_cells(self, tx, ty):
+        """Celle della tile senza il padding oltre il bordo del labirinto"""
+        t = self.tile_size
+        return self.tiles[(tx, ty)][:min(t, self.size - ty * t), :min(t, self.size - tx * t)]
@@ -0,0 +1,126 @@
+import hashlib
+import random
+
+
+###########
+# CODIFICA
+###########
+
+FLOOR = 0
+WALL = 1
+MUD = 2  # fango
+ICE = 3  # ghiaccio
+DOOR = 4  # porta da aprire
+UNKNOWN = 255  # cella mai vista (nebbia di guerra, solo lato client)
+
+# Costo (intero, >= 1) per entrare in una cella percorribile
+TERRAIN_COST = {
+    FLOOR: 1,
+    MUD: 3,
+    ICE: 2,
+    DOOR: 4,
+}
+
+
+def is_walkable(value):
+    """Una cella è percorribile se non è un muro"""
+    return value != WALL
+
+
+def cell_cost(value):
+    """Costo per entrare nella cella (1 per i valori senza terreno)"""
+    return TERRAIN_COST.get(int(value), 1)
+
+
+def maze_hash(maze):
+    """Hash del contenuto del labirinto (stabile tra processi)"""
+    h = hashlib.sha1()
+    for row in maze:
+        h.update(bytes(int(v) for v in row))
+    return h.hexdigest()
+
+
+#######################
+# GENERAZIONE LABIRINTO
+#######################
+
+def genera_labirinto_simmetrico(size, rng=None):
+    """
+    Genera labirinto simmetrico 4-quadranti
+    Player 1 (1,1) e Player 2 (N-2,N-2) avranno SEMPRE stessa distanza dall'uscita
+    """
+    assert size % 2 == 1, "Size deve essere dispari per simmetria"
+    rng = rng or random
+
+    # Dimensione quadrante
+    quad_size = size // 2 + 1
+
+    # Genera solo il QUADRANTE SUPERIORE SINISTRO
+    quad = [[1 for _ in range(quad_size)] for _ in range(quad_size)]
+
+    # DFS solo nel quadrante
+    stack = [(1, 1)]
+    quad[1][1] = 0
+
+    directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
+
+    while stack:
+        x, y = stack[-1]
+        rng.shuffle(directions)
+        found = False
+
+        for dx, dy in directions:
+            nx, ny = x + dx, y + dy
+            if 0 < nx < quad_size - 1 and 0 < ny < quad_size - 1:
+                if quad[ny][nx] == 1:
+
+                    found = True
+                    quad[ny][nx] = 0
+                    quad[y + dy // 2][x + dx // 2] = 0
+                    stack.append((nx, ny))
+                    break
+
+        if not found:
+            stack.pop()
+
+    # Genera il labirinto a grandezza originale
+    grid = [[1 for _ in range(size)] for _ in range(size)]
+
+    for qy in range(quad_size):
+        for qx in range(quad_size):
+            grid[qy][qx] = quad[qy][qx]
+            grid[qy][size - 1 - qx] = quad[qy][qx]
+            grid[size - 1 - qy][qx] = quad[qy][qx]
+            grid[size - 1 - qy][size - 1 - qx] = quad[qy][qx]
+
+    # Assicura celle chiave percorribili
+    center = size // 2
+
+    # Collega i quadranti al centro (se necessario)
+    for i in range(center - 2, center + 3):
+        for j in range(center - 2, center + 3):
+            if 0 <= i < size and 0 <= j < size:
+                grid[i][j] = 0
+
+    return grid
+
+
+def aggiungi_terreno(grid, fraction, rng=None):
+    """
+    Trasforma una frazione dei corridoi in fango, ghiaccio o porte, speculare
+    nei 4 quadranti: i giocatori restano alla stessa distanza (pesata) dall'uscita
+    """
+    rng = rng or random
+    size = len(grid)
+    center = size // 2
+
+    # Solo il quadrante in alto a sinistra, lontano dagli angoli di partenza e dal centro
+    cells = [(x, y) for y in range(1, center - 2) for x in range(1, center - 2)
+             if grid[y][x] == FLOOR and x + y > 2]
+
+    for x, y in rng.sample(cells, int(len(cells) * fraction)):
+        value = rng.choice([MUD, MUD, ICE, ICE, DOOR])
+        for mx, my in ((x, y), (size - 1 - x, y), (x, size - 1 - y), (size - 1 - x, size - 1 - y)):
+            grid[my][mx] = value
+
+    return grid
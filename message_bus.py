@@ -0,0 +1,106 @@
+"""
+Bus di messaggi tra il thread di rete (paho) e il loop del programma.
+
+I callback MQTT si limitano ad accodare (topic, payload); il loop arcade
+(on_update / tick) o il loop dell'AI svuota la coda a blocchi e gestisce
+i messaggi nel proprio thread, senza flag condivisi.
+La coda è una deque limitata: append/popleft sono atomici, niente lock.
+Se si riempie vengono scartati i messaggi più vecchi (e contati), tranne
+quelli dichiarati essenziali (es. patch dei muri e tile): vanno in una
+seconda coda senza limite e si gestiscono comunque nell'ordine di arrivo.
+Ogni REPORT_EVERY secondi drain stampa le metriche di back-pressure.
+"""
+import time
+from collections import deque
+
+
+DEFAULT_CAPACITY = 1024
+LATENCY_SMOOTHING = 0.1  # peso del nuovo campione nella media mobile
+REPORT_EVERY = 30.0  # secondi tra due stampe delle metriche (None = mai)
+
+
+class MessageBus:
+    def __init__(self, capacity=DEFAULT_CAPACITY, name="MQTT", essential=None, report_every=REPORT_EVERY):
+        self.name = name
+        self.capacity = capacity
+        self.queue = deque(maxlen=capacity)
+
+        # essential(topic) -> True: il messaggio non si scarta mai
+        self.essential = essential
+        self.essential_queue = deque()
+        self.seq = 0  # ordine di arrivo tra le due code (scritto solo dal thread di rete)
+
+        self.report_every = report_every
+        self.last_report = time.monotonic()
+
+        # Metriche di back-pressure
+        self.received = 0
+        self.dropped = 0
+        self.handled = 0
+        self.max_depth = 0
+        self.latency_avg = 0.0
+        self.latency_max = 0.0
+        self.reported_dropped = 0
+
+    def put(self, topic, payload):
+        """Chiamata dal thread di rete: solo accodamento"""
+        self.seq += 1
+        item = (self.seq, topic, payload, time.monotonic())
+        if self.essential and self.essential(topic):
+            self.essential_queue.append(item)
+        else:
+            if len(self.queue) == self.capacity:
+                self.dropped += 1
+            self.queue.append(item)
+        self.received += 1
+
+    def __len__(self):
+        return len(self.queue) + len(self.essential_queue)
+
+    def pop(self):
+        """Il messaggio arrivato prima tra le due code"""
+        queue = self.queue
+        if self.essential_queue and (not queue or self.essential_queue[0][0] < queue[0][0]):
+            queue = self.essential_queue
+        return queue.popleft()
+
+    def drain(self, handler, max_items=None):
+        """Gestisce al più max_items messaggi con handler(topic, payload); ritorna quanti"""
+        depth = len(self)
+        self.max_depth = max(self.max_depth, depth)
+        count = depth if max_items is None else min(depth, max_items)
+
+        for _ in range(count):
+            try:
+                _, topic, payload, queued_at = self.pop()
+            except IndexError:
+                break
+
+            handler(topic, payload)
+            self.handled += 1
+
+            latency = time.monotonic() - queued_at
+            self.latency_avg += (latency - self.latency_avg) * LATENCY_SMOOTHING
+            self.latency_max = max(self.latency_max, latency)
+
+        if self.dropped > self.reported_dropped:
+            print(f"⚠️ Coda {self.name} piena: {self.dropped - self.reported_dropped} messaggi scartati")
+            self.reported_dropped = self.dropped
+
+        now = time.monotonic()
+        if self.report_every is not None and now - self.last_report >= self.report_every:
+            print(f"📊 Coda {self.name}: {self.stats()}")
+            self.last_report = now
+
+        return count
+
+    def stats(self):
+        return {
+            "depth": len(self),
+            "max_depth": self.max_depth,
+            "received": self.received,
+            "handled": self.handled,
+            "dropped": self.dropped,
+            "latency_ms_avg": round(self.latency_avg * 1000, 2),
+            "latency_ms_max": round(self.latency_max * 1000, 2),
+        }
@@ -0,0 +1,46 @@
+"""
+Coda di uscita del client.
+
+I messaggi non ancora inviati sullo stesso topic vengono fusi nell'ultimo
+(per una posizione conta solo quella più recente) e la coda si svuota al
+più SEND_RATE volte al secondo, qualunque sia il frame rate.
+"""
+import json
+import time
+
+
+SEND_RATE = 20  # come il tick del server
+
+
+class OutboundQueue:
+    def __init__(self, client, rate=SEND_RATE):
+        self.client = client
+        self.interval = 1 / rate
+        self.pending = {}  # topic -> ultimo payload non inviato
+        self.last_send = 0.0
+
+        # Statistiche
+        self.sent = 0
+        self.coalesced = 0
+
+    def put(self, topic, data):
+        if topic in self.pending:
+            self.coalesced += 1
+        self.pending[topic] = data
+
+    def flush(self, now=None):
+        """Pubblica ciò che è in coda se è passato abbastanza tempo dall'ultimo invio"""
+        now = time.monotonic() if now is None else now
+        if not self.pending or now - self.last_send < self.interval:
+            return 0
+
+        pending, self.pending = self.pending, {}
+        for topic, data in pending.items():
+            self.client.publish(topic, json.dumps(data))
+
+        self.sent += len(pending)
+        self.last_send = now
+        return len(pending)
+
+    def clear(self):
+        self.pending = {}
@@ -0,0 +1,102 @@
+"""
+Strato testi/overlay del client.
+
+Etichette e banner vengono costruiti una sola volta dentro un pyglet Batch e
+ricostruiti solo quando cambia il loro contenuto; ogni frame si disegna tutto
+con un'unica batch.draw(). Uso per frame:
+
+    overlay.begin()
+    overlay.label("attesa", "In attesa...", x, y)
+    overlay.draw()      # nasconde ciò che non è stato richiesto in questo frame
+"""
+import arcade
+import pyglet
+
+FONT_NAME = ("Courier New", "Consolas", "monospace")
+
+# Contorno del banner (8 direzioni) + ombra leggera
+OUTLINE_OFFSETS = [(-2, 0), (2, 0), (0, -2), (0, 2), (-2, -2), (-2, 2), (2, -2), (2, 2)]
+SHADOW_OFFSET = (3, -3)
+
+
+class TextOverlay:
+    def __init__(self):
+        self.batch = pyglet.graphics.Batch()
+
+        # Ordine di disegno dentro il batch
+        self.layers = [pyglet.graphics.Group(order=i) for i in range(4)]
+
+        self.items = {}  # nome -> (chiave contenuto, [oggetti pyglet/arcade])
+        self.used = set()
+
+    def begin(self):
+        self.used = set()
+
+    def _get(self, name, key, build):
+        """Riusa l'elemento se il contenuto non è cambiato, altrimenti lo ricostruisce"""
+        self.used.add(name)
+        item = self.items.get(name)
+
+        if item is None or item[0] != key:
+            if item is not None:
+                self._delete(item[1])
+            item = (key, build())
+            self.items[name] = item
+
+        for obj in item[1]:
+            if not obj.visible:
+                obj.visible = True
+
+        return item[1]
+
+    def _delete(self, objects):
+        for obj in objects:
+            if isinstance(obj, arcade.Text):
+                obj.label.delete()
+            else:
+                obj.delete()
+
+    def _text(self, text, x, y, color, font_size, layer, **kwargs):
+        return arcade.Text(text, x, y, color, font_size, batch=self.batch,
+                           group=self.layers[layer], **kwargs)
+
+    def label(self, name, text, x, y, color=arcade.color.WHITE, font_size=24,
+              anchor_x="center", font_name=None):
+        """Etichetta semplice"""
+        key = (text, x, y, tuple(color), font_size, anchor_x, font_name)
+        kwargs = {"anchor_x": anchor_x}
+        if font_name:
+            kwargs["font_name"] = font_name
+
+        return self._get(name, key, lambda: [
+            self._text(text, x, y, color, font_size, 3, **kwargs)])
+
+    def banner(self, name, text, cx, cy, font_size=44, panel_w=700, panel_h=80):
+        """Pannello semi-trasparente + testo con contorno e ombra"""
+        key = (text, cx, cy, font_size, panel_w, panel_h)
+
+        def build():
+            objects = [pyglet.shapes.Rectangle(
+                cx - panel_w // 2, cy - panel_h // 2, panel_w, panel_h,
+                color=(10, 10, 20, 170), batch=self.batch, group=self.layers[0])]
+
+            style = {"anchor_x": "center", "anchor_y": "center", "font_name": FONT_NAME}
+            for ox, oy in OUTLINE_OFFSETS:
+                objects.append(self._text(text, cx + ox, cy + oy, arcade.color.BLACK, font_size, 1, **style))
+
+            sx, sy = SHADOW_OFFSET
+            objects.append(self._text(text, cx + sx, cy + sy, (0, 0, 0, 120), font_size, 2, **style))
+            objects.append(self._text(text, cx, cy, arcade.color.WHITE, font_size, 3, **style))
+            return objects
+
+        return self._get(name, key, build)
+
+    def draw(self):
+        # Nasconde (senza distruggere) ciò che non serve in questo frame
+        for name, (_, objects) in self.items.items():
+            if name not in self.used:
+                for obj in objects:
+                    if obj.visible:
+                        obj.visible = False
+
+        self.batch.draw()
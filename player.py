@@ -0,0 +1,598 @@
+import argparse
+
+import arcade
+import arcade.gui
+import paho.mqtt.client as mqtt
+import threading
+import json
+import time
+
+from entity_layer import EntityLayer
+from exploration import EXPLORE_TOPIC
+from heatmap import HeatmapLayer
+from maze_camera import MazeCamera
+from maze_patch import PATCH_TOPIC, apply_cells, decode_cells
+from maze_renderer import CELL_PX, MazeRenderer
+from maze_store import TileCache
+from maze_utils import UNKNOWN, WALL, cell_cost
+from message_bus import MessageBus
+from outbound import OutboundQueue
+from overlay import TextOverlay
+from visibility import VIEW_TOPIC
+
+
+# Movimento a passo fisso: la velocità non dipende dal frame rate
+MOVE_STEP = 0.06  # secondi per passo
+MAX_CATCHUP_STEPS = 3  # passi massimi recuperati in un frame lento
+
+MAX_MESSAGES_PER_FRAME = 256  # il resto resta in coda per il frame dopo
+
+# Topic delle AI (posizioni, esplorazione): con la nebbia le AI arrivano dal server
+AI_TOPICS = ["maze/InformedAI", "maze/InformedAI/+"]
+
+
+# Testo della schermata di attesa per i giocatori "storici"
+ROLE_TEXT = {
+    "player1": "🔴 TU SEI IL PLAYER ROSSO IN BASSO A SINISTRA 🔴",
+    "player2": "🟢 TU SEI IL PLAYER VERDE IN ALTO A DESTRA 🟢",
+}
+
+
+class MidnightMaze(arcade.Window):
+    def __init__(self, player_id="player1"):
+        super().__init__(width=1024, height=768, title=f"Moonlight Maze - {player_id}", fullscreen=False, resizable=True)
+
+        # Id del giocatore: decide i topic MQTT (maze/<id>/join, maze/<id>/move, ...)
+        self.player_id = player_id
+
+        # RENDERER LABIRINTO (texture cotte, un solo draw)
+        self.maze_renderer = MazeRenderer()
+        self.pending_tiles = []
+
+        # ENTITÀ (uscita, giocatori, bot): una SpriteList, un draw
+        self.entities = EntityLayer()
+        self.pending_entities = {}
+
+        # HEATMAP dell'esplorazione dell'AI: una texture aggiornata a fotogrammi
+        self.heatmap = HeatmapLayer()
+
+        # CAMERA (segue il giocatore, zoom con +/- o rotella)
+        self.camera = MazeCamera(self)
+
+        # TESTI E BANNER (costruiti una volta, un solo batch)
+        self.overlay = TextOverlay()
+
+        arcade.set_background_color(arcade.color.MIDNIGHT_BLUE)
+
+        # UI MANAGER
+        self.manager = arcade.gui.UIManager(self)
+        self.manager.enable()
+
+        # STATO SCHERMATA: "join" | "waiting" | "game" | "game_over"
+        self.state = "join"
+
+        # STATO GIOCO
+        self.reset_state()
+
+        # Move Command
+        self.keys_pressed = {}
+        self.step_acc = 0.0  # tempo accumulato verso il prossimo passo
+        self.step_wait = 0  # passi ancora da aspettare per il terreno (fango, porte...)
+
+        # Join Page
+        self.player_name = ""
+        self.name_input = None
+
+        # COSTRUZIONE UI JOIN PAGE (UNA SOLA VOLTA)
+        self.draw_join_ui()
+        self.draw_reset_button()
+
+        # MQTT: il thread di rete accoda soltanto, on_update gestisce
+        self.bus = MessageBus()
+        self.client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
+        self.client.on_connect = self.on_mqtt_connect
+        self.client.on_message = self.on_mqtt_message
+        self.client.connect("localhost", 1883, 60)
+        threading.Thread(target=self.client.loop_forever, daemon=True).start()
+
+        # Mosse in uscita: fuse all'ultima posizione, inviate a ritmo costante
+        self.outbound = OutboundQueue(self.client)
+
+        print(f"🚀 Midnight Maze Arcade - {self.player_id} pronto!")
+
+    def reset_state(self):
+        self.griglia = None
+        self.pos = None
+        self.prev_pos = None  # posizione al passo precedente (interpolazione)
+        self.exit_pos = None
+        self.entities.clear()
+        self.pending_entities = {}
+        self.heatmap.clear()
+        self.maze_size = None
+        self.cell_size = None
+        self.game_ready = False
+        self.winner = None
+        self.maze_renderer.clear()
+        self.pending_tiles = []
+        self.tiles = None  # TileCache se il server consegna il labirinto a tile
+        self.maze_version = 0  # ultima patch dei muri applicata
+        self.pending_cells = []  # celle cambiate da ricuocere al prossimo frame
+        self.fog = False  # nebbia di guerra: le celle arrivano man mano che si vedono
+
+    def maze_loaded(self):
+        return self.griglia is not None or self.tiles is not None
+
+    def cella(self, x, y):
+        """Valore della cella (x, y) dalla griglia intera o dalle tile ricevute"""
+        if self.tiles is not None:
+            return self.tiles.cell(x, y)
+        return self.griglia[y][x]
+
+    def richiedi_tile(self, pos):
+        """Chiede al server le tile attorno a pos che non abbiamo ancora"""
+        if self.tiles is None or pos is None:
+            return
+        missing = self.tiles.missing(pos)
+        if missing:
+            self.client.publish(
+                "maze/tiles/request",
+                json.dumps({"client": self.player_id, "tiles": missing}))
+
+    # ---------- MQTT ----------
+
+    def on_mqtt_connect(self, client, userdata, flags, rc, properties):
+        print(f"{self.player_id} Arcade connesso!")
+        self.client.subscribe("maze/config")
+        self.client.subscribe("maze/state")
+        self.client.subscribe("maze/winner")
+        for topic in AI_TOPICS:
+            self.client.subscribe(topic)
+        self.client.subscribe(f"maze/tiles/{self.player_id}")
+        self.client.subscribe(PATCH_TOPIC)
+        self.client.subscribe(f"{PATCH_TOPIC}/{self.player_id}")
+        self.client.subscribe(f"{VIEW_TOPIC}/{self.player_id}")
+        self.client.subscribe(f"maze/state/{self.player_id}")
+
+    def on_mqtt_message(self, client, userdata, msg):
+        self.bus.put(msg.topic, msg.payload)
+
+    def handle_message(self, topic, payload):
+        """Gestione di un messaggio, nel thread di arcade (da on_update)"""
+        try:
+            data = json.loads(payload)
+
+            if topic == "maze/config":
+                if data.get("reset_game", False):
+                    self.on_reset_click(None)
+                    return
+
+                if data.get("game_ready") and self.state == "join" and self.pos is None \
+                        and self.player_id not in data.get("players", {}):
+                    # Partita (retained) in corso senza di noi: si resta sulla schermata di join
+                    return
+
+                self.maze_size = data.get("size", self.maze_size)
+                self.griglia = data.get("maze", self.griglia)
+                self.pos = data.get("players", {}).get(self.player_id, self.pos)
+                self.exit_pos = data.get("exit", self.exit_pos)
+                self.maze_version = data.get("version", self.maze_version)
+                self.game_ready = data.get("game_ready", False)
+
+                # Entità annunciate dal server (le altre arrivano con i loro messaggi)
+                self.pending_entities["exit"] = self.exit_pos
+                self.pending_entities.update(data.get("players", {}))
+
+                if data.get("fog", False):
+                    # Tutto ignoto (trasparente) finché il server non ce lo mostra
+                    self.fog = True
+                    self.griglia = [[UNKNOWN] * self.maze_size for _ in range(self.maze_size)]
+                    self.client.unsubscribe(AI_TOPICS)
+
+                if data.get("tiled", False):
+                    self.griglia = None
+                    self.tiles = TileCache(self.maze_size, data["tile_size"])
+                    self.richiedi_tile(self.pos)
+
+                if self.maze_size is not None:
+                    self.cell_size = CELL_PX
+                    print(f"🎮 Labirinto {self.maze_size}x{self.maze_size} caricato!")
+
+                if self.game_ready:
+                    self.state = "game"
+                    self.build_maze()
+
+            elif topic == f"maze/tiles/{self.player_id}":
+                if self.tiles is not None:
+                    self.pending_tiles += self.tiles.add(data)
+
+            elif topic in (PATCH_TOPIC, f"{PATCH_TOPIC}/{self.player_id}"):
+                self.apply_patch(data, resync=topic != PATCH_TOPIC)
+
+            elif topic == f"{VIEW_TOPIC}/{self.player_id}":
+                # Celle appena entrate nella nostra vista
+                if self.griglia is not None:
+                    self.pending_cells += apply_cells(self.griglia, decode_cells(data["cells"]))
+
+            elif topic in ("maze/state", f"maze/state/{self.player_id}"):
+                # Snapshot del tick: solo le posizioni cambiate (la nostra la decidiamo in locale)
+                for entity_id, pos in data.get("pos", {}).items():
+                    if entity_id != self.player_id:
+                        self.pending_entities[entity_id] = pos
+
+                # Nebbia: entità uscite dalla vista
+                for entity_id in data.get("hidden", []):
+                    self.pending_entities[entity_id] = None
+
+                # Mossa rifiutata dal server: torna alla posizione autorevole
+                if self.player_id in data.get("rejected", []):
+                    self.pos = data["pos"][self.player_id]
+                    self.prev_pos = None
+
+            elif topic.startswith("maze/InformedAI") and self.fog:
+                pass  # messaggio arrivato prima della disiscrizione: le AI viste arrivano su maze/state/<id>
+
+            elif topic == "maze/InformedAI":
+                self.pending_entities["InformedAI"] = data
+
+            elif topic == EXPLORE_TOPIC:
+                # Fotogramma dell'esplorazione: celle nella heatmap, ultima cella = posizione dell'AI
+                self.heatmap.apply(data)
+                if data.get("pos"):
+                    self.pending_entities["InformedAI"] = data["pos"]
+
+            elif topic.startswith("maze/InformedAI/") and topic.rsplit("/", 1)[1].isdigit():
+                # AI cooperative: maze/InformedAI/<n>
+                self.pending_entities["InformedAI" + topic.rsplit("/", 1)[1]] = data
+
+            elif "winner" in topic:
+                self.winner = data["winner"]
+                self.state = "game_over"
+                print(f"{self.winner.upper()} HA VINTO!")
+
+        except Exception as e:
+            print(f"MQTT errore: {e}")
+
+    def apply_patch(self, data, resync=False):
+        """Muri cambiati dal server: aggiorna la griglia, i blocchi si ricuociono in on_update"""
+        version = data["version"]
+        if self.fog:
+            return  # le celle cambiate in vista arrivano già su maze/view/<id>
+        if not self.maze_loaded() or version < self.maze_version or (version == self.maze_version and not resync):
+            return
+
+        if version > self.maze_version + 1 and not resync:
+            # Persa almeno una patch: il server rimanda tutte le celle cambiate
+            self.client.publish(f"maze/{self.player_id}/resync", json.dumps({"version": self.maze_version}))
+
+        cells = decode_cells(data["cells"])
+        if self.tiles is not None:
+            for x, y, value in cells:
+                key = self.tiles.set_cell(x, y, value)
+                if key is not None and key not in self.pending_tiles:
+                    self.pending_tiles.append(key)
+        else:
+            self.pending_cells += apply_cells(self.griglia, cells)
+
+        self.maze_version = version
+
+    # ---------- UI JOIN PAGE ----------
+
+    def draw_join_ui(self):
+        """Costruisce i widget della join page una sola volta."""
+        self.vbox = arcade.gui.UIBoxLayout()
+
+        title = arcade.gui.UILabel(
+            text="Moonlight Maze",
+            font_size=68,
+            font_name=("Courier New", "Consolas", "monospace"),
+            text_color=arcade.color.CYAN
+        )
+        self.vbox.add(title)
+        self.vbox.add(arcade.gui.UISpace(height=120))
+
+        instructions = arcade.gui.UILabel(
+            text="Inserisci il tuo nome:",
+            font_size=24,
+            text_color=arcade.color.WHITE,
+            font_name=("Courier New", "Consolas", "monospace")
+        )
+        self.vbox.add(instructions)
+
+        self.name_input = arcade.gui.UIInputText(
+            width=300,
+            height=50,
+            font_size=24,
+            font_name=("Courier New", "Consolas", "monospace")
+        )
+        self.vbox.add(self.name_input)
+        self.vbox.add(arcade.gui.UISpace(height=50))
+
+        play_btn = arcade.gui.UIFlatButton(
+            text="INIZIA GIOCO",
+            width=200,
+            height=60,
+            font_name=("Courier New", "Consolas", "monospace")
+        )
+        play_btn.on_click = self.on_play_click
+        self.vbox.add(play_btn)
+
+        self.join_anchor = self.manager.add(arcade.gui.UIAnchorLayout(size_hint=(1, 1)))
+        self.join_anchor.add(child=self.vbox, anchor_x="center_x", anchor_y="center_y")
+
+    def draw_reset_button(self):
+        """Bottone RESET in alto a destra (sempre visibile)"""
+        self.btn_reset = arcade.gui.UIFlatButton(
+            text="🔄 RESET GAME",
+            width=150,
+            height=50,
+            font_name=("Courier New", "Consolas", "monospace")
+        )
+        self.btn_reset.on_click = self.on_reset_click
+
+        # Aggiungi in alto a destra
+        anchor = self.manager.add(arcade.gui.UIAnchorLayout(size_hint=(1, 1)))
+        anchor.add(
+            child=self.btn_reset,
+            anchor_x="right",
+            anchor_y="top",
+            align_x=-20,  # 20px dal bordo destro
+            align_y=-20  # 20px dal bordo alto
+        )
+
+    def on_reset_click(self, event):
+        """Reset completo del client"""
+        print("🔄 Reset client...")
+
+        # Reset stato
+        if self.fog:
+            for topic in AI_TOPICS:
+                self.client.subscribe(topic)
+        self.state = "join"
+        self.reset_state()
+        self.keys_pressed = {}
+        self.outbound.clear()
+
+        self.name_input.text = ""
+        self.player_name = ""
+
+        # Mostra di nuovo la join GUI
+        self.manager.enable()
+        self.join_anchor.visible = True
+
+        print("✅ Client resettato - torna alla schermata join")
+
+    def on_play_click(self, event):
+        self.player_name = self.name_input.text
+        if self.player_name != "":
+            print(f"👤 Giocatore: {self.player_name}")
+            self.state = "waiting"
+
+            # Nascondi la join GUI
+            self.join_anchor.visible = False
+
+            # Notifica al server che il player è pronto (topic a tua scelta)
+            self.client.publish(
+                f"maze/{self.player_id}/join",
+                json.dumps({"name": self.player_name}))
+
+    # ---------- DRAW ----------
+    def draw_winner_banner(self, text: str):
+        # Posizione: sopra il labirinto (parte alta della finestra)
+        # Pannello, contorno, ombra e testo vengono ricostruiti solo se cambiano
+        self.overlay.banner("winner", text, self.width // 2, self.height - 70)
+
+    def build_maze(self):
+        """Cuoce il labirinto in texture (stesso contenuto = cache, nessuna ricottura)"""
+        if not self.maze_loaded() or self.maze_size is None:
+            return
+
+        if self.tiles is not None:
+            if self.maze_renderer.chunk_cells != self.tiles.tile_size:
+                self.maze_renderer = MazeRenderer(chunk_cells=self.tiles.tile_size)
+            self.maze_renderer.clear()
+            self.pending_tiles = list(self.tiles.tiles)
+        else:
+            self.maze_renderer.load_grid(self.griglia)
+
+        self.heatmap.reset(self.maze_size)
+        self.camera.reset(self.maze_size)
+
+    def build_tiles(self):
+        """Cuoce solo le tile arrivate dall'ultimo frame"""
+        while self.pending_tiles:
+            tx, ty = self.pending_tiles.pop()
+            self.maze_renderer.set_chunk(tx, ty, self.tiles.tile_cells(tx, ty))
+
+    def on_resize(self, width, height):
+        super().on_resize(width, height)
+
+        # Cambia solo la vista della camera: le texture cotte restano valide
+        if hasattr(self, "camera"):
+            self.camera.match_window()
+
+    def on_draw(self):
+        self.clear()
+        arcade.set_background_color(arcade.color.MIDNIGHT_BLUE)
+        self.overlay.begin()
+
+        # SCHERMATA JOIN
+        if self.state == "join":
+            self.manager.draw()
+            return
+
+        # SCHERMATA ATTESA CONFIG
+        if self.state == "waiting" or not self.game_ready:
+            self.manager.draw()
+            self.overlay.label(
+                "attesa", "In attesa del server... Puoi muoverti con WASD",
+                self.width // 2, self.height // 2 - 140)
+            self.overlay.label(
+                "ruolo", ROLE_TEXT.get(self.player_id, f"TU SEI {self.player_id.upper()}"),
+                self.width // 2, self.height // 2 - 180)
+            self.overlay.draw()
+            return
+
+        # GIOCO ATTIVO
+        if (self.pos is None
+                or not self.maze_loaded() or not self.maze_renderer.chunks):
+            self.overlay.label("caricamento", "Caricamento dati giocatore...",
+                               self.width // 2, self.height // 2)
+            self.overlay.draw()
+            return
+
+        # Solo i blocchi del labirinto e le entità dentro la vista
+        self.maze_renderer.cull(*self.camera.view_rect())
+        self.entities.cull(self.camera.cell_visible)
+
+        with self.camera.activate():
+            self.maze_renderer.draw()
+            self.heatmap.draw()
+
+            # USCITA, GIOCATORI E BOT
+            self.entities.draw()
+
+        self.manager.disable()
+
+        # SCHERMATA GAME OVER
+        if self.state == "game_over":
+            self.manager.disable()
+            if self.winner:
+                label = "🏆 " + self.winner.upper() + " HA VINTO!"
+                self.draw_winner_banner(label)
+
+        self.overlay.draw()
+
+    # ---------- INPUT & LOGICA ----------
+
+    def apply_entities(self):
+        """Applica le posizioni arrivate dalla rete (sprite creati/spostati nel thread GUI)"""
+        pending, self.pending_entities = self.pending_entities, {}
+        for entity_id, pos in pending.items():
+            if pos is None:
+                self.entities.remove(entity_id)
+                continue
+            self.entities.update(entity_id, pos, radius_cells=1.5 if entity_id == "exit" else 1.0)
+
+    def on_key_press(self, key, modifiers):
+        if self.state != "game":
+            return
+
+        # Zoom camera
+        if key in (arcade.key.PLUS, arcade.key.EQUAL, arcade.key.NUM_ADD):
+            self.camera.zoom(1)
+            return
+        if key in (arcade.key.MINUS, arcade.key.NUM_SUBTRACT):
+            self.camera.zoom(-1)
+            return
+
+        self.keys_pressed[key] = True
+
+    def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
+        if self.state == "game" and scroll_y:
+            self.camera.zoom(1 if scroll_y > 0 else -1)
+
+    def on_key_release(self, key, modifiers):
+        if self.state != "game":
+            return
+        self.keys_pressed.pop(key, None)
+
+    def is_valid_move_local(self, new_pos):
+        if not self.maze_loaded():
+            return False
+
+        x, y = int(new_pos[0]), int(new_pos[1])
+
+        if not (0 <= x < self.maze_size and 0 <= y < self.maze_size):
+            return False
+
+        value = self.cella(x, y)
+        return value != WALL and value != UNKNOWN
+
+    def on_update(self, delta_time):
+
+        self.manager.on_update(delta_time)
+
+        # Messaggi arrivati dall'ultimo frame, a blocchi
+        self.bus.drain(self.handle_message, MAX_MESSAGES_PER_FRAME)
+
+        if self.pending_tiles and self.tiles is not None:
+            self.build_tiles()
+
+        if self.pending_cells and self.griglia is not None:
+            # Solo i blocchi con celle cambiate
+            self.maze_renderer.update_cells(self.griglia, self.pending_cells)
+            self.pending_cells = []
+
+        if self.pending_entities:
+            self.apply_entities()
+
+        if self.state == "game":
+            # Passi fissi: un frame lento ne recupera al massimo MAX_CATCHUP_STEPS
+            self.step_acc = min(self.step_acc + delta_time, MOVE_STEP * MAX_CATCHUP_STEPS)
+            while self.step_acc >= MOVE_STEP:
+                self.step_acc -= MOVE_STEP
+                self.move_step()
+
+        # Giocatore locale e camera sulla posizione interpolata
+        if self.state in ("game", "game_over") and self.pos is not None:
+            render_pos = self.render_pos()
+            self.entities.update(self.player_id, render_pos)
+            self.camera.follow(render_pos, delta_time)
+
+        self.outbound.flush()
+
+    def move_step(self):
+        """Un passo di simulazione dell'input"""
+        self.prev_pos = self.pos[:] if self.pos else None
+
+        if self.step_wait:
+            # Terreno lento: la cella costa più di un passo
+            self.step_wait -= 1
+            return
+
+        if not (self.game_ready and not self.winner and self.keys_pressed):
+            return
+
+        new_pos = self.pos[:]
+        moved = False
+
+        if arcade.key.S in self.keys_pressed:
+            new_pos[1] -= 1
+            moved = True
+        if arcade.key.W in self.keys_pressed:
+            new_pos[1] += 1
+            moved = True
+        if arcade.key.A in self.keys_pressed:
+            new_pos[0] -= 1
+            moved = True
+        if arcade.key.D in self.keys_pressed:
+            new_pos[0] += 1
+            moved = True
+
+        if moved and self.is_valid_move_local(new_pos):
+            self.pos = new_pos
+            self.step_wait = cell_cost(self.cella(*new_pos)) - 1
+            self.outbound.put(f"maze/{self.player_id}/move", {"name": self.player_id, "pos": new_pos})
+            self.richiedi_tile(new_pos)
+
+    def render_pos(self):
+        """Posizione tra il passo precedente e quello corrente (frazione del passo trascorsa)"""
+        prev, pos = self.prev_pos, self.pos
+        if prev is None or max(abs(pos[0] - prev[0]), abs(pos[1] - prev[1])) > 1:
+            return pos
+
+        alpha = self.step_acc / MOVE_STEP
+        return [prev[0] + (pos[0] - prev[0]) * alpha, prev[1] + (pos[1] - prev[1]) * alpha]
+
+
+def main(player_id):
+    print(f"🎮 AVVIO Midnight Maze ARCADE ({player_id})...")
+    window = MidnightMaze(player_id)
+    arcade.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Client Moonlight Maze")
+    parser.add_argument("player_id", nargs="?", default="player1",
+                        help="id del giocatore (es. player1, player2, player3...)")
+    main(parser.parse_args().player_id)
@@ -0,0 +1,127 @@
+"""
+Registro dei giocatori di una partita: id MQTT (maze/<id>/...) -> sessione.
+"""
+from collections import deque
+
+from maze_utils import is_walkable
+
+
+# player1 e player2 restano negli angoli storici
+LEGACY_CORNERS = {"player1": 0, "player2": 1}
+
+
+class PlayerSession:
+    def __init__(self, player_id, name):
+        self.player_id = player_id
+        self.name = name
+        self.start = None
+        self.pos = None
+
+
+def distance_map(maze, source):
+    """BFS dalla cella source [x, y]: dizionario (x, y) -> distanza"""
+    dist = {tuple(source): 0}
+    queue = deque([tuple(source)])
+
+    while queue:
+        x, y = queue.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if (nx, ny) not in dist and 0 <= ny < len(maze) and 0 <= nx < len(maze[0]) \
+                    and is_walkable(maze[ny][nx]):
+                dist[(nx, ny)] = dist[(x, y)] + 1
+                queue.append((nx, ny))
+
+    return dist
+
+
+def fair_starts(maze, exit_pos, count):
+    """
+    count partenze alla stessa distanza dall'uscita (per quanto possibile).
+    Prima i quattro angoli simmetrici, poi le celle più vicine alla stessa distanza,
+    scelte il più lontano possibile da quelle già prese.
+    """
+    size = len(maze)
+    corners = [[1, 1], [size - 2, size - 2], [size - 2, 1], [1, size - 2]]
+    dist = distance_map(maze, exit_pos)
+
+    starts = [c for c in corners if tuple(c) in dist][:count]
+    if len(starts) >= count:
+        return starts
+
+    target = dist[tuple(starts[0])] if starts else max(dist.values())
+    taken = {tuple(s) for s in starts}
+    candidates = sorted((abs(d - target), cell) for cell, d in dist.items() if cell not in taken)
+
+    i = 0
+    while len(starts) < count and i < len(candidates):
+        # Celle con lo stesso scarto di distanza: scegli la più distante dalle partenze già assegnate
+        delta = candidates[i][0]
+        tier = []
+        while i < len(candidates) and candidates[i][0] == delta:
+            tier.append(candidates[i][1])
+            i += 1
+
+        while tier and len(starts) < count:
+            best = max(tier, key=lambda c: min((abs(c[0] - s[0]) + abs(c[1] - s[1]) for s in starts),
+                                               default=0))
+            tier.remove(best)
+            starts.append(list(best))
+
+    return starts
+
+
+class PlayerRegistry:
+    def __init__(self):
+        self.players = {}  # id -> PlayerSession (ordine di join)
+
+    def __len__(self):
+        return len(self.players)
+
+    def __contains__(self, player_id):
+        return player_id in self.players
+
+    def get(self, player_id):
+        return self.players.get(player_id)
+
+    def sessions(self):
+        return list(self.players.values())
+
+    def names(self):
+        return [s.name for s in self.players.values()]
+
+    def join(self, player_id, name):
+        """Registra il giocatore; None se il nome è già usato da un altro id"""
+        for session in self.players.values():
+            if session.name == name and session.player_id != player_id:
+                return None
+
+        session = self.players.get(player_id) or PlayerSession(player_id, name)
+        session.name = name
+        self.players[player_id] = session
+        return session
+
+    def clear(self):
+        self.players = {}
+
+    def assign_starts(self, maze, exit_pos):
+        """Partenze eque per tutti i giocatori registrati"""
+        size = len(maze)
+        corners = [[1, 1], [size - 2, size - 2]]
+        legacy = [s for s in self.players.values() if s.player_id in LEGACY_CORNERS]
+        others = [s for s in self.players.values() if s.player_id not in LEGACY_CORNERS]
+
+        for session in legacy:
+            session.start = corners[LEGACY_CORNERS[session.player_id]]
+
+        used = {tuple(s.start) for s in legacy}
+        extra = [s for s in fair_starts(maze, exit_pos, len(others) + len(used))
+                 if tuple(s) not in used]
+
+        for session, start in zip(others, extra):
+            session.start = start
+
+        for session in self.players.values():
+            session.pos = list(session.start) if session.start else None
+
+    def starts(self):
+        return {pid: s.start for pid, s in self.players.items() if s.start}
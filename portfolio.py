@@ -0,0 +1,174 @@
+"""
+Portfolio di strategie: stesse partenza e uscita risolte in parallelo da più
+strategie, ognuna nel suo processo. Vince il primo risultato che rispetta la
+qualità richiesta (limite garantito sul rapporto con il percorso ottimo);
+gli altri processi vengono terminati.
+
+Le vittorie si accumulano in PORTFOLIO_STATS per caratteristiche del
+labirinto (dimensione, quantità di cicli), così i default si scelgono dai dati.
+
+    python portfolio.py --size 133 --count 20 --loops 0.1
+"""
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+
+import numpy as np
+
+from GraphSearch import BidirectionalSearch, BucketSearch, GreedySearch, MazeProblem, ara_star, graph_search
+from hpa import HierarchicalSearch
+from maze_catalog import degree_map
+from maze_utils import WALL
+
+
+PORTFOLIO_STATS = "portfolio_stats.json"
+
+
+class WeightedAStar:
+    """A* pesato (una sola iterazione di ARA*): percorso entro weight volte l'ottimo"""
+    def __init__(self, problem, weight=1.0):
+        self.problem = problem
+        self.weight = weight
+
+    def search(self, on_expand=None):
+        for _, path, expanded in ara_star(self.problem, [self.weight]):
+            return 'success', path, expanded
+        return 'fail', [], 0
+
+
+# nome -> (costruttore della strategia, limite garantito rispetto all'ottimo)
+STRATEGIES = {
+    "greedy": (GreedySearch, math.inf),
+    "a*": (WeightedAStar, 1.0),
+    "wa*-2": (lambda p: WeightedAStar(p, 2.0), 2.0),
+    "bidir-a*": (BidirectionalSearch, 1.0),
+    "bucket-a*": (BucketSearch, 1.0),
+    "hpa*": (HierarchicalSearch, math.inf),
+}
+
+
+def maze_features(maze, start, goal):
+    """Caratteristiche usate per raggruppare le statistiche"""
+    grid = np.asarray(maze, dtype=np.int8)
+    deg = degree_map(grid[None])[0]
+    cells = int((grid != WALL).sum())
+    edges = int(deg.sum()) // 2
+
+    return {
+        "size": len(maze),
+        "loops": round((edges - cells + 1) / max(cells, 1), 3),  # rango ciclico per cella
+        "dead_ends": int((deg == 1).sum()),
+        "distance": abs(start[0] - goal[0]) + abs(start[1] - goal[1]),
+    }
+
+
+def feature_bucket(features):
+    # Cicli a scaglioni di 0.05: 0 = labirinto perfetto (un solo percorso)
+    return f"size={features['size']},loops={math.floor(features['loops'] * 20) / 20:.2f}"
+
+
+def _worker(name, maze, start, goal, results):
+    problem = MazeProblem(start, goal, maze)
+    t0 = time.perf_counter()
+    status, path, expanded = graph_search(problem, STRATEGIES[name][0](problem))
+    results.put((name, status, path, expanded, time.perf_counter() - t0))
+
+
+def solve_portfolio(maze, start, goal, strategies=None, max_bound=math.inf, timeout=None,
+                    stats_path=PORTFOLIO_STATS):
+    """
+    Risolve con tutte le strategie in parallelo; ritorna il primo risultato con
+    limite garantito <= max_bound (None se nessuno lo rispetta entro timeout).
+    """
+    names = [n for n in (strategies or STRATEGIES) if STRATEGIES[n][1] <= max_bound]
+    results = mp.Queue()
+    workers = {name: mp.Process(target=_worker, args=(name, maze, start, goal, results), daemon=True)
+               for name in names}
+
+    t0 = time.perf_counter()
+    for worker in workers.values():
+        worker.start()
+
+    winner = None
+    pending = set(names)
+    try:
+        while pending:
+            remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - t0))
+            try:
+                name, status, path, expanded, seconds = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            pending.discard(name)
+            if status == 'success':
+                winner = {"winner": name, "status": status, "path": path,
+                          "expanded": expanded, "seconds": round(time.perf_counter() - t0, 4)}
+                break
+    finally:
+        # I perdenti vengono fermati subito
+        for worker in workers.values():
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers.values():
+            worker.join()
+
+    if winner:
+        winner["features"] = maze_features(maze, start, goal)
+        if stats_path:
+            record_win(stats_path, winner["features"], winner["winner"])
+    return winner
+
+
+def record_win(path, features, name):
+    stats = {}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            stats = json.load(f)
+
+    bucket = stats.setdefault(feature_bucket(features), {})
+    bucket[name] = bucket.get(name, 0) + 1
+
+    with open(path, "w") as f:
+        json.dump(stats, f, indent=4, sort_keys=True)
+
+
+def best_strategy(features, stats_path=PORTFOLIO_STATS, default="greedy"):
+    """Strategia che vince più spesso su labirinti simili"""
+    if not os.path.exists(stats_path):
+        return default
+    with open(stats_path, "r") as f:
+        bucket = json.load(f).get(feature_bucket(features))
+    return max(bucket, key=bucket.get) if bucket else default
+
+
+if __name__ == "__main__":
+    from benchmark import open_loops
+    from maze_catalog import exit_position, start_positions
+    from maze_utils import genera_labirinto_simmetrico
+
+    parser = argparse.ArgumentParser(description="Portfolio di strategie in parallelo")
+    parser.add_argument("--size", type=int, default=67)
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--loops", type=float, default=0.0, help="frazione di muri interni da abbattere")
+    parser.add_argument("--max-bound", type=float, default=math.inf,
+                        help="qualità richiesta (1.0 = solo strategie ottime)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for i in range(args.count):
+        maze = genera_labirinto_simmetrico(args.size, rng)
+        open_loops(maze, args.loops, rng)
+
+        start, goal = start_positions(args.size)["InformedAI"], exit_position(args.size)
+        result = solve_portfolio(maze, start, goal, max_bound=args.max_bound)
+        if result:
+            print(f"🏁 {i}: vince {result['winner']} in {result['seconds'] * 1000:.0f} ms, "
+                  f"{len(result['path'])} passi ({feature_bucket(result['features'])})")
+        else:
+            print(f"❌ {i}: nessuna strategia ha trovato un percorso")
@@ -2,10 +2,22 @@ import arcade
 import arcade.gui
 import paho.mqtt.client as mqtt
 import json
-import random
 import threading
 import time
 
+from maze_renderer import MazeRenderer
+from maze_catalog import MazeCatalog, DIFFICULTY_BANDS
+from maze_store import TILE_SIZE, TiledMazeStore
+from game_rules import is_valid_move, reached_exit
+from player_registry import PlayerRegistry
+from message_bus import MessageBus
+from exploration import EXPLORE_TOPIC
+from maze_patch import PATCH_TOPIC, apply_cells, encode_cells, shift_walls
+from shared_maze import SHARED_TOPIC, SharedMaze
+from snapshot import LEADERBOARD_TOP, SNAPSHOT_PATH, load_snapshot, save_snapshot
+from visibility import VIEW_TOPIC, PlayerView, SightTable
+from maze_utils import aggiungi_terreno, genera_labirinto_simmetrico
+
 
 ###############
 # JSON FUNCTION
@@ -56,71 +68,41 @@ def format_time(seconds):
 
 MAZE_SIZE = 67
 exit_pos = [int(MAZE_SIZE / 2), int(MAZE_SIZE / 2)]
-positions = {"player1": [1, 1], "player2": [MAZE_SIZE - 2, MAZE_SIZE - 2]}
-
-
-#######################
-# GENERAZIONE LABIRINTO
-#######################
-
-def genera_labirinto_simmetrico(size):
-    """
-    Genera labirinto simmetrico 4-quadranti
-    Player 1 (1,1) e Player 2 (N-2,N-2) avranno SEMPRE stessa distanza dall'uscita
-    """
-    assert size % 2 == 1, "Size deve essere dispari per simmetria"
-
-    # Dimensione quadrante
-    quad_size = size // 2 + 1
-
-    # Genera solo il QUADRANTE SUPERIORE SINISTRO
-    quad = [[1 for _ in range(quad_size)] for _ in range(quad_size)]
-
-    # DFS solo nel quadrante
-    stack = [(1, 1)]
-    quad[1][1] = 0
+MIN_PLAYERS = 2
 
-    directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
+# Simulazione a tick fissi: una snapshot per tick invece di un publish per mossa
+TICK_RATE = 20
+MAX_STEPS_PER_TICK = 6  # fino a 3 passi del client (anche diagonali) fusi in un invio
+KEYFRAME_TICKS = 40  # ogni 2 s una snapshot completa per chi ha perso dei delta
 
-    while stack:
-        x, y = stack[-1]
-        random.shuffle(directions)
-        found = False
+# Labirinti grandi: consegna a tile su richiesta invece che in un unico maze/config.
+# Per provarla basta un MAZE_SIZE dispari oltre 127 (es. 255): i client scaricano
+# le tile attorno a sé, l'Informed AI le chiede tutte (o legge la griglia con --shared)
+TILED_DELIVERY = MAZE_SIZE > 127
+STORE_PATH = "maze_store.bin"
 
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 < nx < quad_size - 1 and 0 < ny < quad_size - 1:
-                if quad[ny][nx] == 1:
+# Terreni (fango, ghiaccio, porte): frazione dei corridoi, 0 = labirinto classico
+TERRAIN_FRACTION = 0.0
 
-                    found = True
-                    quad[ny][nx] = 0
-                    quad[y + dy // 2][x + dx // 2] = 0
-                    stack.append((nx, ny))
-                    break
+# Modalità muri mobili: ogni SHIFT_EVERY_TICKS un muro si sposta (patch su maze/patch)
+SHIFTING_WALLS = False
+SHIFT_EVERY_TICKS = 5 * TICK_RATE
 
-        if not found:
-            stack.pop()
+# Nebbia di guerra: ogni client riceve solo le celle e le entità che vede. Le AI
+# (solo GraphSearch.py --shared) non pubblicano l'esplorazione e le loro posizioni
+# arrivano ai giocatori attraverso il server, come quelle degli altri giocatori
+FOG_OF_WAR = False
 
-    # Genera il labirinto a grandezza originale
-    grid = [[1 for _ in range(size)] for _ in range(size)]
+# Solver sulla stessa macchina (GraphSearch.py --shared): griglia in memoria condivisa +
+# descrittore retained su maze/shared. Opzionale: senza solver locali il segmento non serve
+SHARED_MAZE = False
 
-    for qy in range(quad_size):
-        for qx in range(quad_size):
-            grid[qy][qx] = quad[qy][qx]
-            grid[qy][size - 1 - qx] = quad[qy][qx]
-            grid[size - 1 - qy][qx] = quad[qy][qx]
-            grid[size - 1 - qy][size - 1 - qx] = quad[qy][qx]
+# Ripartenza a caldo: snapshot binaria dello stato ogni SNAPSHOT_EVERY_TICKS (None = disattivata)
+SNAPSHOT_FILE = SNAPSHOT_PATH
+SNAPSHOT_EVERY_TICKS = 5 * TICK_RATE
 
-    # Assicura celle chiave percorribili
-    center = size // 2
-
-    # Collega i quadranti al centro (se necessario)
-    for i in range(center - 2, center + 3):
-        for j in range(center - 2, center + 3):
-            if 0 <= i < size and 0 <= j < size:
-                grid[i][j] = 0
-
-    return grid
+# Le AI non passano dal server per muoversi: le loro posizioni si leggono dai loro topic
+AI_TOPIC = "maze/InformedAI"
 
 
 #####################
@@ -132,10 +114,6 @@ class ServerDashboard(arcade.Window):
         super().__init__(1300, 500, "🎮 Maze Server Dashboard", resizable=True)
         arcade.set_background_color(arcade.color.MIDNIGHT_BLUE)
 
-        # Texture labirinto
-        self.wall_texture = arcade.load_texture("./assets/wall.png")
-        self.floor_texture = arcade.load_texture("./assets/floor.png")
-
         # UI Manager
         self.manager = arcade.gui.UIManager(self)
         self.manager.enable()
@@ -143,8 +121,7 @@ class ServerDashboard(arcade.Window):
         # Stato
         self.needs_update = False
         self.pending_winner = None
-        self.players_connected = 0
-        self.player_names = {}
+        self.players = PlayerRegistry()
         self.winner = None
         self.game_started = False
         self.maze = None
@@ -153,11 +130,20 @@ class ServerDashboard(arcade.Window):
         self.maze_area_width = 800
         self.gui_area_x = self.maze_area_width
 
-        # SpriteList per il labirinto
-        self.maze_sprite_list = None
+        # Renderer labirinto (texture cotte, un solo draw)
+        self.maze_renderer = MazeRenderer()
+        self.maze_cell_size = 6
+
+        # Catalogo labirinti per difficoltà (se generato con maze_catalog.py)
+        self.catalog = MazeCatalog.open(size=MAZE_SIZE)
+        self.difficulty = "medio"
+
+        # Stato salvato dall'esecuzione precedente: niente generazione né lettura della classifica
+        snapshot = load_snapshot(SNAPSHOT_FILE, MAZE_SIZE) if SNAPSHOT_FILE else None
 
         # Genera labirinto
-        self.maze = genera_labirinto_simmetrico(MAZE_SIZE)
+        self.maze = snapshot["maze"].tolist() if snapshot else self.nuovo_labirinto()
+        self.store = TiledMazeStore.from_grid(STORE_PATH, self.maze)
         #self.maze = [[1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1], [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1], [1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1], [1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1], [1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1], [1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1], [1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1], [1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1], [1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1], [1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1], [1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1], [1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1], [1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1], [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1], [1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1], [1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1], [1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1], [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1], [1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1], [1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1], [1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1], [1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1], [1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1], [1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1], [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1], [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1], [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1], [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1], [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1], [1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1], [1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1], [1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1], [1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1], [1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1], [1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1], [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1], [1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1], [1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1], [1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1], [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1], [1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1], [1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1], [1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1], [1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1], [1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1], [1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1], [1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1], [1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 0, 1], [1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1], [1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1], [1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1, 0, 1, 0, 0, 0, 1], [1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 0, 1], [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1], [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]]
 
         # Costruisci sprite subito
@@ -167,7 +153,44 @@ class ServerDashboard(arcade.Window):
         self.game_start_time = None
 
         # Leaderboard
-        self.leaderboard = get_top_players(20)
+        self.leaderboard = snapshot["leaderboard"] if snapshot else get_top_players(LEADERBOARD_TOP)
+
+        # Segmento condiviso con i solver locali (uno per partita)
+        self.shared_maze = None
+
+        # Il thread MQTT accoda soltanto; il tick svuota la coda e simula
+        self.bus = MessageBus()
+
+        # Ultima mossa ricevuta per giocatore in questo tick
+        self.pending_moves = {}
+        self.tick_count = 0
+
+        # Ultima posizione di ogni AI (InformedAI, InformedAI<n> -> [x, y]), per non murarle
+        # vive e, con la nebbia, per inoltrarle solo a chi le vede (ai_moved: dall'ultimo tick)
+        self.ai_positions = {}
+        self.ai_moved = {}
+
+        # Versione del labirinto (patch applicate) e celle cambiate dall'inizio della partita
+        self.maze_version = 0
+        self.patched = {}
+
+        # Nebbia di guerra: tabelle dei corridoi e vista di ogni giocatore
+        self.sight = None
+        self.views = {}
+
+        # Ripartenza: lo stato ripreso va riannunciato appena c'è la connessione
+        self.snapshot_ticks = 0
+        self.announce_pending = False
+        if snapshot:
+            self.restore_snapshot(snapshot)
+
+        # Dispatch: azione del topic maze/<id>/<azione> -> handler
+        self.handlers = {
+            "join": self.handle_join,
+            "move": self.handle_move,
+            "request": self.handle_tile_request,
+            "resync": self.handle_resync,
+        }
 
         # MQTT Client
         self.client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
@@ -176,96 +199,330 @@ class ServerDashboard(arcade.Window):
         self.client.connect("localhost", 1883, 60)
         threading.Thread(target=self.client.loop_forever, daemon=True).start()
 
+        # Game loop a tick fissi
+        arcade.schedule(self.tick, 1 / TICK_RATE)
+
         # Build UI
         self.draw_ui()
         self.draw_leaderboard()
 
         print(f"🚀 Server Dashboard avviato! Labirinto {MAZE_SIZE}x{MAZE_SIZE}")
 
+    def restore_snapshot(self, snapshot):
+        """Riprende partita, giocatori e timer dalla snapshot (il labirinto è già caricato)"""
+        for player_id, name, start, pos in snapshot["sessions"]:
+            session = self.players.join(player_id, name)
+            session.start, session.pos = start, pos
+
+        self.game_started = snapshot["started"]
+        self.game_start_time = snapshot["start_time"]
+        self.winner = snapshot["winner"]
+        self.tick_count = snapshot["tick"]
+        self.maze_version = snapshot["version"]
+        self.patched = snapshot["patched"]
+        self.difficulty = snapshot["difficulty"] or self.difficulty
+        if self.catalog:
+            self.catalog.pool.update(snapshot["pool"])
+
+        if self.game_started and FOG_OF_WAR:
+            self.sight = SightTable(self.maze)
+        if self.game_started and SHARED_MAZE:
+            self.shared_maze = SharedMaze(self.maze)
+
+        self.announce_pending = self.game_started
+        self.needs_update = True
+        print(f"♻️ Stato ripreso dalla snapshot di {time.time() - snapshot['saved_at']:.1f}s fa "
+              f"({len(self.players)} giocatori, tick {self.tick_count}, labirinto v{self.maze_version})")
+
+    def save_snapshot(self):
+        if not SNAPSHOT_FILE:
+            return
+        save_snapshot(SNAPSHOT_FILE, {
+            "maze": self.maze,
+            "sessions": self.players.sessions(),
+            "patched": self.patched,
+            "tick": self.tick_count,
+            "version": self.maze_version,
+            "started": self.game_started,
+            "start_time": self.game_start_time,
+            "winner": self.winner,
+            "leaderboard": self.leaderboard,
+            "difficulty": self.difficulty,
+            "pool": self.catalog.pool if self.catalog else {},
+        })
+
+    def announce_resume(self):
+        """Dopo un riavvio: la configurazione attuale (retained) per chi si ricollega, poi viste e vincitore"""
+        config = self.build_config({s.player_id: s.pos for s in self.players.sessions() if s.pos})
+        config["resumed"] = True
+        self.client.publish("maze/config", json.dumps(config), retain=True)
+
+        if self.shared_maze:
+            self.client.publish(SHARED_TOPIC, json.dumps(self.shared_maze.descriptor(exit_pos, FOG_OF_WAR)), retain=True)
+        if self.sight:
+            for session in self.players.sessions():
+                if session.pos:
+                    self.update_view(session)
+        if self.winner:
+            winner = self.players.get(self.winner)
+            self.client.publish("maze/winner", json.dumps({"winner": winner.name}))
+
+        self.announce_pending = False
+        print("📣 Partita ripresa riannunciata ai client")
+
+    def nuovo_labirinto(self):
+        """Pesca dal catalogo nella fascia scelta, altrimenti genera al volo"""
+        maze = None
+        if self.catalog:
+            maze, info = self.catalog.pick(self.difficulty)
+            if maze:
+                print(f"📚 Labirinto #{info['id']} dal catalogo ({self.difficulty}, "
+                      f"percorso {info['solution_length']['player1']})")
+
+        maze = maze or genera_labirinto_simmetrico(MAZE_SIZE)
+        if TERRAIN_FRACTION:
+            aggiungi_terreno(maze, TERRAIN_FRACTION)
+        return maze
+
     def build_maze_sprites(self):
-        """Costruisci il labirinto come sprite (una volta sola)"""
+        """Cuoce il labirinto in texture (stesso contenuto = cache, nessuna ricottura)"""
         if not self.maze:
             return
 
-        print("🔨 Costruzione sprite labirinto server...")
-        self.maze_sprite_list = arcade.SpriteList()
-
-        cell_size = 6
-        offset_x = (self.width - MAZE_SIZE * cell_size - 40)
-        offset_y = (self.height - MAZE_SIZE * cell_size) // 2
+        print("🔨 Costruzione texture labirinto server...")
+        self.maze_renderer.load_grid(self.maze)
+        self.layout_maze()
+        print("✅ Texture labirinto server pronte!")
 
-        for y in range(MAZE_SIZE):
-            for x in range(MAZE_SIZE):
-                center_x = offset_x + x * cell_size + cell_size // 2
-                center_y = offset_y + y * cell_size + cell_size // 2
+    def layout_maze(self):
+        offset_x = (self.width - MAZE_SIZE * self.maze_cell_size - 40)
+        offset_y = (self.height - MAZE_SIZE * self.maze_cell_size) // 2
+        self.maze_renderer.layout(self.maze_cell_size, offset_x, offset_y)
 
-                if self.maze[y][x] != 0:
-                    sprite = arcade.Sprite("./assets/wall.png",
-                                           scale=cell_size / self.wall_texture.width)
-                else:
-                    sprite = arcade.Sprite("./assets/floor.png",
-                                           scale=cell_size / self.floor_texture.width)
-
-                sprite.center_x = center_x
-                sprite.center_y = center_y
-                self.maze_sprite_list.append(sprite)
-
-        print("✅ Sprite labirinto server costruiti!")
+    def on_resize(self, width, height):
+        super().on_resize(width, height)
+        if hasattr(self, "maze_renderer"):
+            self.layout_maze()
 
     def on_mqtt_connect(self, client, userdata, flags, rc, properties):
         print("✅ Server Dashboard connesso a MQTT")
-        client.subscribe("maze/player1/move")
-        client.subscribe("maze/player2/move")
-        client.subscribe("maze/player1/join")
-        client.subscribe("maze/player2/join")
+        client.subscribe("maze/+/move")
+        client.subscribe("maze/+/join")
+        client.subscribe("maze/tiles/request")
+        client.subscribe("maze/+/resync")
+        client.subscribe(AI_TOPIC)
+        client.subscribe(f"{AI_TOPIC}/+")
 
     def on_mqtt_message(self, client, userdata, msg):
+        self.bus.put(msg.topic, msg.payload)
+
+    def handle_message(self, topic, payload):
         try:
-            data = json.loads(msg.payload)
+            if topic == AI_TOPIC or topic.startswith(f"{AI_TOPIC}/"):
+                self.handle_ai(topic, payload)
+                return
 
-            if "join" in msg.topic:
-                player_name = data.get("name", "Unknown")
+            _, player_id, action = topic.split("/", 2)
+            handler = self.handlers.get(action)
+            if handler:
+                handler(self.client, player_id, json.loads(payload))
 
-                if player_name not in self.player_names.values():
-                    player_id = "player1" if "player1" in msg.topic else "player2"
-                    print(player_id)
-                    self.player_names[player_id] = player_name
-                    self.players_connected = len(self.player_names)
+        except Exception as e:
+            print(f"❌ Errore MQTT: {e}")
 
-                    self.needs_update = True
+    def handle_ai(self, topic, payload):
+        # Posizioni dell'AI singola (anche dai fotogrammi dell'esplorazione) e delle AI cooperative
+        if not payload:
+            return
+        data = json.loads(payload)
+        suffix = topic[len(AI_TOPIC) + 1:]
 
-                    print(f"👤 {player_name} connesso! ({self.players_connected}/2)")
+        if topic == EXPLORE_TOPIC:
+            entity_id, pos = "InformedAI", data.get("pos")
+        elif not suffix or suffix.isdigit():
+            entity_id, pos = "InformedAI" + suffix, data  # maze/InformedAI/<n> -> InformedAI<n>
+        else:
+            return
+        if pos:
+            self.ai_positions[entity_id] = self.ai_moved[entity_id] = list(pos[:2])
 
-            elif "move" in msg.topic:
-                if not self.game_started:
-                    return
+    def handle_tile_request(self, client, _, data):
+        if FOG_OF_WAR:
+            return  # con la nebbia le celle arrivano solo quando si vedono
 
-                player_id = "player1" if "player1" in msg.topic else "player2"
-                new_pos = data["pos"]
+        # Solo le tile chieste dal client, niente labirinto intero
+        client.publish(f"maze/tiles/{data['client']}",
+                       json.dumps(self.store.encode(data.get("tiles", []))))
 
-                positions[player_id] = new_pos
-                client.publish(f"maze/{player_id}/pos", json.dumps(new_pos))
+    def handle_resync(self, client, player_id, data):
+        # Il client ha perso una patch: tutte le celle cambiate, con la versione attuale
+        cells = [(x, y, v) for (x, y), v in self.patched.items()]
+        client.publish(f"{PATCH_TOPIC}/{player_id}",
+                       json.dumps({"version": self.maze_version, "cells": encode_cells(cells)}))
 
-                # CHECK VITTORIA
-                if ((abs(new_pos[0] - exit_pos[0]) in [-1, 0, 1]) and
-                        (abs(new_pos[1] - exit_pos[1]) in [-1, 0, 1])):
-                    # Stop timer
-                    elapsed_time = time.time() - self.game_start_time
-                    winner_name = self.player_names[player_id]
+    def handle_join(self, client, player_id, data):
+        player_name = data.get("name", "Unknown")
 
-                    # Aggiungo al file leaderboard
-                    self.leaderboard = add_record(winner_name, elapsed_time)
+        if self.players.join(player_id, player_name):
+            self.needs_update = True
+            print(f"👤 {player_name} connesso come {player_id}! ({len(self.players)} giocatori)")
 
-                    self.winner = player_id
+    def handle_move(self, client, player_id, data):
+        # Solo l'ultima mossa per giocatore: la applica il tick
+        self.pending_moves[player_id] = data["pos"]
 
-                    self.pending_winner = (player_id, winner_name, elapsed_time)
-                    self.needs_update = True
+    def tick(self, delta_time):
+        """Un passo di simulazione: valida le mosse, controlla la vittoria, pubblica il delta"""
+        self.bus.drain(self.handle_message)
+        moves, self.pending_moves = self.pending_moves, {}
 
-                    client.publish("maze/winner", json.dumps({"winner": winner_name}))
-                    print(f"🏆 {player_id.upper()} HA VINTO!")
+        if self.announce_pending and self.client.is_connected():
+            self.announce_resume()
 
-        except Exception as e:
-            print(f"❌ Errore MQTT: {e}")
+        self.snapshot_ticks += 1
+        if self.snapshot_ticks % SNAPSHOT_EVERY_TICKS == 0:
+            self.save_snapshot()
+
+        if not self.game_started:
+            return
+
+        self.tick_count += 1
+        ai_moved, self.ai_moved = self.ai_moved, {}
+        changed = {}
+        rejected = []
+        winner = None
+
+        for player_id, new_pos in moves.items():
+            session = self.players.get(player_id)
+            if session is None or session.pos is None or self.winner or winner:
+                continue
+
+            if not is_valid_move(self.maze, session.pos, new_pos, MAX_STEPS_PER_TICK):
+                # Mossa non valida: il client viene riportato alla posizione autorevole
+                rejected.append(player_id)
+                changed[player_id] = session.pos
+                continue
+
+            if new_pos != session.pos:
+                session.pos = new_pos
+                changed[player_id] = new_pos
+                if self.sight:
+                    self.update_view(session)
+
+            # CHECK VITTORIA
+            if reached_exit(new_pos, exit_pos):
+                winner = session
+
+        full = self.tick_count % KEYFRAME_TICKS == 0
+        if full:
+            changed = {s.player_id: s.pos for s in self.players.sessions() if s.pos}
+
+        if self.sight:
+            # Con la nebbia anche le AI passano dal server, filtrate per vista
+            self.publish_views({**changed, **ai_moved}, rejected, full)
+        elif changed or rejected:
+            snapshot = {"tick": self.tick_count, "pos": changed}
+            if full:
+                snapshot["full"] = True
+            if rejected:
+                snapshot["rejected"] = rejected
+            self.client.publish("maze/state", json.dumps(snapshot, separators=(",", ":")))
+
+        if winner:
+            self.declare_winner(winner)
+        elif SHIFTING_WALLS and not self.winner and self.tick_count % SHIFT_EVERY_TICKS == 0:
+            self.shift_walls()
+
+    def update_view(self, session, refresh=False, changed=()):
+        """Aggiorna la vista del giocatore e gli invia solo le celle nuove (o cambiate in vista)"""
+        view = self.views.get(session.player_id)
+        if view is None:
+            view = self.views[session.player_id] = PlayerView(self.sight)
+
+        cells = set(view.move(session.pos, refresh))
+        cells.update(c for c in changed if view.can_see(c))
+        if cells:
+            self.client.publish(f"{VIEW_TOPIC}/{session.player_id}", json.dumps(
+                {"cells": encode_cells([(x, y, self.maze[y][x]) for x, y in cells])}, separators=(",", ":")))
+
+    def publish_views(self, changed, rejected, full):
+        """Una snapshot per giocatore, con le sole entità nella sua vista (AI comprese)"""
+        positions = {s.player_id: s.pos for s in self.players.sessions() if s.pos}
+        positions.update(self.ai_positions)
+
+        for session in self.players.sessions():
+            view = self.views.get(session.player_id)
+            if view is None:
+                continue
+
+            shown = {pid for pid, pos in positions.items() if pid != session.player_id and view.can_see(pos)}
+            pos = {pid: positions[pid] for pid in shown
+                   if full or pid in changed or pid not in view.shown}
+            hidden = sorted(view.shown - shown)
+            view.shown = shown
+
+            snapshot = {"tick": self.tick_count, "pos": pos}
+            if hidden:
+                snapshot["hidden"] = hidden
+            if session.player_id in rejected:
+                snapshot["rejected"] = [session.player_id]
+                pos[session.player_id] = session.pos
+
+            if pos or hidden:
+                self.client.publish(f"maze/state/{session.player_id}",
+                                    json.dumps(snapshot, separators=(",", ":")))
+
+    def shift_walls(self):
+        """Sposta un muro senza chiudere nessuno fuori dall'uscita"""
+        positions = [s.pos for s in self.players.sessions() if s.pos]
+        positions += list(self.ai_positions.values())
+        cells = shift_walls(self.maze, exit_pos, positions, positions + [exit_pos])
+        if cells:
+            self.apply_patch(cells)
+
+    def apply_patch(self, cells):
+        """Applica le celle (x, y, valore) ovunque e pubblica solo quelle"""
+        changed = apply_cells(self.maze, cells)
+        if not changed:
+            return
+
+        for x, y, value in changed:
+            self.store.set_cell(x, y, value)
+            self.patched[(x, y)] = value
+        if self.shared_maze:
+            self.shared_maze.update(changed)
+
+        # Solo i blocchi toccati, niente ricottura completa
+        self.maze_renderer.update_cells(self.maze, changed)
+
+        if self.sight:
+            # Solo le righe e le colonne toccate; ogni client riceve le celle cambiate che vede
+            self.sight.update_cells(changed)
+            for session in self.players.sessions():
+                if session.player_id in self.views:
+                    self.update_view(session, refresh=True, changed=[(x, y) for x, y, _ in changed])
+
+        self.maze_version += 1
+        self.client.publish(PATCH_TOPIC, json.dumps(
+            {"version": self.maze_version, "cells": encode_cells(changed)}, separators=(",", ":")))
+        print(f"🧱 Labirinto v{self.maze_version}: {len(changed)} celle cambiate")
+
+    def declare_winner(self, session):
+        # Stop timer
+        elapsed_time = time.time() - self.game_start_time
+        winner_name = session.name
+
+        # Aggiungo al file leaderboard
+        self.leaderboard = add_record(winner_name, elapsed_time)
+
+        self.winner = session.player_id
+
+        self.pending_winner = (session.player_id, winner_name, elapsed_time)
+        self.needs_update = True
+
+        self.client.publish("maze/winner", json.dumps({"winner": winner_name}))
+        print(f"🏆 {session.player_id.upper()} HA VINTO!")
+        self.save_snapshot()
 
     def draw_ui(self):
         # Layout principale
@@ -288,7 +545,7 @@ class ServerDashboard(arcade.Window):
 
         # Label contatore giocatori
         self.lbl_players = arcade.gui.UILabel(
-            text="Giocatori connessi: 0/2",
+            text="Giocatori connessi: 0",
             font_size=22,
             text_color=arcade.color.LIGHT_BLUE)
         hbox.add(self.lbl_players)
@@ -319,9 +576,19 @@ class ServerDashboard(arcade.Window):
         hbox.add(self.btn_reset)
         hbox.add(arcade.gui.UISpace(height=40))
 
+        # Bottone DIFFICOLTÀ (solo con catalogo)
+        if self.catalog:
+            self.btn_difficulty = arcade.gui.UIFlatButton(
+                text=f"🎚️ Difficoltà: {self.difficulty}",
+                width=250,
+                height=50)
+            self.btn_difficulty.on_click = self.on_difficulty_click
+            hbox.add(self.btn_difficulty)
+            hbox.add(arcade.gui.UISpace(height=40))
+
         # Status label
         self.lbl_status = arcade.gui.UILabel(
-            text="⏳ Attendi 2 giocatori per iniziare",
+            text=f"⏳ Attendi {MIN_PLAYERS} giocatori per iniziare",
             font_size=14,
             text_color=arcade.color.YELLOW)
         hbox.add(self.lbl_status)
@@ -337,7 +604,6 @@ class ServerDashboard(arcade.Window):
         if hasattr(self, 'leaderboard_anchor'):
             self.manager.remove(self.leaderboard_anchor)
 
-        self.leaderboard = get_top_players(20)
         hbox = arcade.gui.UIBoxLayout(align="center")
 
         title = arcade.gui.UILabel(
@@ -347,7 +613,7 @@ class ServerDashboard(arcade.Window):
         hbox.add(title)
         hbox.add(arcade.gui.UISpace(height=20))
 
-        for i, record in enumerate(self.leaderboard, 1):
+        for i, record in enumerate(self.leaderboard[:LEADERBOARD_TOP], 1):
             text_line = f"{i}. {record['name']}: {format_time(record['time'])}"
             sample = arcade.gui.UILabel(
                 text=text_line,
@@ -361,44 +627,61 @@ class ServerDashboard(arcade.Window):
 
     def update_labels(self):
         """Aggiorna le label con i dati correnti"""
-        self.lbl_players.text = f"Giocatori connessi: {self.players_connected}/2"
+        self.lbl_players.text = f"Giocatori connessi: {len(self.players)}"
 
-        if self.player_names:
-            names_str = "\n".join([f"- {name}" for name in self.player_names.values()])
+        if len(self.players):
+            names_str = "\n".join([f"- {name}" for name in self.players.names()])
             self.lbl_names.text = names_str
         else:
             self.lbl_names.text = "In attesa di giocatori..."
 
-        if self.players_connected >= 2 and not self.game_started:
+        if len(self.players) >= MIN_PLAYERS and not self.game_started:
             self.lbl_status.text = "✅ Pronti! Clicca START GAME"
             self.lbl_status.text_color = arcade.color.LIME
         elif not self.game_started:
-            self.lbl_status.text = "⏳ Attendi 2 giocatori per iniziare"
+            self.lbl_status.text = f"⏳ Attendi {MIN_PLAYERS} giocatori per iniziare"
             self.lbl_status.text_color = arcade.color.YELLOW
 
     def on_start_click(self, event):
-        if self.players_connected >= 0: # and not self.game_started:
+        if len(self.players) >= 0: # and not self.game_started:
             print("🚀 Generazione labirinto...")
 
+            # Partenze eque per tutti i giocatori registrati
+            self.players.assign_starts(self.maze, exit_pos)
+
+            # Il labirinto inviato è la versione 0: le patch ripartono da qui
+            self.maze_version = 0
+            self.patched = {}
+
             # Invia configurazione
-            config = {
-                "size": MAZE_SIZE,
-                "start_p1": [1, 1],
-                "start_p2": [MAZE_SIZE - 2, MAZE_SIZE - 2],
-                "exit": exit_pos,
-                "maze": self.maze,
-                "game_ready": True
-            }
+            config = self.build_config(self.players.starts())
 
             # Avvia timer
             self.game_start_time = time.time()
 
-            self.client.publish("maze/config", json.dumps(config), retain=False)
+            # Retained come dopo un riavvio: sostituisce la configurazione della partita precedente
+            self.client.publish("maze/config", json.dumps(config), retain=True)
             self.game_started = True
 
+            if FOG_OF_WAR:
+                self.sight = SightTable(self.maze)
+                self.views = {}
+                for session in self.players.sessions():
+                    if session.pos:
+                        self.update_view(session)
+
+            if SHARED_MAZE:
+                # I solver locali leggono la griglia sul posto, senza JSON
+                # (retained: la riceve anche un solver avviato dopo START)
+                if self.shared_maze:
+                    self.shared_maze.close()
+                self.shared_maze = SharedMaze(self.maze)
+                self.client.publish(SHARED_TOPIC, json.dumps(self.shared_maze.descriptor(exit_pos, FOG_OF_WAR)), retain=True)
+
             self.lbl_status.text = "🎮 GIOCO AVVIATO!"
             self.lbl_status.text_color = arcade.color.GREEN
             print("✅ GIOCO INIZIATO!")
+            self.save_snapshot()
 
         elif self.game_started:
             self.lbl_status.text = "⚠️ Gioco già avviato!"
@@ -407,6 +690,37 @@ class ServerDashboard(arcade.Window):
             self.lbl_status.text = "⚠️ Aspetta almeno 2 giocatori!"
             self.lbl_status.text_color = arcade.color.RED
 
+    def build_config(self, players):
+        """Messaggio maze/config della partita in corso (players = id -> posizione)"""
+        config = {
+            "size": MAZE_SIZE,
+            "players": players,
+            "exit": exit_pos,
+            "maze": self.maze,
+            "version": self.maze_version,
+            "game_ready": True
+        }
+
+        if FOG_OF_WAR:
+            # Niente labirinto: le celle arrivano man mano che il giocatore le vede
+            del config["maze"]
+            config["fog"] = True
+        elif TILED_DELIVERY:
+            # I client scaricano solo le tile attorno a sé
+            del config["maze"]
+            config["tiled"] = True
+            config["tile_size"] = TILE_SIZE
+
+        return config
+
+    def on_difficulty_click(self, event):
+        """Cicla tra le fasce di difficoltà disponibili nel catalogo"""
+        bands = self.catalog.bands() or DIFFICULTY_BANDS
+        i = bands.index(self.difficulty) if self.difficulty in bands else -1
+        self.difficulty = bands[(i + 1) % len(bands)]
+        self.btn_difficulty.text = f"🎚️ Difficoltà: {self.difficulty}"
+        print(f"🎚️ Difficoltà: {self.difficulty} (attiva dal prossimo reset)")
+
     def on_reset_click(self, event):
         """Reset server per nuova partita"""
         print("🔄 Reset server...")
@@ -414,11 +728,23 @@ class ServerDashboard(arcade.Window):
         # Reset stato
         self.winner = None
         self.game_started = False
-        self.players_connected = 0
-        self.player_names = {}
+        self.players.clear()
+        self.ai_positions = {}
+        self.ai_moved = {}
 
         # Reset Labirinto
-        self.maze = genera_labirinto_simmetrico(MAZE_SIZE)
+        self.maze = self.nuovo_labirinto()
+        self.store = TiledMazeStore.from_grid(STORE_PATH, self.maze)
+        self.maze_version = 0
+        self.patched = {}
+        self.sight = None
+        self.views = {}
+
+        # Il segmento della partita finita non serve più: via anche il descrittore retained
+        if self.shared_maze:
+            self.shared_maze.close()
+            self.shared_maze = None
+            self.client.publish(SHARED_TOPIC, b"", retain=True)
 
         # Ricostruisci sprite
         self.build_maze_sprites()
@@ -426,13 +752,20 @@ class ServerDashboard(arcade.Window):
         self.update_labels()
         self.draw_leaderboard()
 
-        self.client.publish("maze/config", json.dumps({"reset_game": True}), retain=False)
+        # Retained: sostituisce l'eventuale partita riannunciata dopo un riavvio
+        self.client.publish("maze/config", json.dumps({"reset_game": True}), retain=True)
+        self.save_snapshot()
+
+    def on_close(self):
+        if self.shared_maze:
+            self.shared_maze.close()
+        super().on_close()
 
     def on_draw(self):
         self.clear()
 
-        # Disegna sprite labirinto
-        self.maze_sprite_list.draw()
+        # Disegna labirinto
+        self.maze_renderer.draw()
         self.manager.draw()
 
     def on_update(self, delta_time):
@@ -0,0 +1,64 @@
+"""
+Consegna del labirinto ai solver sulla stessa macchina, senza JSON.
+
+Il server copia la griglia (un byte per cella) in un segmento
+multiprocessing.shared_memory e pubblica solo un descrittore (retained) su maze/shared:
+
+    {"name": "...", "size": 67, "exit": [33, 33], "hash": "...", "fog": false}
+
+I solver locali si agganciano al segmento e leggono la griglia sul posto
+(array NumPy sopra il buffer condiviso): niente copie, niente parsing.
+"""
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from maze_utils import maze_hash
+
+
+SHARED_TOPIC = "maze/shared"
+
+
+class SharedMaze:
+    """Lato server: proprietario del segmento"""
+
+    def __init__(self, maze):
+        size = len(maze)
+        self.shm = shared_memory.SharedMemory(create=True, size=size * size)
+        self.grid = np.ndarray((size, size), dtype=np.uint8, buffer=self.shm.buf)
+        self.grid[:] = np.asarray(maze, dtype=np.uint8)
+        self.hash = maze_hash(maze)
+
+    def descriptor(self, exit_pos, fog=False):
+        return {"name": self.shm.name, "size": self.grid.shape[0], "exit": exit_pos, "hash": self.hash, "fog": fog}
+
+    def update(self, cells):
+        """Patch (x, y, valore): i solver agganciati le vedono subito, sul posto"""
+        for x, y, value in cells:
+            self.grid[y, x] = value
+        self.hash = maze_hash(self.grid)
+
+    def close(self):
+        # Chi è già agganciato continua a leggere finché non chiude il suo riferimento
+        del self.grid
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(descriptor):
+    """Lato solver: griglia in sola lettura sul buffer condiviso"""
+    try:
+        shm = shared_memory.SharedMemory(name=descriptor["name"], track=False)
+    except TypeError:
+        # Python < 3.13: il resource tracker cancellerebbe il segmento del server all'uscita
+        shm = shared_memory.SharedMemory(name=descriptor["name"])
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+    size = descriptor["size"]
+    grid = np.ndarray((size, size), dtype=np.uint8, buffer=shm.buf)
+    grid.flags.writeable = False
+
+    # Il segmento resta aperto finché esiste la griglia (o una sua vista)
+    weakref.finalize(grid, shm.close)
+    return grid
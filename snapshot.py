@@ -0,0 +1,134 @@
+"""
+Snapshot compatta dello stato autorevole del server, per ripartire a caldo.
+
+Un solo file binario, letto con np.memmap: intestazione fissa + sezioni
+allineate a 8 byte, ognuna vista direttamente come array senza parsing.
+
+    intestazione    magic, versione formato, lato, versione labirinto, tick,
+                    partita avviata, vincitore, orari, difficoltà, conteggi
+    labirinto       size * size uint8 (maze[y][x], patch comprese)
+    sessioni        id, nome, partenza, posizione (-1 = nessuna)
+    patch           terne int32 (x, y, valore) cambiate dall'inizio della partita
+    classifica      i primi LEADERBOARD_TOP record (nome, tempo)
+    pool            labirinti del catalogo non ancora estratti (fascia, indice)
+
+Si scrive su un file temporaneo e lo si sostituisce: chi ha ancora mappata
+la snapshot precedente continua a leggerla senza problemi.
+"""
+import math
+import os
+import struct
+import time
+
+import numpy as np
+
+
+SNAPSHOT_PATH = "server_snapshot.bin"
+MAGIC = b"MZSN"
+FORMAT_VERSION = 1
+LEADERBOARD_TOP = 20
+
+HEADER = struct.Struct("<4sHHIIBhdd16sIIII")
+
+SESSION_DTYPE = np.dtype([("id", "S32"), ("name", "S64"), ("start", "<i4", 2), ("pos", "<i4", 2)])
+RECORD_DTYPE = np.dtype([("name", "S64"), ("time", "<f8")])
+POOL_DTYPE = np.dtype([("band", "S16"), ("idx", "<i4")])
+
+
+def _aligned(nbytes):
+    return nbytes + (-nbytes % 8)
+
+
+def _padded(data):
+    return data + b"\0" * (_aligned(len(data)) - len(data))
+
+
+def _text(value):
+    return value.decode("utf-8", errors="ignore")
+
+
+def save_snapshot(path, state):
+    """
+    Scrive lo stato (dizionario con maze, sessions, patched, tick, version,
+    started, start_time, winner, leaderboard, difficulty, pool) in path
+    """
+    maze = np.asarray(state["maze"], dtype=np.uint8)
+    sessions = state["sessions"]
+    winner = next((i for i, s in enumerate(sessions) if s.player_id == state["winner"]), -1)
+
+    records = np.zeros(len(sessions), dtype=SESSION_DTYPE)
+    for record, session in zip(records, sessions):
+        record["id"] = session.player_id.encode("utf-8")[:32]
+        record["name"] = session.name.encode("utf-8")[:64]
+        record["start"] = session.start or (-1, -1)
+        record["pos"] = session.pos or (-1, -1)
+
+    patched = np.array([(x, y, v) for (x, y), v in state["patched"].items()], dtype="<i4").reshape(-1, 3)
+
+    top = state["leaderboard"][:LEADERBOARD_TOP]
+    leaderboard = np.array([(r["name"].encode("utf-8")[:64], r["time"]) for r in top], dtype=RECORD_DTYPE)
+
+    pool = np.array([(band.encode("utf-8"), idx) for band, ids in state["pool"].items() for idx in ids],
+                    dtype=POOL_DTYPE)
+
+    start_time = state["start_time"] if state["start_time"] is not None else math.nan
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, maze.shape[0], state["version"], state["tick"],
+                         state["started"], winner, time.time(), start_time,
+                         state["difficulty"].encode("utf-8")[:16],
+                         len(records), len(patched), len(leaderboard), len(pool))
+
+    with open(path + ".tmp", "wb") as f:
+        for section in (header, maze.tobytes(), records.tobytes(), patched.tobytes(),
+                        leaderboard.tobytes(), pool.tobytes()):
+            f.write(_padded(section))
+    os.replace(path + ".tmp", path)
+
+
+def load_snapshot(path, size):
+    """Stato salvato (array in sola lettura sul file mappato), None se manca o non è compatibile"""
+    if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+        return None
+
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    (magic, fmt, maze_size, version, tick, started, winner, saved_at, start_time,
+     difficulty, n_sessions, n_patched, n_records, n_pool) = HEADER.unpack_from(data)
+
+    if magic != MAGIC or fmt != FORMAT_VERSION or maze_size != size:
+        print(f"⚠️ Snapshot {path} ignorata (formato o dimensione diversi)")
+        return None
+
+    # Ogni sezione è una vista sul file, nessuna copia
+    offset = _aligned(HEADER.size)
+    sections = []
+    for dtype, count in ((np.dtype(np.uint8), size * size), (SESSION_DTYPE, n_sessions),
+                         (np.dtype("<i4"), n_patched * 3), (RECORD_DTYPE, n_records), (POOL_DTYPE, n_pool)):
+        nbytes = dtype.itemsize * count
+        if offset + nbytes > len(data):
+            print(f"⚠️ Snapshot {path} troncata")
+            return None
+        sections.append(data[offset:offset + nbytes].view(dtype))
+        offset += _aligned(nbytes)
+
+    maze, sessions, patched, records, pool = sections
+    winner_id = _text(sessions[winner]["id"]) if 0 <= winner < n_sessions else None
+
+    pools = {}
+    for entry in pool:
+        pools.setdefault(_text(entry["band"]), []).append(int(entry["idx"]))
+
+    return {
+        "maze": maze.reshape(size, size),
+        "sessions": [(_text(s["id"]), _text(s["name"]),
+                      [int(v) for v in s["start"]] if s["start"][0] >= 0 else None,
+                      [int(v) for v in s["pos"]] if s["pos"][0] >= 0 else None) for s in sessions],
+        "patched": {(int(x), int(y)): int(v) for x, y, v in patched.reshape(-1, 3)},
+        "tick": tick,
+        "version": version,
+        "started": bool(started),
+        "start_time": None if math.isnan(start_time) else start_time,
+        "saved_at": saved_at,
+        "winner": winner_id,
+        "leaderboard": [{"name": _text(r["name"]), "time": float(r["time"])} for r in records],
+        "difficulty": _text(difficulty.rstrip(b"\0")),
+        "pool": pools,
+    }
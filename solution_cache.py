@@ -0,0 +1,88 @@
+"""
+Cache delle soluzioni dell'Informed AI.
+
+Chiave: (hash del labirinto, partenza, uscita, strategia). Due livelli:
+un LRU in memoria di CAPACITY voci e un file sqlite su disco, così le
+risposte sopravvivono al riavvio dell'AI. Le voci lette da disco vengono
+promosse in memoria.
+
+Valore: {"status", "path", "expanded"}; l'esplorazione non si salva, a un hit
+l'AI pubblica subito il percorso invece di rianimare la ricerca.
+"""
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+from maze_utils import maze_hash
+
+
+CACHE_PATH = "solutions.sqlite"
+CAPACITY = 64
+DISK_CAPACITY = 5000  # oltre si eliminano le voci usate meno di recente
+
+
+class SolutionCache:
+    def __init__(self, path=CACHE_PATH, capacity=CAPACITY, disk_capacity=DISK_CAPACITY):
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+        self.memory = OrderedDict()
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS solutions "
+                        "(key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)")
+        self.db.commit()
+
+        # Contatori
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(maze, start, goal, strategy):
+        return f"{maze_hash(maze)}:{start[0]},{start[1]}:{goal[0]},{goal[1]}:{strategy}"
+
+    def get(self, key):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return self.memory[key]
+
+        row = self.db.execute("SELECT value FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self.db.execute("UPDATE solutions SET used = ? WHERE key = ?", (time.time(), key))
+        self.db.commit()
+
+        value = json.loads(row[0])
+        self.remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self.remember(key, value)
+        self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)",
+                        (key, json.dumps(value), time.time()))
+        self.db.execute("DELETE FROM solutions WHERE key NOT IN "
+                        "(SELECT key FROM solutions ORDER BY used DESC LIMIT ?)", (self.disk_capacity,))
+        self.db.commit()
+
+    def remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,57 @@
+"""Patch dei muri: le terne piatte pubblicate devono ridare le stesse celle."""
+import random
+
+import numpy as np
+
+from benchmark import open_loops
+from maze_patch import apply_cells, cost_field, decode_cells, encode_cells, repair_distances
+from maze_utils import DOOR, FLOOR, ICE, MUD, WALL, aggiungi_terreno, genera_labirinto_simmetrico
+
+
+def test_encode_decode_round_trip():
+    cells = [(1, 2, WALL), (30, 4, FLOOR), (65, 65, MUD)]
+    flat = encode_cells(cells)
+
+    assert flat == [1, 2, WALL, 30, 4, FLOOR, 65, 65, MUD]
+    assert decode_cells(flat) == cells
+    assert decode_cells(encode_cells([])) == []
+
+
+def test_encode_accepts_numpy_values():
+    # Le celle cambiate sulla griglia condivisa arrivano come interi NumPy
+    cells = [(np.int64(3), np.int32(5), np.uint8(WALL))]
+    flat = encode_cells(cells)
+
+    assert all(type(v) is int for v in flat)
+    assert decode_cells(flat) == [(3, 5, WALL)]
+
+
+def test_apply_is_idempotent():
+    maze = [[FLOOR] * 4 for _ in range(4)]
+    cells = decode_cells(encode_cells([(1, 2, WALL), (3, 0, MUD)]))
+
+    assert apply_cells(maze, cells) == cells
+    assert maze[2][1] == WALL and maze[0][3] == MUD
+    assert apply_cells(maze, cells) == []  # valori assoluti: riapplicare non cambia nulla
+
+
+def test_repair_matches_fresh_cost_field():
+    # Patch casuali (muri e terreno, anche celle ripetute): la riparazione incrementale
+    # deve dare lo stesso campo ricalcolato da zero
+    for seed in range(200):
+        rng = random.Random(seed)
+        maze = genera_labirinto_simmetrico(21, rng)
+        open_loops(maze, 0.1, rng)
+        aggiungi_terreno(maze, 0.2, rng)
+        goal = (10, 10)
+        field = cost_field(maze, goal)
+
+        for _ in range(5):
+            cells = [(rng.randrange(1, 20), rng.randrange(1, 20), rng.choice([FLOOR, WALL, MUD, ICE, DOOR]))
+                     for _ in range(rng.randint(1, 4))]
+            cells = [c for c in cells if c[:2] != goal]
+            cells += [(x, y, rng.choice([FLOOR, WALL, MUD])) for x, y, _ in cells[:1]]  # stessa cella due volte
+            apply_cells(maze, cells)
+            repair_distances(field, maze, cells)
+
+            assert (field == cost_field(maze, goal)).all(), seed
@@ -0,0 +1,18 @@
+"""Bus MQTT: le patch non si perdono mai, anche a coda piena."""
+from message_bus import MessageBus
+
+
+def test_essential_messages_are_never_dropped_and_keep_order():
+    bus = MessageBus(2, essential=lambda topic: topic == "maze/patch", report_every=None)
+    for i in range(5):
+        bus.put("maze/patch", i)
+        bus.put("maze/config", i)
+
+    handled = []
+    assert bus.drain(lambda topic, payload: handled.append((topic, payload))) == 7
+
+    # Tutte le patch, solo le ultime due configurazioni, nell'ordine di arrivo
+    assert handled == [("maze/patch", 0), ("maze/patch", 1), ("maze/patch", 2), ("maze/patch", 3),
+                       ("maze/config", 3), ("maze/patch", 4), ("maze/config", 4)]
+    assert bus.stats()["dropped"] == 3
+    assert bus.stats()["depth"] == 0
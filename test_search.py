@@ -0,0 +1,37 @@
+"""Strategie dichiarate ottime nel portfolio (bound 1.0): stesso costo di A* a secchi."""
+import random
+
+import pytest
+
+from GraphSearch import BidirectionalSearch, BucketSearch, MazeProblem, graph_search
+from benchmark import open_loops
+from maze_catalog import exit_position, start_positions
+from maze_utils import aggiungi_terreno, cell_cost, genera_labirinto_simmetrico
+
+
+def path_cost(maze, path):
+    return sum(cell_cost(maze[y][x]) for x, y in path)
+
+
+@pytest.mark.parametrize("heuristic", [True, False])
+def test_bidirectional_matches_bucket_cost(heuristic):
+    size = 41
+    for seed in range(60):
+        rng = random.Random(seed)
+        maze = genera_labirinto_simmetrico(size, rng)
+        open_loops(maze, rng.choice([0.0, 0.05, 0.2]), rng)
+        aggiungi_terreno(maze, rng.choice([0.0, 0.2, 0.4]), rng)
+
+        goal = exit_position(size)
+        for start in start_positions(size).values():
+            problem = MazeProblem(list(start), goal, maze)
+            status, expected, _ = graph_search(problem, BucketSearch(problem))
+            problem = MazeProblem(list(start), goal, maze)
+            bi_status, path, _ = graph_search(problem, BidirectionalSearch(problem, heuristic))
+
+            assert bi_status == status == 'success'
+            # Percorso valido: passi adiacenti dalla partenza fino all'uscita
+            for a, b in zip([start] + path, path):
+                assert abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+            assert path[-1] == goal
+            assert path_cost(maze, path) == path_cost(maze, expected), (seed, start)
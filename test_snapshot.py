@@ -0,0 +1,75 @@
+"""Snapshot del server: quello che si salva deve tornare identico alla ripartenza."""
+import random
+
+from maze_utils import genera_labirinto_simmetrico
+from player_registry import PlayerSession
+from snapshot import load_snapshot, save_snapshot
+
+
+def make_state(size=21):
+    maze = genera_labirinto_simmetrico(size, random.Random(0))
+    maze[1][2] = 0  # una patch già applicata
+
+    first = PlayerSession("player1", "Anna")
+    first.start, first.pos = [1, 1], [3, 1]
+    second = PlayerSession("player2", "Bruno")
+    second.start = [size - 2, size - 2]  # pos None: non ha ancora mosso
+    waiting = PlayerSession("player3", "Ciro")  # senza partenza né posizione
+
+    return {
+        "maze": maze,
+        "sessions": [first, second, waiting],
+        "patched": {(2, 1): 0, (5, 7): 1},
+        "tick": 1234,
+        "version": 7,
+        "started": True,
+        "start_time": 1700000000.5,
+        "winner": "player2",
+        "leaderboard": [{"name": "Anna", "time": 42.5}, {"name": "Bruno", "time": 61.25}],
+        "difficulty": "difficile",
+        "pool": {"facile": [3, 1, 4], "medio": [], "difficile": [15]},
+    }
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    state = make_state()
+    save_snapshot(path, state)
+
+    loaded = load_snapshot(path, len(state["maze"]))
+    assert loaded["maze"].tolist() == state["maze"]
+    assert loaded["sessions"] == [("player1", "Anna", [1, 1], [3, 1]),
+                                  ("player2", "Bruno", [19, 19], None),
+                                  ("player3", "Ciro", None, None)]
+    assert loaded["winner"] == "player2"
+    assert loaded["patched"] == state["patched"]
+    for key in ("tick", "version", "started", "start_time", "leaderboard", "difficulty"):
+        assert loaded[key] == state[key], key
+    # Le fasce vuote non lasciano traccia nel file
+    assert loaded["pool"] == {"facile": [3, 1, 4], "difficile": [15]}
+
+
+def test_round_trip_without_game(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    state = make_state()
+    state.update(sessions=[], patched={}, started=False, start_time=None, winner=None, pool={})
+    save_snapshot(path, state)
+
+    loaded = load_snapshot(path, len(state["maze"]))
+    assert loaded["sessions"] == []
+    assert loaded["patched"] == {}
+    assert loaded["winner"] is None
+    assert loaded["start_time"] is None
+    assert loaded["pool"] == {}
+
+
+def test_incompatible_snapshot_is_ignored(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    save_snapshot(path, make_state())
+
+    assert load_snapshot(path, 67) is None  # altro MAZE_SIZE
+    assert load_snapshot(str(tmp_path / "missing.bin"), 21) is None
+
+    with open(path, "r+b") as f:
+        f.truncate(200)
+    assert load_snapshot(path, 21) is None
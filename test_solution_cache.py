@@ -0,0 +1,77 @@
+"""Cache delle soluzioni: LRU in memoria, promozione da disco, limite del file, contatori."""
+import itertools
+
+import pytest
+
+import solution_cache
+from solution_cache import SolutionCache
+
+
+def value(i):
+    return {"status": "success", "path": [[i, 1]], "expanded": i}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Orari "used" distinti e crescenti: l'ordine LRU su disco non dipende dalla velocità del test
+    ticks = itertools.count(1)
+    monkeypatch.setattr(solution_cache.time, "time", lambda: float(next(ticks)))
+
+
+def test_memory_lru_evicts_least_recent(tmp_path, clock):
+    cache = SolutionCache(str(tmp_path / "cache.sqlite"), capacity=2)
+    cache.put("a", value(1))
+    cache.put("b", value(2))
+    assert cache.get("a") == value(1)  # "a" ora è la più recente
+    cache.put("c", value(3))
+
+    assert list(cache.memory) == ["a", "c"]
+    assert cache.stats()["memory_hits"] == 1
+    cache.close()
+
+
+def test_disk_hit_is_promoted_to_memory(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SolutionCache(path, capacity=1)
+    cache.put("a", value(1))
+    cache.put("b", value(2))  # "a" esce dalla memoria ma resta su disco
+    assert "a" not in cache.memory
+
+    assert cache.get("a") == value(1)
+    assert list(cache.memory) == ["a"]
+    assert cache.get("a") == value(1)
+    assert (cache.disk_hits, cache.memory_hits) == (1, 1)
+    cache.close()
+
+    # Il disco sopravvive al riavvio
+    reopened = SolutionCache(path)
+    assert reopened.get("b") == value(2)
+    assert reopened.stats() == {"memory_hits": 0, "disk_hits": 1, "misses": 0, "hit_rate": 1.0}
+    reopened.close()
+
+
+def test_disk_keeps_only_most_recently_used(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SolutionCache(path, capacity=1, disk_capacity=3)
+    for key in "abc":
+        cache.put(key, value(ord(key)))
+    cache.get("a")  # letta da disco: aggiorna "used", "b" diventa la meno recente
+    cache.put("d", value(4))
+
+    keys = {row[0] for row in cache.db.execute("SELECT key FROM solutions")}
+    assert keys == {"a", "c", "d"}
+    cache.close()
+
+
+def test_counters(tmp_path, clock):
+    cache = SolutionCache(str(tmp_path / "cache.sqlite"))
+    assert cache.stats()["hit_rate"] == 0.0
+
+    assert cache.get("missing") is None
+    cache.put("a", value(1))
+    cache.get("a")
+    cache.get("a")
+    cache.get("other")
+
+    assert cache.stats() == {"memory_hits": 2, "disk_hits": 0, "misses": 2, "hit_rate": 0.5}
+    cache.close()
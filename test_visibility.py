@@ -0,0 +1,76 @@
+"""Nebbia di guerra: la vista incrementale deve coincidere con quella ricalcolata da zero."""
+import random
+
+from GraphSearch import BucketSearch, MazeProblem, graph_search
+from benchmark import open_loops
+from maze_patch import apply_cells
+from maze_utils import FLOOR, WALL, genera_labirinto_simmetrico, is_walkable
+from visibility import PlayerView, SightTable
+
+
+def visible_from_scratch(maze, pos):
+    """3x3 attorno a pos più riga e colonna fino al primo muro (compreso) in ogni verso"""
+    x, y = pos
+    height, width = len(maze), len(maze[0])
+    cells = {(nx, ny) for ny in range(y - 1, y + 2) for nx in range(x - 1, x + 2)
+             if 0 <= nx < width and 0 <= ny < height}
+    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        nx, ny = x + dx, y + dy
+        while 0 <= nx < width and 0 <= ny < height:
+            cells.add((nx, ny))
+            if not is_walkable(maze[ny][nx]):
+                break
+            nx, ny = nx + dx, ny + dy
+    return cells
+
+
+def walk(maze, start, goal):
+    problem = MazeProblem(list(start), list(goal), maze)
+    _, path, _ = graph_search(problem, BucketSearch(problem))
+    return [tuple(start)] + [tuple(p) for p in path]
+
+
+def check(view, maze, pos, seen):
+    expected = visible_from_scratch(maze, pos)
+    assert set(view.count) == expected, pos
+    assert all(view.count[c] > 0 for c in expected)
+    assert seen <= view.seen and expected <= view.seen
+
+
+def test_view_follows_moves():
+    for seed in range(10):
+        rng = random.Random(seed)
+        maze = genera_labirinto_simmetrico(31, rng)
+        open_loops(maze, 0.1, rng)
+        view = PlayerView(SightTable(maze))
+
+        seen = set()
+        for pos in walk(maze, (1, 1), (15, 15)):
+            seen.update(view.move(pos))
+            check(view, maze, pos, seen)
+        # Le celle nuove restituite da move sono esattamente quelle mai viste prima
+        assert seen == view.seen
+
+
+def test_view_after_wall_patches():
+    for seed in range(10):
+        rng = random.Random(seed)
+        maze = genera_labirinto_simmetrico(31, rng)
+        open_loops(maze, 0.1, rng)
+        table = SightTable(maze)
+        view = PlayerView(table)
+
+        seen = set()
+        path = walk(maze, (1, 1), (15, 15))
+        for i, pos in enumerate(path):
+            seen.update(view.move(pos))
+            if i % 3 == 0:
+                # Muri nuovi o abbattuti sulla riga e sulla colonna attuali, lontano dal percorso
+                on_path = set(path)
+                line = [(x, pos[1]) for x in range(1, 30)] + [(pos[0], y) for y in range(1, 30)]
+                cells = [(x, y, FLOOR if maze[y][x] == WALL else WALL)
+                         for x, y in rng.sample(line, 3) if (x, y) not in on_path]
+                changed = apply_cells(maze, cells)
+                table.update_cells(changed)
+                seen.update(view.move(pos, refresh=True))
+            check(view, maze, pos, seen)
@@ -0,0 +1,266 @@
+"""
+Torneo headless tra AI e giocatori scriptati: niente arcade, niente MQTT.
+
+Stesse regole del server (game_rules): una mossa alla volta validata con
+is_valid_move, vittoria con reached_exit, attesa sulle celle di terreno
+come sul client. Nel gioco i giocatori non si bloccano a vicenda, quindi
+ogni agente si simula da solo da entrambi gli angoli di partenza e gli
+scontri diretti si ricavano dai tick di arrivo (stesso tick = pareggio).
+I labirinti (uno per seed) si giocano in parallelo su tutti i core.
+
+    python tournament.py --mazes 2000
+    python tournament.py --agents bucket-a* wall-follower random --size 101 --loops 0.1
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmark import open_loops
+from game_rules import is_valid_move, reached_exit
+from maze_catalog import exit_position
+from maze_utils import aggiungi_terreno, cell_cost, genera_labirinto_simmetrico, is_walkable
+from portfolio import STRATEGIES
+from GraphSearch import MazeProblem, graph_search
+
+
+#########
+# AGENTI
+#########
+
+class Agent:
+    """Un giocatore: riceve la posizione, ritorna la prossima cella (una per tick)"""
+
+    def reset(self, maze, start, exit_pos, rng):
+        self.maze = maze
+        self.exit_pos = exit_pos
+        self.rng = rng
+
+    def decide(self, pos):
+        return pos
+
+
+class PlannerAgent(Agent):
+    """Strategia dell'Informed AI: pianifica alla prima decisione, poi segue il percorso"""
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def reset(self, maze, start, exit_pos, rng):
+        super().reset(maze, start, exit_pos, rng)
+        self.path = None
+
+    def decide(self, pos):
+        if self.path is None:
+            problem = MazeProblem(list(pos), self.exit_pos, self.maze)
+            _, path, _ = graph_search(problem, STRATEGIES[self.strategy][0](problem))
+            self.path = list(path)
+        return self.path.pop(0) if self.path else pos
+
+
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # su, destra, giù, sinistra (in senso orario)
+
+
+class WallFollower(Agent):
+    """
+    Regola della mano destra: nessuna conoscenza del labirinto oltre le celle
+    vicine. Il centro aperto attorno all'uscita non tocca i muri esterni,
+    quindi spesso gira attorno senza arrivare: è il riferimento "cieco".
+    """
+
+    def reset(self, maze, start, exit_pos, rng):
+        super().reset(maze, start, exit_pos, rng)
+        self.heading = 0
+
+    def decide(self, pos):
+        # Prima a destra, poi dritto, a sinistra e infine indietro
+        for turn in (1, 0, -1, 2):
+            heading = (self.heading + turn) % 4
+            dx, dy = DIRECTIONS[heading]
+            if is_walkable(self.maze[pos[1] + dy][pos[0] + dx]):
+                self.heading = heading
+                return [pos[0] + dx, pos[1] + dy]
+        return pos
+
+
+class RandomWalker(Agent):
+    """Passeggiata casuale che evita di tornare indietro se può"""
+
+    def reset(self, maze, start, exit_pos, rng):
+        super().reset(maze, start, exit_pos, rng)
+        self.prev = None
+
+    def decide(self, pos):
+        moves = [[pos[0] + dx, pos[1] + dy] for dx, dy in DIRECTIONS
+                 if is_walkable(self.maze[pos[1] + dy][pos[0] + dx])]
+        forward = [m for m in moves if m != self.prev] or moves
+        self.prev = list(pos)
+        return self.rng.choice(forward) if forward else pos
+
+
+AGENTS = {name: (lambda name=name: PlannerAgent(name)) for name in STRATEGIES}
+AGENTS["wall-follower"] = WallFollower
+AGENTS["random"] = RandomWalker
+
+DEFAULT_AGENTS = ["greedy", "bucket-a*", "hpa*", "wall-follower", "random"]
+
+
+#########
+# MOTORE
+#########
+
+def play(maze, exit_pos, agent, start, max_ticks, rng):
+    """
+    Un agente da solo fino all'uscita. Ritorna un dizionario con tick di
+    arrivo (None = tempo scaduto), passi, decisioni, mosse rifiutate e
+    secondi di CPU spesi nelle decisioni.
+    """
+    agent.reset(maze, start, exit_pos, rng)
+    pos = list(start)
+    result = {"tick": None, "steps": 0, "decisions": 0, "rejected": 0, "cpu": 0.0}
+    wait = 0
+
+    for tick in range(1, max_ticks + 1):
+        if wait:
+            # Terreno lento: come sul client, la cella costa più tick
+            wait -= 1
+            continue
+
+        t0 = time.process_time()
+        new_pos = agent.decide(pos)
+        result["cpu"] += time.process_time() - t0
+        result["decisions"] += 1
+
+        if new_pos is None or list(new_pos) == pos:
+            continue
+        if not is_valid_move(maze, pos, new_pos):
+            result["rejected"] += 1  # il server riporterebbe il giocatore indietro
+            continue
+
+        pos = list(new_pos)
+        result["steps"] += 1
+        wait = cell_cost(maze[pos[1]][pos[0]]) - 1
+
+        if reached_exit(pos, exit_pos):
+            result["tick"] = tick
+            break
+
+    return result
+
+
+def build_maze(seed, size, loops, terrain):
+    rng = random.Random(seed)
+    maze = genera_labirinto_simmetrico(size, rng)
+    if loops:
+        open_loops(maze, loops, rng)
+    if terrain:
+        aggiungi_terreno(maze, terrain, rng)
+    return maze
+
+
+def play_seed(args):
+    """Tutti gli agenti su un labirinto, da entrambi gli angoli (nel processo worker)"""
+    seed, names, size, loops, terrain, max_ticks = args
+    maze = build_maze(seed, size, loops, terrain)
+    exit_pos = exit_position(size)
+    sides = [[1, 1], [size - 2, size - 2]]
+
+    results = {}
+    for name in names:
+        results[name] = [play(maze, exit_pos, AGENTS[name](), start, max_ticks,
+                              random.Random(f"{seed}-{name}-{side}"))
+                         for side, start in enumerate(sides)]
+    return results
+
+
+def head_to_head(a, b):
+    """+1 vince a, -1 vince b, 0 pareggio (nessuno arrivato o stesso tick)"""
+    ta = a["tick"] if a["tick"] is not None else float("inf")
+    tb = b["tick"] if b["tick"] is not None else float("inf")
+    return (ta < tb) - (ta > tb)
+
+
+def run_tournament(names, mazes, size, loops=0.0, terrain=0.0, seed=0, max_ticks=None, workers=None):
+    max_ticks = max_ticks or 2 * size * size
+    jobs = [(seed + i, names, size, loops, terrain, max_ticks) for i in range(mazes)]
+    workers = workers or os.cpu_count()
+
+    stats = {name: {"matches": 0, "wins": 0, "draws": 0, "arrived": 0, "runs": 0,
+                    "steps": 0, "decisions": 0, "rejected": 0, "cpu": 0.0} for name in names}
+    pairs = {(a, b): [0, 0, 0] for a, b in itertools.permutations(names, 2)}  # vittorie, pareggi, partite
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunk = max(1, mazes // (workers * 8))
+        for results in pool.map(play_seed, jobs, chunksize=chunk):
+            for name, runs in results.items():
+                s = stats[name]
+                for r in runs:
+                    s["runs"] += 1
+                    s["decisions"] += r["decisions"]
+                    s["rejected"] += r["rejected"]
+                    s["cpu"] += r["cpu"]
+                    if r["tick"] is not None:
+                        s["arrived"] += 1
+                        s["steps"] += r["steps"]
+
+            # Due partite per coppia: a dall'angolo 0 contro b dall'angolo 1, e viceversa
+            for a, b in itertools.combinations(names, 2):
+                for side in (0, 1):
+                    outcome = head_to_head(results[a][side], results[b][1 - side])
+                    for x, y, won in ((a, b, outcome > 0), (b, a, outcome < 0)):
+                        stats[x]["matches"] += 1
+                        stats[x]["wins"] += won
+                        stats[x]["draws"] += outcome == 0
+                        pairs[(x, y)][0] += won
+                        pairs[(x, y)][1] += outcome == 0
+                        pairs[(x, y)][2] += 1
+
+    return {"stats": stats, "pairs": pairs, "seconds": time.perf_counter() - t0}
+
+
+def report(result, names):
+    stats = result["stats"]
+    print(f"🏁 Torneo completato in {result['seconds']:.1f} s")
+    print(f"{'agente':<15}{'vittorie':>10}{'pareggi':>10}{'arrivi':>9}{'passi':>9}{'µs/dec':>10}{'rifiuti':>9}")
+    for name in sorted(names, key=lambda n: -stats[n]["wins"] / max(stats[n]["matches"], 1)):
+        s = stats[name]
+        print(f"{name:<15}{s['wins'] / max(s['matches'], 1):>10.1%}{s['draws'] / max(s['matches'], 1):>10.1%}"
+              f"{s['arrived'] / max(s['runs'], 1):>9.1%}{s['steps'] / max(s['arrived'], 1):>9.0f}"
+              f"{s['cpu'] / max(s['decisions'], 1) * 1e6:>10.1f}{s['rejected']:>9}")
+
+    # Scontri diretti: percentuale di vittorie della riga contro la colonna
+    print()
+    print(f"{'':<15}" + "".join(f"{n[:9]:>10}" for n in names))
+    for a in names:
+        row = ""
+        for b in names:
+            won, _, played = result["pairs"].get((a, b), (0, 0, 0))
+            row += f"{'-':>10}" if a == b else f"{won / max(played, 1):>10.1%}"
+        print(f"{a:<15}{row}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Torneo headless tra strategie")
+    parser.add_argument("--agents", nargs="+", default=DEFAULT_AGENTS, choices=sorted(AGENTS))
+    parser.add_argument("--mazes", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=67)
+    parser.add_argument("--loops", type=float, default=0.0, help="frazione di muri interni da abbattere")
+    parser.add_argument("--terrain", type=float, default=0.0, help="frazione dei corridoi con terreno")
+    parser.add_argument("--max-ticks", type=int, default=None, help="default 2 * size * size")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="salva anche le statistiche in questo file")
+    args = parser.parse_args()
+
+    result = run_tournament(args.agents, args.mazes, args.size, args.loops, args.terrain,
+                            args.seed, args.max_ticks, args.workers)
+    report(result, args.agents)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"stats": result["stats"],
+                       "pairs": {f"{a} vs {b}": v for (a, b), v in result["pairs"].items()}}, f, indent=4)
@@ -0,0 +1,127 @@
+"""
+Nebbia di guerra: ogni giocatore vede solo i corridoi in cui si trova.
+
+Nel labirinto la linea di vista segue i corridoi dritti: da una cella si vede
+tutta la sua riga e tutta la sua colonna fino al primo muro (muri compresi),
+più le 8 celle attorno. SightTable precalcola questi tratti ("run") una volta
+sola; PlayerView tiene l'insieme visibile con un contatore per cella e a ogni
+passo aggiunge/toglie solo i tratti cambiati (muovendosi in un corridoio
+orizzontale cambia solo quello verticale).
+
+Protocollo MQTT (modalità nebbia):
+    maze/view/<id>      {"cells": [x0, y0, v0, ...]} celle appena scoperte (o cambiate in vista)
+    maze/state/<id>     snapshot con le sole entità visibili (AI comprese), "hidden" = uscite dalla vista
+"""
+from collections import Counter
+
+from maze_utils import is_walkable
+
+
+VIEW_TOPIC = "maze/view"
+
+
+class SightTable:
+    """Tratti di riga e di colonna di ogni cella percorribile"""
+
+    def __init__(self, maze):
+        self.maze = maze
+        self.height = len(maze)
+        self.width = len(maze[0])
+        self.runs = {}  # chiave del tratto -> celle (muri di chiusura compresi)
+        self.row_key = {}  # (x, y) -> chiave del tratto orizzontale
+        self.col_key = {}  # (x, y) -> chiave del tratto verticale
+
+        for y in range(self.height):
+            self.build_row(y)
+        for x in range(self.width):
+            self.build_col(x)
+
+    def build_row(self, y):
+        self._build([(x, y) for x in range(self.width)], "r", self.row_key)
+
+    def build_col(self, x):
+        self._build([(x, y) for y in range(self.height)], "c", self.col_key)
+
+    def _build(self, line, kind, index):
+        # Via i tratti vecchi di questa linea
+        for cell in line:
+            old = index.pop(cell, None)
+            if old is not None:
+                self.runs.pop(old, None)
+
+        start = None
+        for i in range(len(line) + 1):
+            open_cell = i < len(line) and is_walkable(self.maze[line[i][1]][line[i][0]])
+            if open_cell and start is None:
+                start = i
+            elif not open_cell and start is not None:
+                key = (kind, line[start][0], line[start][1])
+                # Il tratto più i muri che lo chiudono ai due capi
+                self.runs[key] = line[max(start - 1, 0):min(i + 1, len(line))]
+                for cell in line[start:i]:
+                    index[cell] = key
+                start = None
+
+    def keys_at(self, pos):
+        """Tratti visibili dalla cella pos (vuoto se pos è un muro)"""
+        cell = (int(pos[0]), int(pos[1]))
+        keys = {("n",) + cell}
+        for index in (self.row_key, self.col_key):
+            if cell in index:
+                keys.add(index[cell])
+        return keys
+
+    def cells(self, key):
+        if key[0] == "n":
+            x, y = key[1], key[2]
+            return [(nx, ny) for ny in range(y - 1, y + 2) for nx in range(x - 1, x + 2)
+                    if 0 <= nx < self.width and 0 <= ny < self.height]
+        return self.runs.get(key, [])
+
+    def update_cells(self, cells):
+        """Celle cambiate (patch): ricalcola solo le righe e le colonne che le contengono"""
+        for y in {c[1] for c in cells}:
+            self.build_row(y)
+        for x in {c[0] for c in cells}:
+            self.build_col(x)
+
+
+class PlayerView:
+    """Insieme visibile di un giocatore, aggiornato per differenza di tratti"""
+
+    def __init__(self, table):
+        self.table = table
+        self.keys = set()
+        self.count = Counter()  # cella -> numero di tratti visibili che la contengono
+        self.seen = set()  # celle già inviate al client
+        self.shown = set()  # entità che il client sta vedendo
+        self.pos = None
+
+    def can_see(self, pos):
+        return (int(pos[0]), int(pos[1])) in self.count
+
+    def move(self, pos, refresh=False):
+        """Nuova posizione; ritorna le celle viste per la prima volta"""
+        self.pos = pos
+        keys = self.table.keys_at(pos)
+        if refresh:
+            # I tratti sono stati ricostruiti (patch): si riparte dalle chiavi attuali
+            self.keys, self.count = set(), Counter()
+
+        for key in self.keys - keys:
+            for cell in self.table.cells(key):
+                self.count[cell] -= 1
+                if not self.count[cell]:
+                    del self.count[cell]
+
+        new = []
+        for key in keys - self.keys:
+            for cell in self.table.cells(key):
+                self.count[cell] += 1
+                if cell not in self.seen:
+                    self.seen.add(cell)
+                    new.append(cell)
+
+        self.keys = keys
+        return new
+